@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from service.worker_pool import WarmPool, get_worker_pool
+
+
+class ConversionWorker:
+    """変換処理をバックグラウンドのプロセスプールで実行し、進捗を集計する
+
+    tkinterのイベントループをブロックしないよう、結果の取得はpoll()で行います。
+    プロセスプールは共有のもの（service.worker_pool）を使用し、ボタン操作のたびにワーカーを起動しません。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, pool: Optional[WarmPool] = None):
+        self.max_workers = max_workers
+        self._pool = pool
+        self._futures: list[Future] = []
+        self._reset_progress()
+
+    def _reset_progress(self) -> None:
+        self.total = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.started_at = time.perf_counter()
+
+    @property
+    def is_busy(self) -> bool:
+        return bool(self._futures)
+
+    @property
+    def throughput(self) -> float:
+        """1秒あたりの完了件数"""
+        elapsed = time.perf_counter() - self.started_at
+        return self.completed / elapsed if elapsed > 0 else 0.0
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        """変換タスクを投入（待機中のタスクがない場合は進捗をリセット）"""
+        if not self._futures:
+            self._reset_progress()
+        if self._pool is None:
+            self._pool = get_worker_pool(self.max_workers)
+        future = self._pool.submit(func, *args)
+        self._futures.append(future)
+        self.total += 1
+        return future
+
+    def poll(self) -> list[Future]:
+        """完了したタスクを取り出す（ブロックしない）"""
+        done = [future for future in self._futures if future.done()]
+        self._futures = [future for future in self._futures if not future.done()]
+        for future in done:
+            if future.cancelled():
+                self.cancelled += 1
+            else:
+                self.completed += 1
+        return done
+
+    def cancel(self) -> int:
+        """開始前のタスクを取り消す（実行中のタスクは完了まで待つ）
+
+        Returns:
+            取り消したタスク数
+        """
+        return sum(1 for future in self._futures if future.cancel())
+
+    def shutdown(self) -> None:
+        """待機中のタスクを取り消す（共有のプロセスプールは終了せず、アプリケーションの終了時に終了）"""
+        self.cancel()
+        self._futures = []
@@ -1,12 +1,23 @@
+import configparser
+import logging
 import os
 import subprocess
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, ttk
 
 from app import __version__
-from service.convert_png_to_ico import convert_png_to_ico
-from service.convert_svg_to_png import convert_svg_to_png
-from utils.config_manager import CONFIG_PATH, load_config
+from app.conversion_worker import ConversionWorker
+from service.batch_convert import collect_source_files, convert_file
+from service.conversion_cache import ConversionCache
+from service.worker_pool import shutdown_worker_pools
+from utils.config_manager import CONFIG_PATH, add_settings_listener, check_settings_changes, get_settings
+
+logger = logging.getLogger(__name__)
+
+# 変換結果を確認する間隔（ミリ秒）
+POLL_INTERVAL_MS = 100
+# 設定ファイルの更新を確認する間隔（ミリ秒）
+CONFIG_CHECK_INTERVAL_MS = 1000
 
 
 class IconFlowMainWindow:
@@ -14,15 +25,17 @@ class IconFlowMainWindow:
         self.root = root
         self.root.title(f"IconFlow v{__version__}")
 
-        config = load_config()
-        window_width = config.getint('Appearance', 'window_width')
-        window_height = config.getint('Appearance', 'window_height')
-        font_size = config.getint('Appearance', 'font_size')
-
-        self.root.geometry(f"{window_width}x{window_height}")
+        settings = get_settings()
+        self.root.geometry(f"{settings.window_width}x{settings.window_height}")
         self.root.resizable(False, False)
+        self.root.protocol("WM_DELETE_WINDOW", self.close_handler)
+
+        self.worker = ConversionWorker()
+        self._polling = False
+        self._output_path = None
+        self._errors = []
 
-        button_font = ("Yu Gothic UI", font_size)
+        button_font = ("Yu Gothic UI", settings.font_size)
         button_width = 20
         button_padx = 10
         button_pady = 10
@@ -54,6 +67,15 @@ class IconFlowMainWindow:
         )
         btn_svg_to_ico.pack(pady=button_pady, padx=button_padx)
 
+        btn_batch_svg_to_ico = tk.Button(
+            self.root,
+            text="フォルダ一括ico変換",
+            font=button_font,
+            width=button_width,
+            command=self.batch_convert_svg_to_ico_handler
+        )
+        btn_batch_svg_to_ico.pack(pady=button_pady, padx=button_padx)
+
         btn_open_config = tk.Button(
             self.root,
             text="設定ファイル",
@@ -63,15 +85,58 @@ class IconFlowMainWindow:
         )
         btn_open_config.pack(pady=button_pady, padx=button_padx)
 
+        self.progress_bar = ttk.Progressbar(self.root, mode='determinate', length=button_width * 10)
+        self.progress_bar.pack(pady=(button_pady, 0), padx=button_padx)
+
+        self.status_label = tk.Label(self.root, text="待機中", font=button_font)
+        self.status_label.pack(padx=button_padx)
+
+        self.btn_cancel = tk.Button(
+            self.root,
+            text="キャンセル",
+            font=button_font,
+            width=button_width,
+            state=tk.DISABLED,
+            command=self.cancel_handler
+        )
+        self.btn_cancel.pack(pady=button_pady, padx=button_padx)
+
         btn_close = tk.Button(
             self.root,
             text="閉じる",
             font=button_font,
             width=button_width,
-            command=self.root.quit
+            command=self.close_handler
         )
         btn_close.pack(pady=button_pady, padx=button_padx)
 
+        # 設定ファイルの更新時にフォントを変更するウィジェット
+        self._font_widgets = [
+            btn_svg_to_png, btn_png_to_ico, btn_svg_to_ico, btn_batch_svg_to_ico, btn_open_config,
+            self.status_label, self.btn_cancel, btn_close
+        ]
+
+    def start_config_watch(self):
+        """設定ファイルの更新の確認を開始（更新された場合はウィンドウの大きさとフォントに反映）"""
+        add_settings_listener(self._apply_settings)
+        self.root.after(CONFIG_CHECK_INTERVAL_MS, self._check_config)
+
+    def _check_config(self):
+        """設定ファイルが更新されていれば読み込み直す（tkinterのイベントループから定期的に呼び出す）"""
+        try:
+            check_settings_changes()
+        except (OSError, ValueError, configparser.Error) as e:
+            # 編集途中の設定ファイルは読み込めないことがあるため、前回の設定のまま確認を続ける
+            logger.debug("設定ファイルを読み込めませんでした: %s", e)
+        self.root.after(CONFIG_CHECK_INTERVAL_MS, self._check_config)
+
+    def _apply_settings(self, settings):
+        """読み込み直した設定をウィンドウの大きさとフォントに反映（パスやサイズは変換時に都度取得）"""
+        self.root.geometry(f"{settings.window_width}x{settings.window_height}")
+        button_font = ("Yu Gothic UI", settings.font_size)
+        for widget in self._font_widgets:
+            widget.config(font=button_font)
+
     def _select_file(self, title, filetypes, initialdir):
         """ファイル選択ダイアログを表示"""
         return filedialog.askopenfilename(
@@ -98,27 +163,78 @@ class IconFlowMainWindow:
         except Exception as e:
             messagebox.showerror("エラー", f"変換中にエラーが発生しました:\n{str(e)}")
 
+    def _submit_conversion(self, output_path, *args):
+        """変換タスクをバックグラウンドで実行し、結果の確認を開始"""
+        if not self.worker.is_busy:
+            self._errors = []
+        self._output_path = output_path
+        self.worker.submit(convert_file, *args)
+        self.btn_cancel.config(state=tk.NORMAL)
+        self._update_progress()
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self._poll_worker)
+
+    def _poll_worker(self):
+        """完了した変換結果を取得して進捗を更新（tkinterのイベントループから定期的に呼び出す）"""
+        for future in self.worker.poll():
+            if future.cancelled():
+                continue
+            exception = future.exception()
+            if exception is not None:
+                self._errors.append(f"{type(exception).__name__}: {exception}")
+                continue
+            result = future.result()
+            if not result.succeeded:
+                self._errors.append(f"{os.path.basename(result.source_path)}: {result.error}")
+        self._update_progress()
+
+        if self.worker.is_busy:
+            self.root.after(POLL_INTERVAL_MS, self._poll_worker)
+            return
+        self._polling = False
+        self._on_conversion_finished()
+
+    def _update_progress(self):
+        """プログレスバーと処理速度の表示を更新"""
+        worker = self.worker
+        self.progress_bar.config(maximum=max(worker.total, 1), value=worker.completed + worker.cancelled)
+        status = f"完了 {worker.completed}/{worker.total} ({worker.throughput:.1f}件/秒)"
+        if worker.cancelled:
+            status += f" 取消 {worker.cancelled}"
+        self.status_label.config(text=status)
+
+    def _on_conversion_finished(self):
+        """全タスク完了時の処理"""
+        self.btn_cancel.config(state=tk.DISABLED)
+        if self._errors:
+            details = "\n".join(self._errors[:10])
+            if len(self._errors) > 10:
+                details += f"\n...他 {len(self._errors) - 10} 件"
+            messagebox.showerror("エラー", f"変換中にエラーが発生しました:\n{details}")
+        elif self.worker.completed and self._output_path:
+            self._open_output_directory(self._output_path)
+
     def _process_svg_to_png_conversion(self):
         """SVG→PNG変換処理"""
-        config = load_config()
-        downloads_path = config.get('Paths', 'downloads_path')
-        output_path = config.get('Paths', 'output_path')
-        icon_size = config.getint('Icon', 'icon_size')
+        settings = get_settings()
 
         svg_file = self._select_file(
             "SVGファイルを選択",
             [("SVG files", "*.svg"), ("All files", "*.*")],
-            downloads_path
+            settings.downloads_path
         )
 
         if not svg_file:
             return
 
         base_name = self._get_base_name(svg_file)
-        png_output = os.path.join(output_path, f"{base_name}.png")
+        png_output = os.path.join(settings.output_path, f"{base_name}.png")
 
-        convert_svg_to_png(svg_file, png_output, icon_size)
-        self._open_output_directory(output_path)
+        self._submit_conversion(
+            settings.output_path, 'svg_to_png', svg_file, png_output, settings.icon_size, None, None,
+            ConversionCache.from_settings(settings)
+        )
 
     def convert_svg_to_png_handler(self):
         """SVG→PNG変換ボタンのハンドラ"""
@@ -126,25 +242,24 @@ class IconFlowMainWindow:
 
     def _process_png_to_ico_conversion(self):
         """PNG→ico変換処理"""
-        config = load_config()
-        downloads_path = config.get('Paths', 'downloads_path')
-        output_path = config.get('Paths', 'output_path')
-        ico_size = config.getint('Icon', 'ico_size')
+        settings = get_settings()
 
         png_file = self._select_file(
             "PNGファイルを選択",
             [("PNG files", "*.png"), ("All files", "*.*")],
-            downloads_path
+            settings.downloads_path
         )
 
         if not png_file:
             return
 
         base_name = self._get_base_name(png_file)
-        ico_output = os.path.join(output_path, f"{base_name}.ico")
+        ico_output = os.path.join(settings.output_path, f"{base_name}.ico")
 
-        convert_png_to_ico(png_file, ico_output, ico_size)
-        self._open_output_directory(output_path)
+        self._submit_conversion(
+            settings.output_path, 'png_to_ico', png_file, ico_output, None, settings.ico_size, list(settings.ico_sizes) or None,
+            ConversionCache.from_settings(settings)
+        )
 
     def convert_png_to_ico_handler(self):
         """PNG→ico変換ボタンのハンドラ"""
@@ -152,33 +267,66 @@ class IconFlowMainWindow:
 
     def _process_svg_to_ico_conversion(self):
         """SVG→ico変換処理"""
-        config = load_config()
-        downloads_path = config.get('Paths', 'downloads_path')
-        output_path = config.get('Paths', 'output_path')
-        icon_size = config.getint('Icon', 'icon_size')
-        ico_size = config.getint('Icon', 'ico_size')
+        settings = get_settings()
 
         svg_file = self._select_file(
             "SVGファイルを選択",
             [("SVG files", "*.svg"), ("All files", "*.*")],
-            downloads_path
+            settings.downloads_path
         )
 
         if not svg_file:
             return
 
         base_name = self._get_base_name(svg_file)
-        png_output = os.path.join(output_path, f"{base_name}.png")
-        ico_output = os.path.join(output_path, f"{base_name}.ico")
+        png_output = os.path.join(settings.output_path, f"{base_name}.png") if settings.keep_png else None
+        ico_output = os.path.join(settings.output_path, f"{base_name}.ico")
 
-        convert_svg_to_png(svg_file, png_output, icon_size)
-        convert_png_to_ico(png_output, ico_output, ico_size)
-        self._open_output_directory(output_path)
+        self._submit_conversion(
+            settings.output_path, 'svg_to_ico', svg_file, ico_output, settings.icon_size, settings.ico_size,
+            list(settings.ico_sizes) or None, ConversionCache.from_settings(settings), png_output
+        )
 
     def convert_svg_to_ico_handler(self):
         """SVG→ico変換ボタンのハンドラ"""
         self._handle_errors(self._process_svg_to_ico_conversion)
 
+    def _process_batch_svg_to_ico_conversion(self):
+        """フォルダ内の全SVG→ico変換処理"""
+        settings = get_settings()
+
+        source_dir = filedialog.askdirectory(title="SVGファイルのフォルダを選択", initialdir=settings.downloads_path)
+        if not source_dir:
+            return
+
+        svg_files = collect_source_files(source_dir, '.svg')
+        if not svg_files:
+            messagebox.showinfo("情報", f"SVGファイルが見つかりません:\n{source_dir}")
+            return
+
+        cache = ConversionCache.from_settings(settings)
+        ico_sizes = list(settings.ico_sizes) or None
+        for svg_file in svg_files:
+            ico_output = os.path.join(settings.output_path, f"{self._get_base_name(svg_file)}.ico")
+            self._submit_conversion(
+                settings.output_path, 'svg_to_ico', svg_file, ico_output, settings.icon_size, settings.ico_size, ico_sizes, cache
+            )
+
+    def batch_convert_svg_to_ico_handler(self):
+        """フォルダ一括ico変換ボタンのハンドラ"""
+        self._handle_errors(self._process_batch_svg_to_ico_conversion)
+
+    def cancel_handler(self):
+        """開始前の変換タスクを取り消す"""
+        self.worker.cancel()
+        self._update_progress()
+
+    def close_handler(self):
+        """バックグラウンドの変換を停止し、ワーカープロセスを終了してアプリを終了"""
+        self.worker.shutdown()
+        shutdown_worker_pools()
+        self.root.quit()
+
     def _process_open_config(self):
         """設定ファイルを開く処理"""
         if os.path.exists(CONFIG_PATH):
@@ -0,0 +1,55 @@
+import logging
+import os
+import time
+from typing import Optional
+
+from service.instrumentation import STAGE_FIRST_FRAME, STAGE_STARTUP_IMPORT, JsonLinesSink, StageTiming, emit
+
+logger = logging.getLogger(__name__)
+
+# 起動時間をJSON Lines形式で追記するファイル（未設定の場合はログ出力のみ）
+STARTUP_METRICS_ENV = 'ICONFLOW_STARTUP_METRICS'
+# 1の場合は初回描画の計測後にウィンドウを閉じる（ビルドした実行ファイルの起動時間の自動計測用）
+STARTUP_EXIT_ENV = 'ICONFLOW_STARTUP_EXIT'
+
+
+def track_startup(
+    root,
+    started_at: float,
+    imported_at: float,
+    metrics_path: Optional[str] = None,
+    exit_after: Optional[bool] = None
+) -> None:
+    """モジュールの読み込み時間とウィンドウの初回描画までの時間を計測
+
+    started_at・imported_atは time.perf_counter() の値です。初回描画はメインループ開始後に
+    最初にアイドル状態になった時点（ウィンドウの描画が完了した時点）とします。
+
+    Args:
+        root: tkinterのルートウィンドウ
+        started_at: 起動直後（他のモジュールの読み込み前）の時刻
+        imported_at: モジュールの読み込み完了時の時刻
+        metrics_path: 計測結果を追記するファイル（省略時は環境変数 ICONFLOW_STARTUP_METRICS）
+        exit_after: 計測後にウィンドウを閉じるか（省略時は環境変数 ICONFLOW_STARTUP_EXIT）
+    """
+    metrics_path = metrics_path or os.environ.get(STARTUP_METRICS_ENV)
+    if exit_after is None:
+        exit_after = os.environ.get(STARTUP_EXIT_ENV) == '1'
+
+    def on_first_frame() -> None:
+        timings = [
+            StageTiming(STAGE_STARTUP_IMPORT, imported_at - started_at),
+            StageTiming(STAGE_FIRST_FRAME, time.perf_counter() - started_at),
+        ]
+        sink = JsonLinesSink(metrics_path) if metrics_path else None
+        for timing in timings:
+            emit(timing)
+            if sink is not None:
+                sink(timing)
+        logger.info(
+            "起動時間: 読み込み %.0fms / 初回描画 %.0fms", timings[0].elapsed * 1000, timings[1].elapsed * 1000
+        )
+        if exit_after:
+            root.destroy()
+
+    root.after_idle(on_first_frame)
@@ -1,22 +1,174 @@
+import argparse
+import json
+import os
+import statistics
 import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, replace
+from typing import Optional
 
-from scripts.version_manager import update_version
+from app.startup import STARTUP_EXIT_ENV, STARTUP_METRICS_ENV
+from scripts.version_manager import compare_build_metrics, record_build_metrics, update_version
 
+APP_NAME = "IconFlow"
+DIST_DIR = "dist"
 
-def build_executable():
-    new_version = update_version()
-    subprocess.run([
+# 実行ファイルに含めない開発・テスト用のパッケージ（requirements.txtに含まれるが実行時には使用しない）
+# setuptools・pkg_resourcesはPyInstallerのランタイムフック・依存ライブラリが読み込む場合があるため除外しない
+DEV_EXCLUDES = (
+    'reportlab', 'svglib', 'rlPyCairo', 'cairo', 'freetype',
+    'pytest', '_pytest', 'pytest_cov', 'coverage', 'pluggy', 'iniconfig', 'pygments',
+    'pyright', 'nodeenv', 'uv', 'PyInstaller',
+)
+
+
+@dataclass(frozen=True)
+class BuildProfile:
+    """PyInstallerのビルド設定"""
+    name: str
+    excludes: tuple[str, ...] = ()
+    onefile: bool = False
+    optimize: int = 0
+
+
+BUILD_PROFILES = {
+    # 従来通りのビルド（依存ライブラリを全て含む）
+    'default': BuildProfile('default'),
+    # 開発・テスト用のパッケージを除外し、assertを除いた最適化済みバイトコードで起動を高速化
+    # （docstringも除く --optimize 2 はライブラリの動作を確認してから指定）
+    'fast': BuildProfile('fast', excludes=DEV_EXCLUDES, optimize=1),
+}
+
+
+def build_command(profile: BuildProfile) -> list[str]:
+    """PyInstallerのコマンドライン引数を作成"""
+    command = [
         "pyinstaller",
-        "--name=IconFlow",
+        f"--name={APP_NAME}",
         "--windowed",
+        "--noconfirm",
         "--icon=assets/IconFlow.ico",
         "--add-data", "utils/config.ini:.",
-        "main.py"
-    ])
+        "--onefile" if profile.onefile else "--onedir",
+    ]
+    if profile.optimize:
+        command.append(f"--optimize={profile.optimize}")
+    for module in profile.excludes:
+        command.extend(["--exclude-module", module])
+    command.append("main.py")
+    return command
+
+
+def get_executable_path(profile: BuildProfile, dist_dir: str = DIST_DIR) -> str:
+    """ビルドした実行ファイルのパス"""
+    executable = APP_NAME + (".exe" if sys.platform == "win32" else "")
+    if profile.onefile:
+        return os.path.join(dist_dir, executable)
+    return os.path.join(dist_dir, APP_NAME, executable)
+
+
+def get_bundle_size(path: str) -> tuple[int, int]:
+    """出力したファイル・フォルダの合計サイズ（バイト）とファイル数"""
+    if os.path.isfile(path):
+        return os.path.getsize(path), 1
+    total = 0
+    count = 0
+    for dir_path, _, file_names in os.walk(path):
+        for file_name in file_names:
+            total += os.path.getsize(os.path.join(dir_path, file_name))
+            count += 1
+    return total, count
+
 
-    print(f"Executable built successfully. Version: {new_version}")
+def measure_cold_start(executable: str, runs: int = 3, timeout: float = 60.0) -> dict[str, float]:
+    """実行ファイルを起動して、初回描画後に終了するまでの時間を計測
+
+    アプリ側で計測した初回描画までの時間（app/startup.py）に加え、ワンファイル形式の展開を含む
+    プロセス起動から終了までの時間を計測します。1回目をコールドスタート、2回目以降の中央値を
+    ウォームスタートとして返します。
+    """
+    wall_times = []
+    first_frames = []
+    imports = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for run in range(runs):
+            metrics_path = os.path.join(work_dir, f"startup_{run}.jsonl")
+            env = dict(os.environ, **{STARTUP_METRICS_ENV: metrics_path, STARTUP_EXIT_ENV: '1'})
+            start = time.perf_counter()
+            subprocess.run([executable], env=env, timeout=timeout, check=True)
+            wall_times.append(time.perf_counter() - start)
+            with open(metrics_path, encoding='utf-8') as f:
+                timings = {record['stage']: record['elapsed'] for record in map(json.loads, f)}
+            first_frames.append(timings['startup_first_frame'])
+            imports.append(timings['startup_import'])
+
+    warm_times = wall_times[1:] or wall_times
+    return {
+        'cold_start_ms': wall_times[0] * 1000,
+        'warm_start_ms': statistics.median(warm_times) * 1000,
+        'first_frame_ms': statistics.median(first_frames) * 1000,
+        'import_ms': statistics.median(imports) * 1000,
+    }
+
+
+def build_executable(
+    profile: Optional[BuildProfile] = None,
+    report: bool = False,
+    startup_runs: int = 3
+):
+    profile = profile or BUILD_PROFILES['default']
+    new_version = update_version()
+    subprocess.run(build_command(profile), check=True)
+
+    print(f"Executable built successfully. Version: {new_version} (profile: {profile.name})")
+    if report:
+        report_build(new_version, profile, startup_runs)
     return new_version
 
 
+def report_build(version: str, profile: BuildProfile, startup_runs: int = 3) -> dict:
+    """バンドルサイズと起動時間を計測し、リリースごとの記録に追加して前回と比較"""
+    dist_path = get_executable_path(profile) if profile.onefile else os.path.join(DIST_DIR, APP_NAME)
+    bundle_bytes, file_count = get_bundle_size(dist_path)
+    metrics = {
+        'profile': profile.name,
+        'onefile': profile.onefile,
+        'bundle_bytes': bundle_bytes,
+        'file_count': file_count,
+    }
+    metrics.update(measure_cold_start(get_executable_path(profile), startup_runs))
+
+    print(f"バンドルサイズ: {bundle_bytes / 1024 / 1024:.1f}MB ({file_count}ファイル)")
+    print(
+        f"起動時間: コールド {metrics['cold_start_ms']:.0f}ms / ウォーム {metrics['warm_start_ms']:.0f}ms "
+        f"(初回描画 {metrics['first_frame_ms']:.0f}ms、読み込み {metrics['import_ms']:.0f}ms)"
+    )
+    previous = record_build_metrics(version, metrics)
+    if previous is not None:
+        for line in compare_build_metrics(previous, metrics):
+            print(line)
+    return metrics
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="IconFlow 実行ファイルのビルド")
+    parser.add_argument("--profile", choices=list(BUILD_PROFILES), default='default', help="ビルド設定 (デフォルト: default)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--onefile", action="store_true", default=None, help="1つの実行ファイルにまとめる")
+    mode.add_argument("--onedir", dest="onefile", action="store_false", help="フォルダ形式で出力（起動が速い）")
+    parser.add_argument("--optimize", type=int, choices=[0, 1, 2], help="バイトコードの最適化レベル（設定の値を上書き）")
+    parser.add_argument("--report", action="store_true", help="バンドルサイズと起動時間を計測して記録")
+    parser.add_argument("--startup-runs", type=int, default=3, help="起動時間の計測回数 (デフォルト: 3)")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    build_executable()
+    args = parse_args()
+    selected = BUILD_PROFILES[args.profile]
+    if args.onefile is not None:
+        selected = replace(selected, onefile=args.onefile)
+    if args.optimize is not None:
+        selected = replace(selected, optimize=args.optimize)
+    build_executable(selected, args.report, args.startup_runs)
@@ -0,0 +1,456 @@
+"""IconFlowのコマンドラインエントリーポイント（tkinterを使用しないヘッドレス実行用）
+
+使用例:
+    python cli.py convert svg2ico "icons/*.svg" -o output --size 256 --ico-size 128 --jobs 8
+    python cli.py run icons.toml --jobs 8
+    python cli.py atlas icons -o sprites --size 32 --max-size 1024
+    python cli.py daemon serve --jobs 4
+    python cli.py send svg2ico icon.svg -o icon.ico
+"""
+import argparse
+import configparser
+import os
+import sys
+from typing import TYPE_CHECKING, Optional
+
+from service.conversion_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, ConversionCache
+from utils.config_manager import get_settings
+from utils.logging_config import setup_logging
+
+if TYPE_CHECKING:
+    from service.batch_convert import BatchReport
+
+# CLIの変換モード名と一括変換APIのモード名の対応
+CONVERT_MODES = {
+    'svg2png': 'svg_to_png',
+    'png2ico': 'png_to_ico',
+    'svg2ico': 'svg_to_ico',
+}
+
+DEFAULT_ICON_SIZE = 128
+DEFAULT_ICO_SIZE = 128
+
+
+def _load_defaults() -> dict:
+    """config.iniから既定値を読み込む（読み込めない場合は組み込みの既定値を使用）"""
+    defaults = {
+        'output_dir': None, 'icon_size': DEFAULT_ICON_SIZE, 'ico_size': DEFAULT_ICO_SIZE, 'ico_sizes': None,
+        'cache': None, 'log_level': None, 'memory_budget_mb': 0,
+        'max_tasks_per_child': None, 'worker_rss_limit_mb': None, 'daemon_port': None
+    }
+    try:
+        settings = get_settings()
+    except (FileNotFoundError, configparser.Error):
+        return defaults
+    except ValueError as e:
+        print(f"警告: config.iniの値が不正なため組み込みの既定値を使用します: {e}", file=sys.stderr)
+        return defaults
+    defaults.update(
+        output_dir=settings.output_path or None, icon_size=settings.icon_size, ico_size=settings.ico_size,
+        ico_sizes=list(settings.ico_sizes) or None, cache=ConversionCache.from_settings(settings),
+        log_level=settings.log_level, memory_budget_mb=settings.memory_budget_mb,
+        max_tasks_per_child=settings.max_tasks_per_child, worker_rss_limit_mb=settings.worker_rss_limit_mb,
+        daemon_port=settings.daemon_port
+    )
+    return defaults
+
+
+def _parse_sizes(value: str) -> list[int]:
+    """カンマ区切りのサイズ指定（例: '16,32,48'）を解析"""
+    try:
+        return [int(size) for size in value.split(',') if size.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"サイズの指定が不正です: {value}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="iconflow", description="SVG/PNG/ICO変換ツール（ヘッドレス版）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # 全サブコマンド共通のログ出力オプション
+    log_options = argparse.ArgumentParser(add_help=False)
+    log_group = log_options.add_mutually_exclusive_group()
+    log_group.add_argument("-q", "--quiet", action="store_true", help="警告・エラーのみ出力する")
+    log_group.add_argument("-v", "--verbose", action="store_true", help="ファイルごとの詳細なログを出力する")
+
+    convert_parser = subparsers.add_parser("convert", help="ファイルを一括変換", parents=[log_options])
+    convert_parser.add_argument("mode", choices=sorted(CONVERT_MODES), help="変換モード")
+    convert_parser.add_argument("inputs", nargs="+", help="入力ファイル、ディレクトリまたはglobパターン")
+    convert_parser.add_argument("-o", "--output-dir", help="出力ディレクトリ (デフォルト: config.iniのoutput_path)")
+    convert_parser.add_argument("--size", type=int, help="SVGラスタライズ時のサイズ (デフォルト: config.iniのicon_size)")
+    convert_parser.add_argument("--ico-size", type=int, help="ICOのサイズ (デフォルト: config.iniのico_size)")
+    convert_parser.add_argument(
+        "--ico-sizes", type=_parse_sizes,
+        help="マルチサイズICOのサイズ（カンマ区切り、例: 16,32,48） (デフォルト: config.iniのico_sizes)"
+    )
+    convert_parser.add_argument("-j", "--jobs", type=int, help="並列ワーカー数 (デフォルト: CPUコア数)")
+    convert_parser.add_argument(
+        "--incremental", action="store_true",
+        help="出力が入力より新しく同じ設定で作成済みのファイルは変換しない"
+    )
+    cache_group = convert_parser.add_mutually_exclusive_group()
+    cache_group.add_argument("--cache-dir", help="変換結果キャッシュを使用するディレクトリ (デフォルト: config.iniの[Cache])")
+    cache_group.add_argument("--no-cache", action="store_true", help="変換結果キャッシュを使用しない")
+    convert_parser.add_argument(
+        "--memory-budget", type=int, metavar="MB",
+        help="同時に実行するタスクの見積もりメモリ量の上限（MB、0で制限なし） (デフォルト: config.iniのmemory_budget_mb)"
+    )
+    convert_parser.add_argument("--timings", help="段階ごとの所要時間をJSON Lines形式で追記するファイル（終了時に集計を表示）")
+    convert_parser.add_argument("--profile-dir", help="時間のかかったファイルのcProfile結果（.prof）を保存するディレクトリ")
+    convert_parser.add_argument(
+        "--profile-threshold", type=float, default=1.0,
+        help="プロファイルを保存する1ファイルあたりの所要時間（秒） (デフォルト: 1.0)"
+    )
+
+    run_parser = subparsers.add_parser("run", help="ジョブマニフェスト（TOML/JSON）の変換を一括実行", parents=[log_options])
+    run_parser.add_argument("manifest", help="ジョブマニフェストのファイル（.toml / .json）")
+    run_parser.add_argument("-j", "--jobs", type=int, help="並列ワーカー数 (デフォルト: CPUコア数)")
+    run_parser.add_argument("--result", help="結果マニフェストの出力先 (デフォルト: <マニフェスト名>.result.json)")
+    run_parser.add_argument(
+        "--memory-budget", type=int, metavar="MB",
+        help="同時に実行する工程の見積もりメモリ量の上限（MB、0で制限なし） (デフォルト: config.iniのmemory_budget_mb)"
+    )
+    run_cache_group = run_parser.add_mutually_exclusive_group()
+    run_cache_group.add_argument("--cache-dir", help="変換結果キャッシュを使用するディレクトリ (デフォルト: config.iniの[Cache])")
+    run_cache_group.add_argument("--no-cache", action="store_true", help="変換結果キャッシュを使用しない")
+
+    atlas_parser = subparsers.add_parser("atlas", help="SVGをラスタライズしてスプライトシートと座標のインデックスを出力", parents=[log_options])
+    atlas_parser.add_argument("inputs", nargs="+", help="入力SVGファイル、ディレクトリまたはglobパターン")
+    atlas_parser.add_argument("-o", "--output-dir", help="出力ディレクトリ (デフォルト: config.iniのoutput_path)")
+    atlas_parser.add_argument("--size", type=int, help="ラスタライズするサイズ (デフォルト: config.iniのicon_size)")
+    atlas_parser.add_argument(
+        "--sizes", type=_parse_sizes, help="複数サイズを出力する場合のサイズ（カンマ区切り、画像名に @サイズ を付ける）"
+    )
+    atlas_parser.add_argument("--max-size", type=int, default=2048, help="シートの一辺の最大サイズ (デフォルト: 2048)")
+    atlas_parser.add_argument("--padding", type=int, default=1, help="画像の間隔（ピクセル） (デフォルト: 1)")
+    atlas_parser.add_argument("--name", default="atlas", help="出力ファイル名（拡張子なし） (デフォルト: atlas)")
+    atlas_parser.add_argument("--css-prefix", default="icon", help="CSSのクラス名の接頭辞 (デフォルト: icon)")
+    atlas_parser.add_argument("--power-of-two", action="store_true", help="シートの幅・高さを2のべき乗に切り上げる")
+    atlas_parser.add_argument("-j", "--jobs", type=int, help="並列ワーカー数 (デフォルト: CPUコア数)")
+    atlas_cache_group = atlas_parser.add_mutually_exclusive_group()
+    atlas_cache_group.add_argument("--cache-dir", help="変換結果キャッシュを使用するディレクトリ (デフォルト: config.iniの[Cache])")
+    atlas_cache_group.add_argument("--no-cache", action="store_true", help="変換結果キャッシュを使用しない")
+
+    watch_parser = subparsers.add_parser("watch", help="フォルダを監視して追加されたファイルを自動変換", parents=[log_options])
+    watch_parser.add_argument("-i", "--input-dir", help="監視するフォルダ (デフォルト: config.iniのdownloads_path)")
+    watch_parser.add_argument("-o", "--output-dir", help="出力ディレクトリ (デフォルト: config.iniのoutput_path)")
+    watch_parser.add_argument("-j", "--jobs", type=int, help="並列ワーカー数 (デフォルト: CPUコア数)")
+    watch_parser.add_argument("--max-pending", type=int, help="同時に投入する変換タスクの上限 (デフォルト: ワーカー数の2倍)")
+    watch_parser.add_argument("--interval", type=float, help="フォルダを確認する間隔（秒） (デフォルト: config.iniのpoll_interval)")
+    watch_parser.add_argument("--settle", type=float, help="書き込み完了とみなすまでの秒数 (デフォルト: config.iniのsettle_seconds)")
+    watch_parser.add_argument("--existing", action="store_true", help="監視開始時に既に存在するファイルも変換する")
+
+    daemon_parser = subparsers.add_parser("daemon", help="変換デーモンの起動・停止・状態表示", parents=[log_options])
+    daemon_parser.add_argument("action", choices=["serve", "stop", "status"], help="実行する操作（serveは終了するまで待ち受け）")
+    daemon_parser.add_argument("--host", help="待ち受けるアドレス（ループバックアドレスのみ） (デフォルト: 127.0.0.1)")
+    daemon_parser.add_argument("--port", type=int, help="待ち受けるポート番号 (デフォルト: config.iniの[Daemon]のport)")
+    daemon_parser.add_argument("-j", "--jobs", type=int, help="並列ワーカー数（1の場合はデーモンのプロセスで変換） (デフォルト: CPUコア数)")
+    daemon_parser.add_argument(
+        "--output-root", help="ファイルを指定した変換で出力できるフォルダ（この外には書き込まない） (デフォルト: config.iniのoutput_path)"
+    )
+    daemon_cache_group = daemon_parser.add_mutually_exclusive_group()
+    daemon_cache_group.add_argument("--cache-dir", help="変換結果キャッシュを使用するディレクトリ (デフォルト: config.iniの[Cache])")
+    daemon_cache_group.add_argument("--no-cache", action="store_true", help="変換結果キャッシュを使用しない")
+
+    send_parser = subparsers.add_parser("send", help="起動中の変換デーモンにファイルの変換を依頼", parents=[log_options])
+    send_parser.add_argument("mode", choices=sorted(CONVERT_MODES), help="変換モード")
+    send_parser.add_argument("input", help="入力ファイル（-の場合は標準入力から読み込む）")
+    send_parser.add_argument("-o", "--output", help="出力ファイル（入力が標準入力で省略した場合は標準出力へ書き込む）")
+    send_parser.add_argument("--size", type=int, help="SVGラスタライズ時のサイズ (デフォルト: デーモンの設定)")
+    send_parser.add_argument("--ico-size", type=int, help="ICOのサイズ (デフォルト: デーモンの設定)")
+    send_parser.add_argument("--ico-sizes", type=_parse_sizes, help="マルチサイズICOのサイズ（カンマ区切り） (デフォルト: デーモンの設定)")
+    send_parser.add_argument("--host", help="デーモンのアドレス (デフォルト: 127.0.0.1)")
+    send_parser.add_argument("--port", type=int, help="デーモンのポート番号 (デフォルト: config.iniの[Daemon]のport)")
+
+    cache_parser = subparsers.add_parser("cache", help="変換結果キャッシュの統計表示・削除", parents=[log_options])
+    cache_parser.add_argument("action", choices=["stats", "clear"], help="実行する操作")
+    cache_parser.add_argument("--cache-dir", help="キャッシュディレクトリ (デフォルト: config.iniの[Cache])")
+    return parser
+
+
+def _resolve_cache(args: argparse.Namespace, defaults: dict) -> Optional[ConversionCache]:
+    """コマンドライン引数とconfig.iniから使用するキャッシュを決定"""
+    if getattr(args, 'no_cache', False):
+        return None
+    if args.cache_dir:
+        max_bytes = defaults['cache'].max_bytes if defaults['cache'] is not None else DEFAULT_MAX_BYTES
+        return ConversionCache(args.cache_dir, max_bytes)
+    return defaults['cache']
+
+
+def _report_cache_usage(cache: Optional[ConversionCache], report: 'BatchReport') -> None:
+    """変換したファイルのキャッシュヒット数を表示し、キャッシュディレクトリの累計に加算"""
+    if cache is None:
+        return
+    converted = [result for result in report.results if result.succeeded and not result.skipped]
+    hits = sum(1 for result in converted if result.cache_hit)
+    print(f"キャッシュ: ヒット {hits} / {len(converted)} 件")
+    try:
+        cache.record_usage(hits, len(converted) - hits)
+    except OSError as e:
+        print(f"警告: キャッシュの統計を保存できません: {e}", file=sys.stderr)
+
+
+def _resolve_memory_budget(args: argparse.Namespace, defaults: dict) -> Optional[int]:
+    """コマンドライン引数とconfig.iniからメモリ予算（バイト、制限なしの場合はNone）を決定"""
+    budget_mb = args.memory_budget if args.memory_budget is not None else defaults.get('memory_budget_mb', 0)
+    return budget_mb * 1024 * 1024 if budget_mb > 0 else None
+
+
+def _configure_workers(defaults: dict) -> None:
+    """config.iniの[Batch]の設定をワーカープロセスの入れ替え条件に適用"""
+    from service.worker_pool import configure_worker_pools
+
+    rss_limit_mb = defaults.get('worker_rss_limit_mb')
+    configure_worker_pools(
+        defaults.get('max_tasks_per_child'), rss_limit_mb * 1024 * 1024 if rss_limit_mb is not None else None
+    )
+
+
+def run_convert(args: argparse.Namespace, defaults: dict) -> int:
+    output_dir = args.output_dir or defaults['output_dir']
+    if not output_dir:
+        print("エラー: 出力ディレクトリが指定されていません (-o/--output-dir)", file=sys.stderr)
+        return 2
+
+    # --ico-sizeのみ指定された場合は単一サイズのICOを出力する
+    ico_sizes = args.ico_sizes
+    if ico_sizes is None and args.ico_size is None:
+        ico_sizes = defaults['ico_sizes']
+
+    # 重い変換ライブラリは実行時に読み込み、--help等の起動を速くする
+    from service.batch_convert import batch_convert
+    from service.instrumentation import CountersRegistry, JsonLinesSink, add_sink, remove_sink
+
+    counters = CountersRegistry()
+    sinks = [JsonLinesSink(args.timings), counters] if args.timings else []
+    for sink in sinks:
+        add_sink(sink)
+    cache = _resolve_cache(args, defaults)
+    try:
+        report = batch_convert(
+            args.inputs,
+            output_dir,
+            mode=CONVERT_MODES[args.mode],
+            icon_size=args.size or defaults['icon_size'],
+            ico_size=args.ico_size or defaults['ico_size'],
+            max_workers=args.jobs,
+            ico_sizes=ico_sizes,
+            cache=cache,
+            incremental=args.incremental,
+            profile_dir=args.profile_dir,
+            profile_threshold=args.profile_threshold,
+            memory_budget=_resolve_memory_budget(args, defaults)
+        )
+    finally:
+        for sink in sinks:
+            remove_sink(sink)
+    if sinks:
+        print(f"段階ごとの所要時間:\n{counters.format_summary()}")
+    _report_cache_usage(cache, report)
+
+    for result in report.failed:
+        print(f"失敗: {result.source_path}: {result.error}", file=sys.stderr)
+    if not report.results:
+        print("警告: 入力に一致するファイルがありません", file=sys.stderr)
+    return 1 if report.failed else 0
+
+
+def run_manifest(args: argparse.Namespace, defaults: dict) -> int:
+    from service.job_manifest import (
+        JobDefaults,
+        build_result_manifest,
+        load_job_manifest,
+        run_job_manifest,
+        write_result_manifest,
+    )
+
+    job_defaults = JobDefaults(
+        defaults['output_dir'], defaults['icon_size'], defaults['ico_size'], tuple(defaults['ico_sizes'] or ())
+    )
+    try:
+        manifest = load_job_manifest(args.manifest, job_defaults)
+    except (OSError, ValueError) as e:
+        print(f"エラー: マニフェストを読み込めません: {e}", file=sys.stderr)
+        return 2
+
+    cache = _resolve_cache(args, defaults)
+    report = run_job_manifest(manifest, cache, args.jobs, _resolve_memory_budget(args, defaults))
+    result_path = args.result or f"{os.path.splitext(args.manifest)[0]}.result.json"
+    write_result_manifest(result_path, build_result_manifest(manifest, report))
+
+    for result in report.failed:
+        print(f"失敗: {result.source_path} -> {result.output_path}: {result.error}", file=sys.stderr)
+    _report_cache_usage(cache, report)
+    print(f"結果マニフェスト: {result_path}")
+    return 1 if report.failed else 0
+
+
+def run_atlas(args: argparse.Namespace, defaults: dict) -> int:
+    output_dir = args.output_dir or defaults['output_dir']
+    if not output_dir:
+        print("エラー: 出力ディレクトリが指定されていません (-o/--output-dir)", file=sys.stderr)
+        return 2
+
+    from service.sprite_atlas import build_atlas
+
+    try:
+        report = build_atlas(
+            args.inputs,
+            output_dir,
+            size=args.size or defaults['icon_size'],
+            sizes=args.sizes,
+            max_size=args.max_size,
+            padding=args.padding,
+            name=args.name,
+            css_prefix=args.css_prefix,
+            power_of_two=args.power_of_two,
+            cache=_resolve_cache(args, defaults),
+            max_workers=args.jobs
+        )
+    except ValueError as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        return 2
+
+    for result in report.failed:
+        print(f"失敗: {result.source_path}: {result.error}", file=sys.stderr)
+    if not report.sprites and not report.failed:
+        print("警告: 入力に一致するSVGファイルがありません", file=sys.stderr)
+        return 0
+    print(f"アトラス: {len(report.sprites)} 件 / {len(report.sheets)} 枚 -> {report.index_path}")
+    return 1 if report.failed else 0
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    from service.watch_folder import FolderWatcher
+
+    try:
+        settings = get_settings()
+    except (FileNotFoundError, configparser.Error):
+        print("エラー: フォルダ監視にはconfig.iniが必要です", file=sys.stderr)
+        return 2
+
+    watcher = FolderWatcher.from_settings(
+        settings,
+        watch_dir=args.input_dir,
+        output_dir=args.output_dir,
+        max_workers=args.jobs,
+        max_pending=args.max_pending,
+        poll_interval=args.interval,
+        settle_seconds=args.settle,
+        process_existing=args.existing
+    )
+    watcher.run()
+    return 0
+
+
+def _daemon_address(args: argparse.Namespace, defaults: dict) -> tuple[str, int]:
+    from service.daemon_client import DEFAULT_HOST, DEFAULT_PORT
+
+    return args.host or DEFAULT_HOST, args.port or defaults.get('daemon_port') or DEFAULT_PORT
+
+
+def run_daemon(args: argparse.Namespace, defaults: dict) -> int:
+    from service.daemon_client import DaemonClient, DaemonError
+
+    host, port = _daemon_address(args, defaults)
+    if args.action == "serve":
+        from service.conversion_daemon import ConversionDaemon
+
+        try:
+            daemon = ConversionDaemon(
+                host, port, defaults['icon_size'], defaults['ico_size'], defaults['ico_sizes'],
+                _resolve_cache(args, defaults), args.jobs, output_root=args.output_root or defaults['output_dir']
+            )
+        except (OSError, ValueError) as e:
+            print(f"エラー: 変換デーモンを開始できません: {host}:{port}: {e}", file=sys.stderr)
+            return 2
+        daemon.serve_forever()
+        return 0
+
+    with DaemonClient(host, port) as client:
+        try:
+            if args.action == "stop":
+                client.shutdown()
+                print(f"変換デーモンを終了しました: {host}:{port}")
+            else:
+                status = client.health()
+                print(f"変換デーモン: {host}:{port} (pid {status['pid']}, ワーカー {status['workers']}, 処理件数 {status['requests']})")
+        except (OSError, DaemonError) as e:
+            print(f"エラー: 変換デーモンに接続できません: {host}:{port}: {e}", file=sys.stderr)
+            return 1
+    return 0
+
+
+def run_send(args: argparse.Namespace, defaults: dict) -> int:
+    from service.daemon_client import DaemonClient, DaemonError
+
+    mode = CONVERT_MODES[args.mode]
+    if args.input != "-" and not args.output:
+        print("エラー: 出力ファイルが指定されていません (-o/--output)", file=sys.stderr)
+        return 2
+
+    with DaemonClient(*_daemon_address(args, defaults)) as client:
+        try:
+            if args.input != "-":
+                client.convert_file(mode, args.input, args.output, args.size, args.ico_size, args.ico_sizes)
+                return 0
+            data = client.convert_data(mode, sys.stdin.buffer.read(), args.size, args.ico_size, args.ico_sizes)
+        except DaemonError as e:
+            print(f"失敗: {args.input}: {e}", file=sys.stderr)
+            return 1
+        except OSError as e:
+            print(f"エラー: 変換デーモンに接続できません: {e}", file=sys.stderr)
+            return 2
+
+    if args.output:
+        with open(args.output, 'wb') as f:
+            f.write(data)
+    else:
+        sys.stdout.buffer.write(data)
+    return 0
+
+
+def run_cache(args: argparse.Namespace, defaults: dict) -> int:
+    cache = _resolve_cache(args, defaults) or ConversionCache(DEFAULT_CACHE_DIR)
+    if args.action == "clear":
+        cache.clear()
+        print(f"キャッシュを削除しました: {cache.cache_dir}")
+        return 0
+
+    stats = cache.stats()
+    print(f"キャッシュ: {cache.cache_dir}")
+    print(f"エントリ数: {stats.entries}")
+    usage = cache.load_usage()
+    print(f"ヒット率: {usage.hit_rate:.1%}（ヒット {usage.hits} / ミス {usage.misses}、convert・runの累計）")
+    print(f"合計サイズ: {stats.total_bytes / (1024 * 1024):.1f}MB / 上限 {cache.max_bytes / (1024 * 1024):.0f}MB")
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    defaults = _load_defaults()
+    setup_logging('DEBUG' if args.verbose else defaults.get('log_level'), quiet=args.quiet)
+    if args.command in ("convert", "run", "atlas", "watch", "daemon"):
+        _configure_workers(defaults)
+    if args.command == "convert":
+        return run_convert(args, defaults)
+    if args.command == "run":
+        return run_manifest(args, defaults)
+    if args.command == "atlas":
+        return run_atlas(args, defaults)
+    if args.command == "watch":
+        return run_watch(args)
+    if args.command == "daemon":
+        return run_daemon(args, defaults)
+    if args.command == "send":
+        return run_send(args, defaults)
+    if args.command == "cache":
+        return run_cache(args, defaults)
+    parser.error(f"不明なコマンドです: {args.command}")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
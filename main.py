@@ -1,8 +1,30 @@
-import tkinter as tk
+import time
 
-from app.main_window import IconFlowMainWindow
+# 起動時間の計測の基準（他のモジュールを読み込む前に記録）
+STARTED_AT = time.perf_counter()
+
+import multiprocessing  # noqa: E402
+import tkinter as tk  # noqa: E402
+
+from app.main_window import IconFlowMainWindow  # noqa: E402
+from app.startup import track_startup  # noqa: E402
+from service.worker_pool import configure_worker_pools_from_settings, get_worker_pool  # noqa: E402
+from utils.config_manager import get_settings  # noqa: E402
+from utils.logging_config import setup_logging  # noqa: E402
+
+IMPORTED_AT = time.perf_counter()
 
 if __name__ == "__main__":
+    # PyInstallerでビルドした実行ファイルから変換用のワーカープロセスを起動するために必要
+    multiprocessing.freeze_support()
+    settings = get_settings()
+    setup_logging(settings.log_level)
+    configure_worker_pools_from_settings(settings)
     root = tk.Tk()
-    IconFlowMainWindow(root)
+    window = IconFlowMainWindow(root)
+    # 設定ファイルを編集した場合は再起動せずにウィンドウへ反映する
+    window.start_config_watch()
+    track_startup(root, STARTED_AT, IMPORTED_AT)
+    # 初回描画の計測後にワーカーを起動して変換ライブラリを読み込み、最初の変換を待たせない
+    root.after_idle(get_worker_pool().warm_up)
     root.mainloop()
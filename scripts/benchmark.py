@@ -0,0 +1,389 @@
+"""SVG→PNG・PNG→ICO変換のベンチマーク
+
+再現可能なSVGコーパス（パス数・グラデーション・フィルタ・テキストの組み合わせ）を生成し、
+変換の各段階のレイテンシ（パーセンタイル）、処理速度（件/秒）、ピークメモリ使用量を計測します。
+結果はJSONで保存でき、2回分の結果を比較して性能の低下を検出できます。
+
+使用例:
+    python -m scripts.benchmark run -o before.json
+    python -m scripts.benchmark run -o after.json
+    python -m scripts.benchmark compare before.json after.json --threshold 10
+
+起動時間（GUI・CLIのモジュールの読み込み時間）も新しいプロセスで計測し、段階の1つとして比較します。
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional, TypeVar, cast
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import cairosvg
+from PIL import Image
+
+from service.conversion_cache import get_library_versions
+from service.convert_png_to_ico import convert_png_to_ico
+from service.convert_svg_to_png import convert_svg_to_png
+from service.memory_budget import get_peak_rss
+from service.resize_strategy import resize_image
+
+BENCHMARK_VERSION = 1
+DEFAULT_SIZES = [16, 32, 48, 64, 128, 256, 512, 1024]
+DEFAULT_ICO_SIZE = 128
+DEFAULT_THRESHOLD_PERCENT = 10.0
+
+T = TypeVar('T')
+
+# 起動時間を計測するモジュールと段階名
+STARTUP_MODULES = {'app.main_window': 'startup_gui_import', 'cli': 'startup_cli_import'}
+# 起動時に読み込まれていないことを確認する重いモジュール（変換時に初めて読み込む）
+HEAVY_MODULES = ('cairosvg', 'cairocffi', 'cffi', 'lxml', 'tinycss2', 'cssselect2', 'PIL')
+_STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import importlib
+importlib.import_module(sys.argv[1])
+elapsed = time.perf_counter() - start
+heavy = [name for name in json.loads(sys.argv[2]) if name in sys.modules]
+print(json.dumps({'elapsed': elapsed, 'heavy_modules': heavy}))
+'''
+PERCENTILES = (50, 90, 99)
+
+# コーパスの複雑さの種類: 名前 -> (パス数, グラデーション, フィルタ, テキスト)
+COMPLEXITY_PROFILES = {
+    'simple': (4, False, False, False),
+    'paths': (200, False, False, False),
+    'gradient': (20, True, False, False),
+    'filter': (20, False, True, False),
+    'text': (10, False, False, True),
+    'complex': (100, True, True, True),
+}
+
+
+@dataclass
+class SvgSample:
+    """ベンチマーク用のSVG（生成元の条件付き）"""
+    name: str
+    profile: str
+    size: int
+    data: bytes
+
+
+def generate_svg(profile: str, size: int, seed: int = 0) -> bytes:
+    """指定した複雑さとサイズのSVGを生成（同じ引数なら常に同じ内容）"""
+    path_count, use_gradient, use_filter, use_text = COMPLEXITY_PROFILES[profile]
+    rng = random.Random(f"{seed}:{profile}:{size}")
+    fill = "url(#grad)" if use_gradient else "#3366cc"
+    filter_attr = ' filter="url(#blur)"' if use_filter else ''
+
+    defs = []
+    if use_gradient:
+        defs.append(
+            '<linearGradient id="grad" x1="0" y1="0" x2="1" y2="1">'
+            '<stop offset="0" stop-color="#ff6600"/><stop offset="1" stop-color="#0066ff" stop-opacity="0.6"/>'
+            '</linearGradient>'
+        )
+    if use_filter:
+        defs.append(f'<filter id="blur"><feGaussianBlur stdDeviation="{max(size / 128, 0.5):.2f}"/></filter>')
+
+    elements = []
+    for _ in range(path_count):
+        points = " ".join(
+            f"{rng.uniform(0, size):.1f},{rng.uniform(0, size):.1f}" for _ in range(rng.randint(3, 8))
+        )
+        elements.append(f'<path d="M {points} Z" fill="{fill}" fill-opacity="0.5"{filter_attr}/>')
+    if use_text:
+        elements.append(
+            f'<text x="{size / 10:.1f}" y="{size / 2:.1f}" font-family="sans-serif" '
+            f'font-size="{max(size / 5, 4):.1f}" fill="#222222">IconFlow</text>'
+        )
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {size} {size}">'
+        f'<defs>{"".join(defs)}</defs>{"".join(elements)}</svg>'
+    ).encode('utf-8')
+
+
+def generate_corpus(sizes: list[int], profiles: Optional[list[str]] = None, seed: int = 0) -> list[SvgSample]:
+    """全ての複雑さ×サイズの組み合わせのSVGコーパスを生成"""
+    return [
+        SvgSample(f"{profile}_{size}", profile, size, generate_svg(profile, size, seed))
+        for profile in (profiles or list(COMPLEXITY_PROFILES))
+        for size in sizes
+    ]
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """線形補間によるパーセンタイル"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    """レイテンシ（秒）の一覧をミリ秒単位の統計値に集計"""
+    summary = {f"p{p}_ms": percentile(latencies, p) * 1000 for p in PERCENTILES}
+    total = sum(latencies)
+    summary['mean_ms'] = total / len(latencies) * 1000 if latencies else 0.0
+    summary['files_per_sec'] = len(latencies) / total if total > 0 else 0.0
+    summary['count'] = len(latencies)
+    return summary
+
+
+def _measure(func: Callable[[], T], iterations: int) -> tuple[list[float], T]:
+    """funcをiterations回（最低1回）実行し、各回の所要時間と最後の戻り値を返す"""
+    start = time.perf_counter()
+    result = func()
+    latencies = [time.perf_counter() - start]
+    for _ in range(iterations - 1):
+        start = time.perf_counter()
+        result = func()
+        latencies.append(time.perf_counter() - start)
+    return latencies, result
+
+
+def _render_png(svg_data: bytes) -> bytes:
+    # write_toを指定しない場合、svg2pngはPNGのバイト列を返す
+    return cast(bytes, cairosvg.svg2png(bytestring=svg_data))
+
+
+def _decode_png(png_data: bytes) -> Image.Image:
+    image = Image.open(io.BytesIO(png_data))
+    image.load()
+    return image
+
+
+def _encode_ico(image: Image.Image, ico_size: int) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format='ICO', sizes=[(ico_size, ico_size)])
+    return buffer.getvalue()
+
+
+def measure_startup(iterations: int = 3) -> tuple[dict[str, list[float]], dict[str, list[str]]]:
+    """GUI・CLIのモジュールを新しいPythonプロセスで読み込み、読み込み時間を計測
+
+    Returns:
+        段階名ごとの読み込み時間（秒）の一覧と、読み込み時点で読み込まれていた重いモジュールの一覧
+    """
+    latencies: dict[str, list[float]] = {}
+    heavy_modules: dict[str, list[str]] = {}
+    for module, stage in STARTUP_MODULES.items():
+        latencies[stage] = []
+        for _ in range(iterations):
+            completed = subprocess.run(
+                [sys.executable, '-c', _STARTUP_SCRIPT, module, json.dumps(HEAVY_MODULES)],
+                cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+            )
+            measured = json.loads(completed.stdout.strip().splitlines()[-1])
+            latencies[stage].append(measured['elapsed'])
+            heavy_modules[stage] = measured['heavy_modules']
+    return latencies, heavy_modules
+
+
+def run_benchmark(
+    sizes: Optional[list[int]] = None,
+    profiles: Optional[list[str]] = None,
+    iterations: int = 3,
+    ico_size: int = DEFAULT_ICO_SIZE,
+    seed: int = 0
+) -> dict:
+    """コーパスを生成して各段階と変換関数全体の所要時間を計測
+
+    段階ごとの計測（svg_render・png_decode・resize・ico_encode）はライブラリを直接呼び出し、
+    svg_to_png・png_to_icoはservice配下の変換関数をファイル入出力込みで計測します。
+    """
+    corpus = generate_corpus(sizes or DEFAULT_SIZES, profiles, seed)
+    stages: dict[str, list[float]] = {
+        'svg_render': [], 'png_decode': [], 'resize': [], 'ico_encode': [], 'svg_to_png': [], 'png_to_ico': []
+    }
+    per_sample = {}
+    started = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as work_dir, contextlib.redirect_stdout(io.StringIO()):
+        for sample in corpus:
+            svg_path = os.path.join(work_dir, f"{sample.name}.svg")
+            png_path = os.path.join(work_dir, f"{sample.name}.png")
+            ico_path = os.path.join(work_dir, f"{sample.name}.ico")
+            with open(svg_path, 'wb') as f:
+                f.write(sample.data)
+
+            render, png_data = _measure(lambda: _render_png(sample.data), iterations)
+            decode, image = _measure(lambda: _decode_png(png_data), iterations)
+            resize, resized = _measure(
+                lambda: resize_image(image, ico_size), iterations
+            )
+            encode, _ = _measure(lambda: _encode_ico(resized, ico_size), iterations)
+            svg_to_png, _ = _measure(lambda: convert_svg_to_png(svg_path, png_path, sample.size), iterations)
+            png_to_ico, _ = _measure(lambda: convert_png_to_ico(png_path, ico_path, ico_size), iterations)
+
+            for stage, latencies in (
+                ('svg_render', render), ('png_decode', decode), ('resize', resize),
+                ('ico_encode', encode), ('svg_to_png', svg_to_png), ('png_to_ico', png_to_ico)
+            ):
+                stages[stage].extend(latencies)
+            per_sample[sample.name] = {
+                'profile': sample.profile,
+                'size': sample.size,
+                'svg_bytes': len(sample.data),
+                'png_bytes': len(png_data),
+                'svg_render_p50_ms': percentile(render, 50) * 1000,
+                'svg_to_png_p50_ms': percentile(svg_to_png, 50) * 1000,
+                'png_to_ico_p50_ms': percentile(png_to_ico, 50) * 1000,
+            }
+
+    startup, heavy_modules = measure_startup(iterations)
+    stages.update(startup)
+
+    return {
+        'version': BENCHMARK_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'libraries': get_library_versions(),
+        },
+        'config': {
+            'sizes': sizes or DEFAULT_SIZES,
+            'profiles': profiles or list(COMPLEXITY_PROFILES),
+            'iterations': iterations,
+            'ico_size': ico_size,
+            'seed': seed,
+        },
+        'elapsed': time.perf_counter() - started,
+        'peak_rss_bytes': get_peak_rss(),
+        'stages': {stage: summarize(latencies) for stage, latencies in stages.items()},
+        'startup_heavy_modules': heavy_modules,
+        'samples': per_sample,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold_percent: float = DEFAULT_THRESHOLD_PERCENT) -> list[dict]:
+    """2回分の結果を段階ごとに比較し、p50・p90の変化率を返す（閾値を超えた悪化はregression=True）"""
+    rows = []
+    for stage, base_stats in baseline.get('stages', {}).items():
+        current_stats = current.get('stages', {}).get(stage)
+        if current_stats is None:
+            continue
+        for metric in ('p50_ms', 'p90_ms'):
+            before = base_stats[metric]
+            after = current_stats[metric]
+            change = (after - before) / before * 100 if before > 0 else 0.0
+            rows.append({
+                'stage': stage,
+                'metric': metric,
+                'baseline': before,
+                'current': after,
+                'change_percent': change,
+                'regression': change > threshold_percent,
+            })
+
+    before_rss = baseline.get('peak_rss_bytes')
+    after_rss = current.get('peak_rss_bytes')
+    if before_rss and after_rss:
+        change = (after_rss - before_rss) / before_rss * 100
+        rows.append({
+            'stage': 'process',
+            'metric': 'peak_rss_bytes',
+            'baseline': before_rss,
+            'current': after_rss,
+            'change_percent': change,
+            'regression': change > threshold_percent,
+        })
+    return rows
+
+
+def print_report(result: dict) -> None:
+    """計測結果を表形式で表示"""
+    print(f"{'段階':<20}{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}{'件/秒':>10}")
+    for stage, stats in result['stages'].items():
+        print(
+            f"{stage:<20}{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}"
+            f"{stats['p99_ms']:>10.2f}{stats['files_per_sec']:>10.1f}"
+        )
+    peak_rss = result.get('peak_rss_bytes')
+    peak_text = f"{peak_rss / 1024 / 1024:.1f}MB" if peak_rss else "取得できません"
+    print(f"ピークメモリ使用量: {peak_text}")
+    for stage, modules in result.get('startup_heavy_modules', {}).items():
+        if modules:
+            print(f"警告: {stage} で重いモジュールが読み込まれています: {', '.join(modules)}")
+    print(f"合計時間: {result['elapsed']:.2f}秒")
+
+
+def print_comparison(rows: list[dict], threshold_percent: float) -> None:
+    """比較結果を表形式で表示"""
+    print(f"{'段階':<20}{'指標':<16}{'変更前':>12}{'変更後':>12}{'変化率':>10}")
+    for row in rows:
+        mark = "  ← 悪化" if row['regression'] else ""
+        print(
+            f"{row['stage']:<20}{row['metric']:<16}{row['baseline']:>12.2f}"
+            f"{row['current']:>12.2f}{row['change_percent']:>9.1f}%{mark}"
+        )
+    regressions = sum(1 for row in rows if row['regression'])
+    print(f"閾値 {threshold_percent}% を超えた悪化: {regressions}件")
+
+
+def _parse_sizes(value: str) -> list[int]:
+    try:
+        return [int(size) for size in value.split(',') if size.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"サイズはカンマ区切りの整数で指定してください: {value}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="IconFlow 変換ベンチマーク")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="ベンチマークを実行")
+    run_parser.add_argument("-o", "--output", help="結果を保存するJSONファイル")
+    run_parser.add_argument("--sizes", type=_parse_sizes, help="SVGのサイズ (例: 16,128,1024)")
+    run_parser.add_argument("--profiles", nargs="+", choices=list(COMPLEXITY_PROFILES), help="SVGの複雑さの種類")
+    run_parser.add_argument("-n", "--iterations", type=int, default=3, help="1ファイルあたりの計測回数 (デフォルト: 3)")
+    run_parser.add_argument("--ico-size", type=int, default=DEFAULT_ICO_SIZE, help="ICOのサイズ (デフォルト: 128)")
+    run_parser.add_argument("--seed", type=int, default=0, help="コーパス生成の乱数シード (デフォルト: 0)")
+
+    compare_parser = subparsers.add_parser("compare", help="2回分の結果を比較")
+    compare_parser.add_argument("baseline", help="比較元のJSONファイル")
+    compare_parser.add_argument("current", help="比較先のJSONファイル")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD_PERCENT,
+        help="悪化とみなす変化率（%%） (デフォルト: 10)"
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        result = run_benchmark(args.sizes, args.profiles, args.iterations, args.ico_size, args.seed)
+        print_report(result)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            print(f"結果を保存しました: {args.output}")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    rows = compare_results(baseline, current, args.threshold)
+    print_comparison(rows, args.threshold)
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import json
 import os
 import re
 from datetime import datetime
@@ -5,6 +6,10 @@ from datetime import datetime
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 APP_INIT_PATH = os.path.join(PROJECT_ROOT, "app", "__init__.py")
 README_PATH = os.path.join(PROJECT_ROOT, "docs", "README.md")
+BUILD_METRICS_PATH = os.path.join(PROJECT_ROOT, "docs", "build_metrics.json")
+
+# 前回のリリースから悪化とみなすバンドルサイズ・起動時間の変化率（%）
+BUILD_REGRESSION_PERCENT = 10.0
 
 
 def get_current_version():
@@ -130,3 +135,51 @@ def update_version(increment_type="patch"):
     else:
         print("バージョン更新に失敗しました")
         return current_version
+
+
+def load_build_metrics(path=BUILD_METRICS_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        print(f"Error: ビルド記録の読み込み中にエラーが発生しました: {e}")
+        return []
+
+
+def find_previous_build(history, metrics):
+    """同じビルド設定（profile・onefile）の直近の記録（ない場合はNone）"""
+    build = (metrics.get('profile', 'default'), metrics.get('onefile', False))
+    for record in reversed(history):
+        if (record.get('profile', 'default'), record.get('onefile', False)) == build:
+            return record
+    return None
+
+
+def record_build_metrics(version, metrics, path=BUILD_METRICS_PATH):
+    """リリースごとのバンドルサイズ・起動時間を記録し、同じビルド設定の前回の記録を返す"""
+    history = load_build_metrics(path)
+    previous = find_previous_build(history, metrics)
+    history.append({'version': version, 'date': datetime.now().strftime("%Y-%m-%d"), **metrics})
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(history, f, ensure_ascii=False, indent=2)
+        print(f"ビルド記録を更新しました: {path}")
+    except Exception as e:
+        print(f"Error: ビルド記録の更新中にエラーが発生しました: {e}")
+    return previous
+
+
+def compare_build_metrics(previous, current, threshold_percent=BUILD_REGRESSION_PERCENT):
+    """同じビルド設定の前回のリリースとの差を表示用の行のリストで返す（閾値を超えた悪化には印を付ける）"""
+    lines = [f"前回 (v{previous.get('version', '?')}) との比較:"]
+    for key, label in (('bundle_bytes', 'バンドルサイズ'), ('cold_start_ms', 'コールドスタート'), ('first_frame_ms', '初回描画')):
+        before = previous.get(key)
+        after = current.get(key)
+        if not before or after is None:
+            continue
+        change = (after - before) / before * 100
+        mark = "  ← 悪化" if change > threshold_percent else ""
+        lines.append(f"  {label}: {change:+.1f}%{mark}")
+    return lines
@@ -0,0 +1,335 @@
+import glob
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+from service.build_manifest import BuildManifest
+from service.conversion_cache import ConversionCache
+from service.instrumentation import DEFAULT_PROFILE_THRESHOLD, StageTiming, collect_timings, emit, profile_if_slow
+from service.memory_budget import MemoryBudget, estimate_task_memory, get_peak_rss, max_peak_rss
+from service.worker_pool import get_worker_pool
+
+logger = logging.getLogger(__name__)
+
+# 変換モードごとの（入力拡張子, 出力拡張子）
+CONVERSION_EXTENSIONS = {
+    'svg_to_png': ('.svg', '.png'),
+    'png_to_ico': ('.png', '.ico'),
+    'svg_to_ico': ('.svg', '.ico'),
+}
+# 変換モードごとに出力に影響するパラメーター（差分変換で同じ設定か判定するために使用）
+CONVERSION_PARAMS = {
+    'svg_to_png': ('icon_size',),
+    'png_to_ico': ('ico_size', 'ico_sizes'),
+    'svg_to_ico': ('icon_size', 'ico_size', 'ico_sizes'),
+}
+
+
+@dataclass
+class BatchResult:
+    """1ファイル分の変換結果"""
+    source_path: str
+    output_path: str
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    cache_hit: bool = False
+    skipped: bool = False
+    stages: list[StageTiming] = field(default_factory=list)
+    profile_path: Optional[str] = None
+    peak_rss: Optional[int] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchReport:
+    """一括変換全体の結果レポート"""
+    results: list[BatchResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    peak_rss: Optional[int] = None
+
+    @property
+    def succeeded(self) -> list[BatchResult]:
+        return [result for result in self.results if result.succeeded]
+
+    @property
+    def failed(self) -> list[BatchResult]:
+        return [result for result in self.results if not result.succeeded]
+
+    @property
+    def skipped(self) -> list[BatchResult]:
+        return [result for result in self.results if result.skipped]
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for result in self.results if result.cache_hit)
+
+
+def collect_source_files(source: Union[str, list[str]], extension: str) -> list[str]:
+    """ディレクトリまたはglobパターンから変換対象ファイルを収集します
+
+    Args:
+        source: ディレクトリ、globパターン、またはそれらのリスト
+        extension: ディレクトリ指定時に対象とする拡張子（例: '.svg'）
+
+    Returns:
+        重複を除いてソートしたファイルパスのリスト
+    """
+    patterns = [source] if isinstance(source, str) else source
+    files: set[str] = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, f"*{extension}")
+        files.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(files)
+
+
+def get_output_path(source_path: str, output_dir: str, mode: str) -> str:
+    """入力ファイルに対応する出力ファイルのパスを取得"""
+    base_name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(output_dir, f"{base_name}{CONVERSION_EXTENSIONS[mode][1]}")
+
+
+# ワーカープロセスごとに保持するキャッシュ（タスクごとにディレクトリを走査しないよう使い回す）
+_process_caches: dict[tuple[str, int], ConversionCache] = {}
+
+
+def find_output_collisions(tasks: list[tuple]) -> dict[str, list[str]]:
+    """出力ファイルが同じになる入力ファイル（再帰的なglobで別フォルダの同名ファイルを指定した場合など）
+
+    Returns:
+        出力ファイル -> 入力ファイルのリスト（2件以上のもののみ）
+    """
+    sources: dict[str, list[str]] = {}
+    for task in tasks:
+        sources.setdefault(os.path.normcase(os.path.abspath(task[2])), []).append(task[1])
+    return {output: paths for output, paths in sources.items() if len(paths) > 1}
+
+
+def _get_process_cache(cache: Optional[ConversionCache]) -> Optional[ConversionCache]:
+    if cache is None:
+        return None
+    return _process_caches.setdefault((cache.cache_dir, cache.max_bytes), cache)
+
+
+def convert_file(
+    mode: str,
+    source_path: str,
+    output_path: str,
+    icon_size: int,
+    ico_size: int,
+    ico_sizes: Optional[list[int]] = None,
+    cache: Optional[ConversionCache] = None,
+    png_path: Optional[str] = None,
+    profile_dir: Optional[str] = None,
+    profile_threshold: float = DEFAULT_PROFILE_THRESHOLD
+) -> BatchResult:
+    """1ファイルを変換し、例外は結果のエラーとして返します
+
+    ワーカープロセスから呼び出せるよう（pickle可能なように）モジュールレベルで定義しています。
+    png_pathはSVG→ICO変換で中間PNGを保存する場合のみ使用します。
+    段階ごとの計測結果は出力先へ送らずに結果のstagesに格納するため、呼び出し元で emit() してください。
+    profile_dir指定時は、profile_threshold秒以上かかったファイルのcProfile結果を保存します。
+    """
+    start = time.perf_counter()
+    cache = _get_process_cache(cache)
+    hits_before = cache.hits if cache is not None else 0
+    error = None
+    with collect_timings() as stages, profile_if_slow(os.path.basename(source_path), profile_dir, profile_threshold) as profile:
+        try:
+            # CairoSVG・Pillowは読み込みに時間がかかるため、実際に変換するとき（主にワーカープロセス内）に読み込む。
+            # PNG→ICO変換はCairoSVGを使用しないため、cairoのライブラリを読み込めない環境でも変換できるようモードごとに読み込む
+            if mode == 'svg_to_png':
+                from service.convert_svg_to_png import convert_svg_to_png
+
+                convert_svg_to_png(source_path, output_path, icon_size, cache)
+            elif mode == 'png_to_ico':
+                from service.convert_png_to_ico import convert_png_to_ico
+
+                convert_png_to_ico(source_path, output_path, ico_size, ico_sizes, cache)
+            else:
+                from service.convert_svg_to_ico import convert_svg_to_ico
+
+                convert_svg_to_ico(source_path, output_path, icon_size, ico_size, png_path, ico_sizes, cache)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    cache_hit = cache is not None and cache.hits > hits_before
+    return BatchResult(
+        source_path, output_path, error, time.perf_counter() - start, cache_hit,
+        stages=stages, profile_path=profile.path, peak_rss=get_peak_rss()
+    )
+
+
+def execute_tasks(
+    tasks: list[tuple],
+    max_workers: Optional[int] = None,
+    memory_budget: Optional[int] = None
+) -> list[BatchResult]:
+    """convert_fileの引数のタプルの一覧をプロセスプールで実行します
+
+    計測結果は呼び出し元の出力先へ送り、時間のかかったファイルのプロファイルはログに出力します。
+    memory_budget指定時は、入力の寸法から見積もったメモリ量の合計が予算以下になるまで
+    次のタスクの投入を待機します（大きな画像が同時に展開されないようにするため）。
+
+    Args:
+        tasks: convert_fileに渡す引数のタプルのリスト
+        max_workers: ワーカープロセス数（省略時はCPUコア数、1の場合は同一プロセスで逐次実行）
+        memory_budget: 同時に実行するタスクの見積もりメモリ量の上限（バイト、省略時は制限なし）
+
+    Returns:
+        tasksと同じ順の変換結果のリスト
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    # 共有のプロセスプールは指定したワーカー数で取得し、同時に実行する数のみ件数に合わせる
+    pool_size = max_workers
+    max_workers = max(1, min(max_workers, len(tasks)))
+    logger.debug("変換タスク: %d 件 / %d プロセス", len(tasks), max_workers)
+
+    results: list[Optional[BatchResult]] = [None] * len(tasks)
+    if max_workers == 1:
+        for index, task in enumerate(tasks):
+            results[index] = convert_file(*task)
+    else:
+        budget = MemoryBudget(memory_budget) if memory_budget else None
+        # 予算を指定した場合は実行中のタスクのみ計上するため、投入数をワーカー数までに抑える
+        in_flight_limit = max_workers if budget is not None else len(tasks)
+        estimates = [estimate_task_memory(task[0], task[1], task[3], task[4], task[5]) for task in tasks] if budget is not None else []
+        pending = deque(range(len(tasks)))
+        pool = get_worker_pool(pool_size)
+        futures: dict[Future, int] = {}
+        while pending or futures:
+            while pending and len(futures) < in_flight_limit:
+                index = pending[0]
+                if budget is not None:
+                    if not budget.can_start(estimates[index]):
+                        budget.wait()
+                        break
+                    budget.acquire(estimates[index])
+                pending.popleft()
+                futures[pool.submit(convert_file, *tasks[index])] = index
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures.pop(future)
+                if budget is not None:
+                    budget.release(estimates[index])
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    results[index] = BatchResult(tasks[index][1], tasks[index][2], f"{type(e).__name__}: {e}")
+        if budget is not None:
+            logger.info(
+                "メモリ予算: 上限 %.0fMB / 見積もりの最大 %.0fMB（予算不足で待機 %d 回）",
+                budget.limit_bytes / 1024 / 1024, budget.peak_in_use / 1024 / 1024, budget.waits
+            )
+
+    # 結果を受け取れなかったタスク（取り消された場合等）も呼び出し元には失敗として返す
+    completed = [
+        result if result is not None else BatchResult(task[1], task[2], "実行されませんでした")
+        for task, result in zip(tasks, results)
+    ]
+    for result in completed:
+        for timing in result.stages:
+            emit(timing)
+        if result.profile_path:
+            logger.info("プロファイルを保存しました: %s (%.2f秒) -> %s", result.source_path, result.elapsed, result.profile_path)
+    return completed
+
+
+def batch_convert(
+    source: Union[str, list[str]],
+    output_dir: str,
+    mode: str = 'svg_to_png',
+    icon_size: int = 128,
+    ico_size: int = 128,
+    max_workers: Optional[int] = None,
+    ico_sizes: Optional[list[int]] = None,
+    cache: Optional[ConversionCache] = None,
+    incremental: bool = False,
+    profile_dir: Optional[str] = None,
+    profile_threshold: float = DEFAULT_PROFILE_THRESHOLD,
+    memory_budget: Optional[int] = None
+) -> BatchReport:
+    """ディレクトリまたはglobパターンに一致するファイルを一括変換します
+
+    CairoによるラスタライズはCPUバウンドのため、スレッドではなくプロセスプールで並列化します。
+
+    Args:
+        source: 入力ディレクトリ、globパターン、またはそれらのリスト
+        output_dir: 出力ディレクトリ
+        mode: 変換モード（'svg_to_png' / 'png_to_ico' / 'svg_to_ico'）
+        icon_size: SVGラスタライズ時のサイズ（ピクセル）
+        ico_size: ICOのサイズ（ピクセル）
+        max_workers: ワーカープロセス数（省略時はCPUコア数、1の場合は同一プロセスで逐次実行）
+        ico_sizes: マルチサイズICOに格納するサイズのリスト（指定時はico_sizeより優先）
+        cache: 変換結果キャッシュ（各ワーカープロセスで同じディレクトリを共有）
+        incremental: Trueの場合、出力が入力より新しく同じ設定で作成済みのファイルは変換しない
+        profile_dir: 指定時はprofile_threshold秒以上かかったファイルのcProfile結果を保存するディレクトリ
+        profile_threshold: プロファイルを保存する1ファイルあたりの所要時間（秒）
+        memory_budget: 同時に実行するタスクの見積もりメモリ量の上限（バイト、省略時は制限なし）
+
+    Returns:
+        ファイルごとの結果を含むBatchReport
+    """
+    if mode not in CONVERSION_EXTENSIONS:
+        raise ValueError(f"不明な変換モードです: {mode}")
+
+    start = time.perf_counter()
+    source_files = collect_source_files(source, CONVERSION_EXTENSIONS[mode][0])
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [
+        (mode, path, get_output_path(path, output_dir, mode), icon_size, ico_size, ico_sizes, cache, None, profile_dir, profile_threshold)
+        for path in source_files
+    ]
+
+    results: list[BatchResult] = []
+    # 出力ファイルが同じになる入力は並列に書き込むと互いに上書きするため、変換せずに失敗とする
+    collisions = find_output_collisions(tasks)
+    if collisions:
+        colliding = {path: output for output, paths in collisions.items() for path in paths}
+        for task in tasks:
+            if task[1] in colliding:
+                others = [path for path in collisions[colliding[task[1]]] if path != task[1]]
+                results.append(BatchResult(task[1], task[2], f"出力ファイルが重複しています: {task[2]}（{', '.join(others)}）"))
+        tasks = [task for task in tasks if task[1] not in colliding]
+    manifest = None
+    values = {'icon_size': icon_size, 'ico_size': ico_size, 'ico_sizes': ico_sizes}
+    params = {'mode': mode, **{name: values[name] for name in CONVERSION_PARAMS[mode]}}
+    if incremental:
+        manifest = BuildManifest(output_dir)
+        pending_tasks = []
+        for task in tasks:
+            if manifest.is_up_to_date(task[1], task[2], params):
+                results.append(BatchResult(task[1], task[2], skipped=True))
+            else:
+                pending_tasks.append(task)
+        tasks = pending_tasks
+
+    # 変換中に入力が更新された場合に再変換されるよう、変換前の状態を記録する
+    source_stats = manifest.stat_sources([task[1] for task in tasks]) if manifest is not None else {}
+
+    logger.info("一括変換: %d ファイル（変更なしでスキップ: %d ファイル）", len(tasks), len(results))
+    results.extend(execute_tasks(tasks, max_workers, memory_budget))
+    results.sort(key=lambda result: result.source_path)
+
+    if manifest is not None:
+        for result in results:
+            source_stat = source_stats.get(result.source_path)
+            if result.succeeded and not result.skipped and source_stat is not None:
+                manifest.record(result.source_path, result.output_path, params, source_stat)
+        manifest.save()
+
+    peak_rss = max_peak_rss(get_peak_rss(), *(result.peak_rss for result in results))
+    report = BatchReport(results, time.perf_counter() - start, peak_rss)
+    logger.info("一括変換完了: 成功 %d / 失敗 %d (%.2f秒)", len(report.succeeded), len(report.failed), report.elapsed)
+    if peak_rss is not None:
+        logger.info("ピークメモリ使用量: %.1fMB（プロセスごとの最大）", peak_rss / 1024 / 1024)
+    if cache is not None:
+        logger.info("キャッシュ: ヒット %d / %d", report.cache_hits, len(report.results))
+    return report
@@ -0,0 +1,86 @@
+import json
+import logging
+import os
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE_NAME = '.iconflow_manifest.json'
+MANIFEST_VERSION = 1
+
+
+class BuildManifest:
+    """出力ディレクトリごとの変換記録（makeのように変更のない入力の再変換を省略するために使用）
+
+    出力ファイルごとに、入力ファイルのパス・更新時刻・サイズと変換パラメータを記録します。
+    """
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, MANIFEST_FILE_NAME)
+        self.entries: dict[str, dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.warning("変換記録を読み込めないため全ファイルを変換します: %s (%s)", self.path, e)
+            return
+        if data.get('version') == MANIFEST_VERSION:
+            self.entries = data.get('entries', {})
+
+    @staticmethod
+    def _key(output_path: str) -> str:
+        return os.path.basename(output_path)
+
+    def is_up_to_date(self, source_path: str, output_path: str, params: dict[str, Any]) -> bool:
+        """出力が入力より新しく、同じパラメータで作成されている場合はTrue"""
+        entry = self.entries.get(self._key(output_path))
+        if entry is None:
+            return False
+        try:
+            source_stat = os.stat(source_path)
+            output_stat = os.stat(output_path)
+        except FileNotFoundError:
+            return False
+        return (
+            entry['source'] == os.path.abspath(source_path)
+            and entry['source_mtime_ns'] == source_stat.st_mtime_ns
+            and entry['source_size'] == source_stat.st_size
+            and entry['params'] == params
+            and output_stat.st_mtime_ns >= source_stat.st_mtime_ns
+        )
+
+    @staticmethod
+    def stat_sources(source_paths: list[str]) -> dict[str, os.stat_result]:
+        """変換を開始する前の入力ファイルの状態を取得（取得できないファイルは含めない）"""
+        source_stats = {}
+        for source_path in source_paths:
+            try:
+                source_stats[source_path] = os.stat(source_path)
+            except OSError:
+                continue
+        return source_stats
+
+    def record(self, source_path: str, output_path: str, params: dict[str, Any], source_stat: os.stat_result) -> None:
+        """変換に成功した出力を記録
+
+        source_statには変換を開始する前に取得した入力の状態を渡します。変換中に入力が更新された場合は
+        記録と一致しなくなるため、次回は再変換されます。
+        """
+        self.entries[self._key(output_path)] = {
+            'source': os.path.abspath(source_path),
+            'source_mtime_ns': source_stat.st_mtime_ns,
+            'source_size': source_stat.st_size,
+            'params': params,
+        }
+
+    def save(self) -> None:
+        """変換記録を保存（一時ファイル経由で置き換え）"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
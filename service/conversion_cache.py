@@ -0,0 +1,217 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from utils.config_manager import AppSettings
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'IconFlow', 'cache')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CACHE_FILE_EXTENSION = '.bin'
+# 実行ごとのヒット/ミス数を累計するファイル（キャッシュディレクトリ直下）
+USAGE_FILE_NAME = 'usage.json'
+
+# キャッシュキーに含めるライブラリ（バージョンが変わると出力が変わる可能性がある）
+KEY_LIBRARIES = ('CairoSVG', 'cairocffi', 'pillow')
+# キャッシュキーの形式のバージョン（変換処理の不具合を修正し、以前の出力を使用しない場合に上げる）
+# 2: 解析済みツリーを再利用して描画したmask・patternの誤った出力を無効化
+KEY_FORMAT_VERSION = 2
+
+
+@functools.lru_cache(maxsize=None)
+def get_library_versions() -> dict[str, str]:
+    """レンダリング結果に影響するライブラリのバージョンを取得"""
+    # importlib.metadataは読み込みに時間がかかるため、起動時ではなく初回のキャッシュ参照時に読み込む
+    from importlib import metadata
+
+    versions = {}
+    for name in KEY_LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = 'unknown'
+    return versions
+
+
+def _replace_file(path: str, data: bytes) -> None:
+    """同じディレクトリに一意な名前の一時ファイルを作成して書き込み、pathを置き換える
+
+    一時ファイル名はプロセス・スレッドごとに異なるため、同じキーへの並行書き込みでも混ざりません。
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix='.tmp', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@dataclass
+class CacheStats:
+    """キャッシュのヒット/ミス統計"""
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    entries: int = 0
+    total_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ConversionCache:
+    """入力ファイルのハッシュと変換パラメータをキーとするディスクキャッシュ
+
+    エントリは最終アクセス時刻（mtime）で管理し、合計サイズがmax_bytesを超えると
+    最も古いエントリから削除します（LRU）。複数プロセスから同じディレクトリを共有できます。
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        # 合計サイズは初回の書き込み時にディレクトリを走査して求める
+        self._total_bytes: Optional[int] = None
+
+    @classmethod
+    def from_settings(cls, settings: 'AppSettings') -> Optional['ConversionCache']:
+        """読み込み済みの設定からキャッシュを作成（無効な場合はNone）"""
+        if not settings.cache_enabled:
+            return None
+        return cls(settings.cache_dir or DEFAULT_CACHE_DIR, settings.cache_max_size_mb * 1024 * 1024)
+
+    def make_key(self, source_data: bytes, **params: Any) -> str:
+        """入力データ・変換パラメータ・ライブラリバージョンからキャッシュキーを生成"""
+        digest = hashlib.sha256(source_data)
+        digest.update(json.dumps(
+            {'format': KEY_FORMAT_VERSION, 'params': params, 'versions': get_library_versions()}, sort_keys=True
+        ).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}{CACHE_FILE_EXTENSION}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """キャッシュされた出力を取得（ヒット時はLRU用にアクセス時刻を更新）"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """出力をキャッシュに保存（一時ファイル経由で置き換えるため並行書き込みでも壊れない）"""
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            replaced_bytes = os.path.getsize(path)
+        except FileNotFoundError:
+            replaced_bytes = 0
+        _replace_file(path, data)
+        self.stores += 1
+
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._scan_entries())
+        else:
+            # 同じキーを上書きした場合は置き換えたエントリの分を差し引く
+            self._total_bytes += len(data) - replaced_bytes
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _scan_entries(self) -> list[tuple[str, int, float]]:
+        """キャッシュエントリの（パス, サイズ, 最終アクセス時刻）一覧"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(CACHE_FILE_EXTENSION):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self) -> None:
+        """最終アクセスが古い順に削除し、合計サイズを上限の90%以下にする"""
+        entries = sorted(self._scan_entries(), key=lambda entry: entry[2])
+        total_bytes = sum(size for _, size, _ in entries)
+        target_bytes = int(self.max_bytes * 0.9)
+        for path, size, _ in entries:
+            if total_bytes <= target_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+            self.evictions += 1
+        self._total_bytes = total_bytes
+
+    def stats(self) -> CacheStats:
+        """このインスタンスのヒット/ミス数と、ディスク上のエントリ数・合計サイズを取得"""
+        entries = self._scan_entries()
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            stores=self.stores,
+            evictions=self.evictions,
+            entries=len(entries),
+            total_bytes=sum(size for _, size, _ in entries)
+        )
+
+    def load_usage(self) -> CacheStats:
+        """これまでに記録した累計のヒット/ミス数を取得（記録がない場合は0）"""
+        try:
+            with open(os.path.join(self.cache_dir, USAGE_FILE_NAME), encoding='utf-8') as f:
+                usage = json.load(f)
+            return CacheStats(hits=int(usage['hits']), misses=int(usage['misses']))
+        except (OSError, ValueError, KeyError, TypeError):
+            return CacheStats()
+
+    def record_usage(self, hits: int, misses: int) -> CacheStats:
+        """1回の実行のヒット/ミス数を累計に加算して保存し、加算後の累計を返す"""
+        usage = self.load_usage()
+        usage.hits += hits
+        usage.misses += misses
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data = json.dumps({'hits': usage.hits, 'misses': usage.misses}).encode('utf-8')
+        _replace_file(os.path.join(self.cache_dir, USAGE_FILE_NAME), data)
+        return usage
+
+    def clear(self) -> None:
+        """全エントリと累計のヒット/ミス数を削除"""
+        for path, _, _ in self._scan_entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        try:
+            os.remove(os.path.join(self.cache_dir, USAGE_FILE_NAME))
+        except FileNotFoundError:
+            pass
+        self._total_bytes = 0
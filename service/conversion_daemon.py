@@ -0,0 +1,337 @@
+import ipaddress
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional, cast
+from urllib.parse import parse_qs, urlsplit
+
+from service.batch_convert import BatchResult, _get_process_cache, convert_file
+from service.conversion_cache import ConversionCache
+from service.daemon_client import DEFAULT_HOST, DEFAULT_PORT, OUTPUT_CONTENT_TYPES
+from service.instrumentation import emit
+from service.worker_pool import get_worker_pool
+
+logger = logging.getLogger(__name__)
+
+# 1リクエストで受け付ける入力の上限（バイト）
+DEFAULT_MAX_REQUEST_BYTES = 64 * 1024 * 1024
+# バイト列で送信する場合に受け付けるContent-Type（ブラウザからのフォーム送信等は受け付けない）
+DATA_CONTENT_TYPES = ('application/octet-stream', 'image/svg+xml', 'image/png')
+# 接続を受け付けるHostヘッダーの値（DNSリバインディング対策）
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+
+def is_loopback_host(host: str) -> bool:
+    """ループバックアドレス（127.0.0.0/8・::1・localhost）か"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def convert_data(
+    mode: str,
+    data: bytes,
+    icon_size: int,
+    ico_size: int,
+    ico_sizes: Optional[list[int]] = None,
+    cache: Optional[ConversionCache] = None
+) -> bytes:
+    """SVG/PNGのバイト列を変換してPNG/ICOのバイト列を返す（ファイルを読み書きしない）
+
+    ワーカープロセスから呼び出せるよう（pickle可能なように）モジュールレベルで定義しています。
+    """
+    cache = _get_process_cache(cache)
+    # PNG→ICO変換はCairoSVGを使用しないため、変換モードに必要なモジュールのみ読み込む
+    if mode == 'svg_to_png':
+        from service.convert_svg_to_png import render_cached
+
+        return render_cached(data, None, icon_size, cache)
+    if mode == 'png_to_ico':
+        from service.convert_png_to_ico import png_to_ico_bytes
+
+        return png_to_ico_bytes(data, ico_size, ico_sizes, cache)
+    from service.convert_svg_to_ico import svg_to_ico_bytes
+
+    return svg_to_ico_bytes(data, None, icon_size, ico_size, ico_sizes, cache)
+
+
+class _DaemonRequestError(Exception):
+    """リクエストの内容が不正な場合の例外（HTTPステータスコードとメッセージを返す）"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """変換デーモンのHTTPリクエストの処理（接続を再利用できるようHTTP/1.1で応答）"""
+
+    protocol_version = 'HTTP/1.1'
+    # ヘッダーと本文を別々に送信するため、Nagleアルゴリズムによる応答の遅延（約40ms）を防ぐ
+    disable_nagle_algorithm = True
+
+    @property
+    def daemon(self) -> 'ConversionDaemon':
+        """リクエストを受け付けたデーモン"""
+        return cast(_DaemonServer, self.server).daemon
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json')
+
+    def _check_host(self) -> None:
+        host = (self.headers.get('Host') or '').strip()
+        name = host[1:host.find(']')] if host.startswith('[') else host.split(':')[0]
+        if name not in LOOPBACK_HOSTS and name != self.daemon.host:
+            raise _DaemonRequestError(403, f"許可されていないホストです: {host}")
+
+    def _read_body(self, content_types: tuple[str, ...]) -> bytes:
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if content_type not in content_types:
+            raise _DaemonRequestError(415, f"Content-Typeが不正です: {content_type or '(なし)'}")
+        if 'Transfer-Encoding' in self.headers or 'Content-Length' not in self.headers:
+            raise _DaemonRequestError(411, "Content-Lengthを指定してください")
+        value = self.headers['Content-Length'].strip()
+        if not value.isdigit():
+            raise _DaemonRequestError(400, f"Content-Lengthが不正です: {value}")
+        length = int(value)
+        if length > self.daemon.max_request_bytes:
+            raise _DaemonRequestError(413, f"入力が大きすぎます: {length}バイト")
+        return self.rfile.read(length)
+
+    def _handle(self, method: str) -> None:
+        try:
+            self._check_host()
+            url = urlsplit(self.path)
+            route = getattr(self.daemon, f"_{method}_route")(url.path)
+            route(self, parse_qs(url.query))
+        except _DaemonRequestError as e:
+            self.close_connection = True
+            self._send_json(e.status, {'error': str(e)})
+        except Exception as e:
+            logger.exception("リクエストの処理に失敗しました: %s", self.path)
+            self.close_connection = True
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+
+    def do_GET(self) -> None:
+        self._handle('get')
+
+    def do_POST(self) -> None:
+        self._handle('post')
+
+
+class _DaemonServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], daemon: 'ConversionDaemon'):
+        self.daemon = daemon
+        super().__init__(address, _RequestHandler)
+
+
+def _parse_size(values: dict[str, list[str]], name: str, default: Optional[int]) -> Optional[int]:
+    if name not in values:
+        return default
+    try:
+        return int(values[name][0])
+    except ValueError:
+        raise _DaemonRequestError(400, f"{name}の指定が不正です: {values[name][0]}")
+
+
+def _parse_sizes(value: Any, default: Optional[list[int]]) -> Optional[list[int]]:
+    if value is None:
+        return default
+    try:
+        sizes = value.split(',') if isinstance(value, str) else value
+        return [int(size) for size in sizes if str(size).strip()]
+    except (TypeError, ValueError):
+        raise _DaemonRequestError(400, f"ico_sizesの指定が不正です: {value}")
+
+
+class ConversionDaemon:
+    """変換処理を常駐させ、ローカルのHTTPで変換を受け付けるデーモン
+
+    毎回プロセスを起動してCairoSVG・Pillowを読み込む代わりに、読み込み済みのワーカー
+    （service.worker_pool）で変換するため、1リクエストあたりの所要時間はほぼ変換時間のみになります。
+    max_workersが1の場合はワーカープロセスを使用せず、デーモンのプロセスで1件ずつ変換します。
+
+    - ``GET /health``: 状態（プロセスID・ワーカー数・処理件数）
+    - ``POST /convert/<mode>?icon_size=&ico_size=&ico_sizes=``: 本文のSVG/PNGを変換し、PNG/ICOのバイト列を返す
+    - ``POST /convert``: JSON（mode・source・output・サイズ）で指定したファイルを変換し、結果をJSONで返す
+    - ``POST /shutdown``: デーモンを終了
+
+    ループバックアドレスのみで待ち受け（それ以外のアドレスはValueError）、ブラウザから送信できる形式
+    （フォーム・text/plain）のリクエストは受け付けません。``POST /convert`` の出力先はoutput_root以下に限り、
+    output_rootを指定しない場合はファイルを出力しません（バイト列での変換のみ）。
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        icon_size: int = 128,
+        ico_size: int = 128,
+        ico_sizes: Optional[list[int]] = None,
+        cache: Optional[ConversionCache] = None,
+        max_workers: Optional[int] = None,
+        max_request_bytes: int = DEFAULT_MAX_REQUEST_BYTES,
+        output_root: Optional[str] = None
+    ):
+        if not is_loopback_host(host):
+            raise ValueError(f"ループバックアドレス以外では待ち受けできません: {host}")
+        self.host = host
+        self.output_root = os.path.realpath(output_root) if output_root else None
+        self.icon_size = icon_size
+        self.ico_size = ico_size
+        self.ico_sizes = ico_sizes
+        self.cache = cache
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_request_bytes = max_request_bytes
+        self.requests = 0
+        # ThreadingHTTPServerは接続ごとのスレッドで処理するため、処理件数の更新は排他する
+        self._requests_lock = threading.Lock()
+        self._inline_lock = threading.Lock()
+        self._server = _DaemonServer((host, port), self)
+
+    @property
+    def port(self) -> int:
+        """待ち受けているポート番号（0を指定した場合は割り当てられた番号）"""
+        return self._server.server_address[1]
+
+    def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """読み込み済みのワーカーで実行（max_workersが1の場合はこのプロセスで1件ずつ実行）"""
+        with self._requests_lock:
+            self.requests += 1
+        if self.max_workers == 1:
+            with self._inline_lock:
+                return func(*args)
+        return get_worker_pool(self.max_workers).submit(func, *args).result()
+
+    def _check_output(self, path: str) -> None:
+        """出力先がoutput_root以下か確認（シンボリックリンク・'..' を解決して比較）"""
+        if self.output_root is None:
+            raise _DaemonRequestError(403, "ファイルの出力先フォルダが設定されていません（--output-root）")
+        try:
+            allowed = os.path.commonpath([self.output_root, os.path.realpath(path)]) == self.output_root
+        except ValueError:
+            allowed = False
+        if not allowed:
+            raise _DaemonRequestError(403, f"出力先が出力先フォルダ（{self.output_root}）の外です: {path}")
+
+    def _default_sizes(self, params: dict) -> Optional[list[int]]:
+        """ico_sizes省略時のサイズ（ico_sizeのみ指定された場合は単一サイズのICOを出力する）"""
+        return None if 'ico_size' in params else self.ico_sizes
+
+    def _get_route(self, path: str) -> Callable:
+        if path == '/health':
+            return self._health
+        raise _DaemonRequestError(404, f"不明なパスです: {path}")
+
+    def _post_route(self, path: str) -> Callable:
+        if path == '/convert':
+            return self._convert_file
+        if path.startswith('/convert/'):
+            return self._convert_data
+        if path == '/shutdown':
+            return self._shutdown
+        raise _DaemonRequestError(404, f"不明なパスです: {path}")
+
+    def _health(self, handler: _RequestHandler, query: dict) -> None:
+        handler._send_json(200, {
+            'status': 'ok', 'pid': os.getpid(),
+            'workers': self.max_workers, 'requests': self.requests,
+        })
+
+    def _convert_data(self, handler: _RequestHandler, query: dict) -> None:
+        mode = urlsplit(handler.path).path[len('/convert/'):]
+        if mode not in OUTPUT_CONTENT_TYPES:
+            raise _DaemonRequestError(404, f"不明な変換モードです: {mode}")
+        data = handler._read_body(DATA_CONTENT_TYPES)
+        icon_size = _parse_size(query, 'icon_size', self.icon_size)
+        ico_size = _parse_size(query, 'ico_size', self.ico_size)
+        ico_sizes = _parse_sizes(query['ico_sizes'][0] if 'ico_sizes' in query else None, self._default_sizes(query))
+
+        start = time.perf_counter()
+        try:
+            output = self._run(convert_data, mode, data, icon_size, ico_size, ico_sizes, self.cache)
+        except Exception as e:
+            raise _DaemonRequestError(422, f"{type(e).__name__}: {e}")
+        elapsed = time.perf_counter() - start
+        logger.debug("変換しました: %s %dバイト -> %dバイト (%.1fms)", mode, len(data), len(output), elapsed * 1000)
+        handler._send(200, output, OUTPUT_CONTENT_TYPES[mode], {'X-IconFlow-Elapsed': f"{elapsed:.6f}"})
+
+    def _convert_file(self, handler: _RequestHandler, query: dict) -> None:
+        try:
+            request = json.loads(handler._read_body(('application/json',)).decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise _DaemonRequestError(400, f"JSONを解析できません: {e}")
+        mode = request.get('mode')
+        if mode not in OUTPUT_CONTENT_TYPES:
+            raise _DaemonRequestError(400, f"不明な変換モードです: {mode}")
+        source, output = request.get('source'), request.get('output')
+        if not all(isinstance(path, str) and os.path.isabs(path) for path in (source, output)):
+            raise _DaemonRequestError(400, "source・outputには絶対パスを指定してください")
+        self._check_output(output)
+        try:
+            icon_size = int(request.get('icon_size', self.icon_size))
+            ico_size = int(request.get('ico_size', self.ico_size))
+        except (TypeError, ValueError):
+            raise _DaemonRequestError(400, "サイズの指定が不正です")
+        ico_sizes = _parse_sizes(request.get('ico_sizes'), self._default_sizes(request))
+
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        result: BatchResult = self._run(convert_file, mode, source, output, icon_size, ico_size, ico_sizes, self.cache)
+        for timing in result.stages:
+            emit(timing)
+        payload = {
+            'source_path': result.source_path, 'output_path': result.output_path,
+            'elapsed': result.elapsed, 'cache_hit': result.cache_hit,
+        }
+        if result.succeeded:
+            handler._send_json(200, payload)
+        else:
+            handler._send_json(422, {**payload, 'error': result.error})
+
+    def _shutdown(self, handler: _RequestHandler, query: dict) -> None:
+        handler.close_connection = True
+        handler._send_json(200, {'status': 'stopping'})
+        # shutdown()はserve_foreverの終了を待つため、リクエストの処理とは別のスレッドで呼び出す
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def serve_forever(self) -> None:
+        """shutdown()が呼ばれるか /shutdown を受け付けるまで（Ctrl+Cでも停止）リクエストを処理"""
+        if self.max_workers > 1:
+            get_worker_pool(self.max_workers).warm_up()
+        logger.info("変換デーモンを開始しました: http://%s:%d (ワーカー %d)", self.host, self.port, self.max_workers)
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+            logger.info("変換デーモンを終了しました（処理件数 %d）", self.requests)
+
+    def start(self) -> threading.Thread:
+        """別スレッドでリクエストの処理を開始（アプリケーションへの組み込み・テスト用）"""
+        thread = threading.Thread(target=self.serve_forever, name="iconflow-daemon", daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
@@ -1,7 +1,97 @@
+import io
+import logging
+from typing import IO, TYPE_CHECKING, Optional, Union
+
 from PIL import Image
 
+from service.instrumentation import STAGE_ICO_ENCODE, STAGE_PNG_DECODE, STAGE_RESIZE, STAGE_WRITE, stage
+from service.resize_strategy import (
+    DEFAULT_REDUCING_GAP,
+    prepare_draft,
+    resample_name,
+    resize_image,
+    resize_mipmap,
+    resize_sizes,
+)
+
+if TYPE_CHECKING:
+    from service.conversion_cache import ConversionCache
+
+logger = logging.getLogger(__name__)
+
+# ICO形式で格納できる最大サイズ（ピクセル）
+MAX_ICO_SIZE = 256
+
+
+def normalize_ico_sizes(sizes: list[int]) -> list[int]:
+    """ICOに格納するサイズのリストを重複なしの降順に整えます（ICOで扱えないサイズは除外）"""
+    valid_sizes = sorted({size for size in sizes if 0 < size <= MAX_ICO_SIZE}, reverse=True)
+    skipped = sorted(set(sizes) - set(valid_sizes))
+    if skipped:
+        logger.warning("ICOに格納できないサイズを除外しました: %s", skipped)
+    if not valid_sizes:
+        raise ValueError(f"有効なICOサイズがありません: {sizes}")
+    return valid_sizes
+
 
-def convert_png_to_ico(png_path: str, ico_path: str, size: int = 128) -> None:
+def save_ico_frames(frames: list[Image.Image], ico_file: Union[str, IO[bytes]], source: Optional[str] = None) -> None:
+    """
+    複数サイズのフレームを1回の書き込みでICOファイルに保存します
+
+    Args:
+        frames: 各サイズにリサイズ済みの画像
+        ico_file: 出力ICOファイルのパスまたはファイルオブジェクト
+        source: 計測結果に記録する入力ファイルのパス
+    """
+    # Pillowは基準画像より大きいサイズを無視するため、最大のフレームを基準にする
+    frames = sorted(frames, key=lambda frame: frame.size[0], reverse=True)
+    with stage(STAGE_ICO_ENCODE, source, size=frames[0].size[0]) as timing:
+        frames[0].save(ico_file, format='ICO', sizes=[frame.size for frame in frames], append_images=frames[1:])
+        timing.bytes_out = _written_bytes(ico_file)
+
+
+def _written_bytes(ico_file: Union[str, IO[bytes]]) -> int:
+    """メモリ上のバッファに書き込んだバイト数（ファイルパスの場合は0）"""
+    return ico_file.tell() if isinstance(ico_file, io.BytesIO) else 0
+
+
+def _write_ico(
+    original_image: Image.Image,
+    ico_file: Union[str, IO[bytes]],
+    size: int,
+    sizes: Optional[list[int]],
+    source: Optional[str] = None,
+    reducing_gap: Optional[float] = DEFAULT_REDUCING_GAP,
+    mipmap: bool = False
+) -> None:
+    """元画像をリサイズしてICO形式で書き込み"""
+    ico_sizes = normalize_ico_sizes(sizes) if sizes else [size]
+    # Image.openは遅延読み込みのため、デコードをここで明示的に行って計測する
+    with stage(STAGE_PNG_DECODE, source):
+        prepare_draft(original_image, ico_sizes[0], reducing_gap)
+        original_image.load()
+    logger.debug("元のPNG画像サイズ: %s", original_image.size)
+    if sizes:
+        resize = resize_mipmap if mipmap else resize_sizes
+        frames = resize(original_image, ico_sizes, reducing_gap, source)
+        save_ico_frames(frames, ico_file, source)
+    else:
+        with stage(STAGE_RESIZE, source, size=size):
+            resized_image = resize_image(original_image, size, reducing_gap)
+        with stage(STAGE_ICO_ENCODE, source, size=size) as timing:
+            resized_image.save(ico_file, format='ICO', sizes=[(size, size)])
+            timing.bytes_out = _written_bytes(ico_file)
+
+
+def convert_png_to_ico(
+    png_path: str,
+    ico_path: str,
+    size: int = 128,
+    sizes: Optional[list[int]] = None,
+    cache: Optional['ConversionCache'] = None,
+    reducing_gap: Optional[float] = DEFAULT_REDUCING_GAP,
+    mipmap: bool = False
+) -> None:
     """
     PNG画像をICOファイルに変換します
 
@@ -9,13 +99,73 @@ def convert_png_to_ico(png_path: str, ico_path: str, size: int = 128) -> None:
         png_path: 入力PNGファイルのパス
         ico_path: 出力ICOファイルのパス
         size: アイコンのサイズ（ピクセル）
+        sizes: マルチサイズICOに格納するサイズのリスト（指定時はsizeより優先）
+        cache: 変換結果キャッシュ（指定時はヒットするとPillowを呼び出さない）
+        reducing_gap: 縮小時の間引きとLanczosの境界（Noneの場合は元の解像度から直接Lanczos、resize_strategy参照）
+        mipmap: sizes指定時に、最大サイズから半分ずつ縮小したピラミッドから各サイズを作成するか
     """
-    print(f"PNG→ICO変換: サイズ指定 {size}x{size}")
-    original_image = Image.open(png_path)
-    print(f"元のPNG画像サイズ: {original_image.size}")
-    resized_image = original_image.resize((size, size), Image.Resampling.LANCZOS)
+    if sizes:
+        logger.debug("PNG→ICO変換: マルチサイズ指定 %s", sizes)
+    else:
+        logger.debug("PNG→ICO変換: サイズ指定 %sx%s", size, size)
+
+    if cache is not None:
+        _convert_with_cache(png_path, ico_path, size, sizes, cache, reducing_gap, mipmap)
+    else:
+        _write_ico(Image.open(png_path), ico_path, size, sizes, png_path, reducing_gap, mipmap)
+
+    logger.info("変換完了: %s -> %s", png_path, ico_path)
+    if not sizes:
+        logger.debug("出力ICOサイズ: %sx%s のみ", size, size)
+
+
+def _convert_with_cache(
+    png_path: str,
+    ico_path: str,
+    size: int,
+    sizes: Optional[list[int]],
+    cache: 'ConversionCache',
+    reducing_gap: Optional[float],
+    mipmap: bool
+) -> None:
+    """キャッシュを参照し、ミス時のみPillowで変換する"""
+    with open(png_path, 'rb') as f:
+        png_data = f.read()
 
-    resized_image.save(ico_path, format='ICO', sizes=[(size, size)])
+    ico_data = png_to_ico_bytes(png_data, size, sizes, cache, reducing_gap, mipmap, png_path)
+
+    with stage(STAGE_WRITE, png_path, len(ico_data)) as timing:
+        with open(ico_path, 'wb') as f:
+            f.write(ico_data)
+        timing.bytes_out = len(ico_data)
+
+
+def png_to_ico_bytes(
+    png_data: bytes,
+    size: int = 128,
+    sizes: Optional[list[int]] = None,
+    cache: Optional['ConversionCache'] = None,
+    reducing_gap: Optional[float] = DEFAULT_REDUCING_GAP,
+    mipmap: bool = False,
+    source: Optional[str] = None
+) -> bytes:
+    """PNGデータをICOデータに変換します（ファイルを読み書きしない版、引数は convert_png_to_ico と同じ）
+
+    Args:
+        png_data: PNGのバイト列
+        source: 計測結果に記録する入力ファイルのパス（省略可）
+    """
+    key = None
+    if cache is not None:
+        key = cache.make_key(png_data, operation='png_to_ico', size=size, sizes=sizes, resample=resample_name(reducing_gap, mipmap=bool(sizes and mipmap)))
+        ico_data = cache.get(key)
+        if ico_data is not None:
+            logger.debug("キャッシュを使用しました: %s", source)
+            return ico_data
 
-    print(f"変換完了: {png_path} -> {ico_path}")
-    print(f"出力ICOサイズ: {size}x{size} のみ")
+    buffer = io.BytesIO()
+    _write_ico(Image.open(io.BytesIO(png_data)), buffer, size, sizes, source, reducing_gap, mipmap)
+    ico_data = buffer.getvalue()
+    if cache is not None and key is not None:
+        cache.put(key, ico_data)
+    return ico_data
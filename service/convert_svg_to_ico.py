@@ -0,0 +1,206 @@
+import io
+import logging
+from typing import IO, TYPE_CHECKING, Optional, Union
+
+from PIL import Image
+
+from service.convert_png_to_ico import normalize_ico_sizes, save_ico_frames
+from service.convert_svg_to_png import render_cached
+from service.instrumentation import STAGE_ICO_ENCODE, STAGE_PNG_DECODE, STAGE_RESIZE, STAGE_WRITE, stage
+from service.raster_bridge import unpremultiply
+from service.resize_strategy import resample_name, resize_image
+from service.svg_renderer import render_image, render_png
+
+if TYPE_CHECKING:
+    from service.conversion_cache import ConversionCache
+
+logger = logging.getLogger(__name__)
+
+
+def convert_svg_to_ico(
+    svg_path: str,
+    ico_path: str,
+    icon_size: int = 128,
+    ico_size: int = 128,
+    png_path: Optional[str] = None,
+    sizes: Optional[list[int]] = None,
+    cache: Optional['ConversionCache'] = None
+) -> None:
+    """SVGファイルを中間PNGファイルを経由せずにICOファイルに変換します
+
+    cairoのサーフェスのピクセルをPNGにエンコードせずにPillowの画像として受け取り、リサイズ・ICOエンコードを行います
+    （キャッシュ指定時は、SVG→PNG変換と共有するためラスタライズ結果をPNGデータとしてキャッシュします）。
+    sizes指定時は各サイズをCairoSVGでネイティブ解像度にラスタライズし、1つのICOにまとめて書き込みます。
+    SVGの解析は svg_renderer で1回のみ行い、全サイズのラスタライズで再利用します。
+
+    Args:
+        svg_path: 入力SVGファイルのパス
+        ico_path: 出力ICOファイルのパス
+        icon_size: ラスタライズ時のサイズ（ピクセル）
+        ico_size: アイコンのサイズ（ピクセル）
+        png_path: 中間PNGを保存する場合の出力パス（省略時は保存しない）
+        sizes: マルチサイズICOに格納するサイズのリスト（指定時はico_sizeより優先）
+        cache: 変換結果キャッシュ（指定時はヒットするとCairoSVG・Pillowを呼び出さない）
+    """
+    if sizes:
+        logger.debug("SVG→ICO変換: マルチサイズ指定 %s", sizes)
+    else:
+        logger.debug("SVG→ICO変換: ラスタライズ %sx%s / ICO %sx%s", icon_size, icon_size, ico_size, ico_size)
+
+    # SVGファイルの読み込みは1回のみ（相対参照の解決用にurlも渡す）
+    with open(svg_path, 'rb') as f:
+        svg_data = f.read()
+
+    ico_data = svg_to_ico_bytes(svg_data, svg_path, icon_size, ico_size, sizes, cache, png_path)
+    _write_output(ico_data, ico_path, svg_path)
+    logger.info("変換完了: %s -> %s", svg_path, ico_path)
+
+
+def svg_to_ico_bytes(
+    svg_data: bytes,
+    url: Optional[str] = None,
+    icon_size: int = 128,
+    ico_size: int = 128,
+    sizes: Optional[list[int]] = None,
+    cache: Optional['ConversionCache'] = None,
+    png_path: Optional[str] = None
+) -> bytes:
+    """SVGデータをICOデータに変換します（ファイルを読み書きしない版、引数は convert_svg_to_ico と同じ）
+
+    Args:
+        svg_data: SVGのバイト列
+        url: SVGファイルのパス（相対参照の解決と計測結果に使用、省略可）
+    """
+    key = None
+    if cache is not None:
+        key = cache.make_key(svg_data, operation='svg_to_ico', icon_size=icon_size, ico_size=ico_size, sizes=sizes, resample=resample_name())
+        ico_data = cache.get(key)
+        if ico_data is not None:
+            if png_path is not None:
+                _save_png(render_cached(svg_data, url, icon_size, cache), png_path)
+            logger.debug("キャッシュを使用しました: %s", url)
+            return ico_data
+
+    buffer = io.BytesIO()
+    if sizes:
+        _write_multi_size_ico(svg_data, url, buffer, icon_size, png_path, sizes, cache)
+    else:
+        _write_single_size_ico(svg_data, url, buffer, icon_size, ico_size, png_path, cache)
+    ico_data = buffer.getvalue()
+    if cache is not None and key is not None:
+        cache.put(key, ico_data)
+    return ico_data
+
+
+def _decode_png(png_data: bytes, svg_path: Optional[str]) -> Image.Image:
+    """PNGデータをPillowの画像にデコード"""
+    with stage(STAGE_PNG_DECODE, svg_path, len(png_data)) as timing:
+        image = Image.open(io.BytesIO(png_data))
+        image.load()
+        timing.size = image.size[0]
+    return image
+
+
+def _write_output(ico_data: bytes, ico_path: str, svg_path: str) -> None:
+    """ICOデータをファイルに書き込み"""
+    with stage(STAGE_WRITE, svg_path, len(ico_data)) as timing:
+        with open(ico_path, 'wb') as f:
+            f.write(ico_data)
+        timing.bytes_out = len(ico_data)
+
+
+def _save_png(png_data: bytes, png_path: str) -> None:
+    with open(png_path, 'wb') as f:
+        f.write(png_data)
+    logger.debug("中間PNGを保存しました: %s", png_path)
+
+
+def _render(svg_data: bytes, svg_path: Optional[str], size: int, cache: Optional['ConversionCache']) -> bytes:
+    """PNGデータへのラスタライズ（キャッシュ指定時は同じSVG・サイズのSVG→PNG変換の結果を再利用）"""
+    if cache is None:
+        return render_png(svg_data, svg_path, size)
+    return render_cached(svg_data, svg_path, size, cache)
+
+
+def _render_frame(svg_data: bytes, svg_path: Optional[str], size: int, cache: Optional['ConversionCache']) -> Union[bytes, Image.Image]:
+    """ICOのフレームのラスタライズ（キャッシュ未指定時はPNGを経由せずにPillowの画像を返す）"""
+    if cache is None:
+        return render_image(svg_data, svg_path, size)
+    return render_cached(svg_data, svg_path, size, cache)
+
+
+def _to_image(frame: Union[bytes, Image.Image], svg_path: Optional[str]) -> Image.Image:
+    return frame if isinstance(frame, Image.Image) else _decode_png(frame, svg_path)
+
+
+def build_ico(
+    frames: list[Union[bytes, Image.Image]],
+    svg_path: Optional[str],
+    ico_file: IO[bytes],
+    ico_size: Optional[int] = None
+) -> None:
+    """ラスタライズ済みのフレームからICOを作成
+
+    Args:
+        frames: 各サイズのPNGデータ、またはPillowの画像（cairoから受け取った乗算済みモードの画像も可）
+        svg_path: 計測結果に記録する入力ファイルのパス（バイト列から変換する場合はNone）
+        ico_file: 出力先
+        ico_size: 指定時は先頭のフレームをこのサイズにリサイズした単一サイズのICOを作成
+    """
+    if ico_size is None:
+        save_ico_frames([unpremultiply(_to_image(frame, svg_path)) for frame in frames], ico_file, svg_path)
+        return
+
+    original_image = _to_image(frames[0], svg_path)
+    with stage(STAGE_RESIZE, svg_path, size=ico_size):
+        resized_image = resize_image(original_image, ico_size)
+    with stage(STAGE_ICO_ENCODE, svg_path, size=ico_size) as timing:
+        resized_image.save(ico_file, format='ICO', sizes=[(ico_size, ico_size)])
+        timing.bytes_out = ico_file.tell()
+
+
+def write_ico_file(
+    frames: list[Union[bytes, Image.Image]],
+    svg_path: str,
+    ico_path: str,
+    ico_size: Optional[int] = None
+) -> None:
+    """ラスタライズ済みのフレームからICOファイルを作成（build_icoの結果を1回で書き込む）"""
+    buffer = io.BytesIO()
+    build_ico(frames, svg_path, buffer, ico_size)
+    _write_output(buffer.getvalue(), ico_path, svg_path)
+
+
+def _write_single_size_ico(
+    svg_data: bytes,
+    svg_path: Optional[str],
+    ico_file: IO[bytes],
+    icon_size: int,
+    ico_size: int,
+    png_path: Optional[str],
+    cache: Optional['ConversionCache'] = None
+) -> None:
+    """icon_sizeでラスタライズした画像をico_sizeにリサイズしてICOを作成"""
+    if png_path is not None:
+        # 中間PNGを保存する場合は、保存するPNGデータをデコードして使用する
+        frame = _render(svg_data, svg_path, icon_size, cache)
+        _save_png(frame, png_path)
+    else:
+        frame = _render_frame(svg_data, svg_path, icon_size, cache)
+    build_ico([frame], svg_path, ico_file, ico_size)
+
+
+def _write_multi_size_ico(
+    svg_data: bytes,
+    svg_path: Optional[str],
+    ico_file: IO[bytes],
+    icon_size: int,
+    png_path: Optional[str],
+    sizes: list[int],
+    cache: Optional['ConversionCache'] = None
+) -> None:
+    """各サイズをネイティブ解像度でラスタライズしてマルチサイズICOを作成"""
+    frames = [_render_frame(svg_data, svg_path, size, cache) for size in normalize_ico_sizes(sizes)]
+    if png_path is not None:
+        _save_png(_render(svg_data, svg_path, icon_size, cache), png_path)
+    build_ico(frames, svg_path, ico_file)
@@ -1,15 +1,31 @@
-from typing import Any, Optional
+import logging
+import os
+from typing import TYPE_CHECKING, Any, Optional
 
 import cairosvg
 
+from service.instrumentation import STAGE_SVG_RENDER, STAGE_WRITE, stage
+from service.svg_renderer import get_renderer, render_png
 
-def convert_svg_to_png(input_file_path: Optional[str] = None, output_file_path: Optional[str] = None, output_size: Optional[int] = None) -> Optional[str]:
+if TYPE_CHECKING:
+    from service.conversion_cache import ConversionCache
+
+logger = logging.getLogger(__name__)
+
+
+def convert_svg_to_png(
+    input_file_path: Optional[str] = None,
+    output_file_path: Optional[str] = None,
+    output_size: Optional[int] = None,
+    cache: Optional['ConversionCache'] = None
+) -> Optional[str]:
     """SVGファイルをPNG形式に変換します
 
     Args:
         input_file_path: 入力SVGファイルのパス
         output_file_path: 出力PNGファイルのパス
         output_size: 出力PNGのサイズ（ピクセル）
+        cache: 変換結果キャッシュ（指定時はヒットするとCairoSVGを呼び出さない）
     """
 
     try:
@@ -20,16 +36,78 @@ def convert_svg_to_png(input_file_path: Optional[str] = None, output_file_path:
         if output_size is not None:
             kwargs['output_width'] = output_size
             kwargs['output_height'] = output_size
-            print(f"SVG→PNG変換: サイズ指定 {output_size}x{output_size}")
+            logger.debug("SVG→PNG変換: サイズ指定 %sx%s", output_size, output_size)
         else:
-            print("SVG→PNG変換: サイズ指定なし（元のサイズを使用）")
+            logger.debug("SVG→PNG変換: サイズ指定なし（元のサイズを使用）")
 
-        cairosvg.svg2png(**kwargs)
-        print(f"変換が完了しました: {output_file_path}")
+        if cache is not None:
+            _convert_with_cache(kwargs, cache)
+        else:
+            with stage(STAGE_SVG_RENDER, input_file_path, size=output_size):
+                cairosvg.svg2png(**kwargs)
+        logger.info("変換が完了しました: %s", output_file_path)
         return output_file_path
-    except FileNotFoundError as e:
-        print(f"エラー: 入力ファイルが見つかりません: {input_file_path}")
+    except FileNotFoundError:
+        logger.error("入力ファイルが見つかりません: %s", input_file_path)
         raise
     except Exception as e:
-        print(f"エラーが発生しました: {e}")
+        logger.error("エラーが発生しました: %s", e)
         raise
+
+
+def render_cached(svg_data: bytes, url: Optional[str], size: Optional[int], cache: Optional['ConversionCache'] = None) -> bytes:
+    """SVGデータをPNGデータにラスタライズ（キャッシュ指定時はSVG→PNG変換と同じキーで結果を共有）"""
+    if cache is None:
+        return render_png(svg_data, url, size)
+    key = cache.make_key(svg_data, operation='svg_to_png', output_size=size)
+    png_data = cache.get(key)
+    if png_data is None:
+        png_data = render_png(svg_data, url, size)
+        cache.put(key, png_data)
+    else:
+        logger.debug("キャッシュを使用しました: %s (%s)", url, size)
+    return png_data
+
+
+def _convert_with_cache(kwargs: dict[str, Any], cache: 'ConversionCache') -> None:
+    """キャッシュを参照し、ミス時のみCairoSVGでラスタライズする"""
+    input_file_path = kwargs.pop('url')
+    output_file_path = kwargs.pop('write_to')
+    with open(input_file_path, 'rb') as f:
+        svg_data = f.read()
+
+    png_data = render_cached(svg_data, input_file_path, kwargs.get('output_width'), cache)
+    with stage(STAGE_WRITE, input_file_path, len(png_data)) as timing:
+        with open(output_file_path, 'wb') as f:
+            f.write(png_data)
+        timing.bytes_out = len(png_data)
+
+
+def convert_svg_to_png_sizes(input_file_path: str, output_dir: str, sizes: list[int]) -> list[str]:
+    """1つのSVGから複数サイズのPNG（`<名前>_<サイズ>.png`）を作成します
+
+    SVGの解析は1回のみ行い、全サイズのラスタライズで解析結果を再利用します。
+
+    Args:
+        input_file_path: 入力SVGファイルのパス
+        output_dir: 出力ディレクトリ
+        sizes: 出力するPNGのサイズ（ピクセル）のリスト
+
+    Returns:
+        出力したPNGファイルのパスのリスト
+    """
+    with open(input_file_path, 'rb') as f:
+        svg_data = f.read()
+
+    base_name = os.path.splitext(os.path.basename(input_file_path))[0]
+    os.makedirs(output_dir, exist_ok=True)
+    output_paths = []
+    for size, png_data in get_renderer().render_sizes(svg_data, input_file_path, sizes).items():
+        output_path = os.path.join(output_dir, f"{base_name}_{size}.png")
+        with stage(STAGE_WRITE, input_file_path, len(png_data)) as timing:
+            with open(output_path, 'wb') as f:
+                f.write(png_data)
+            timing.bytes_out = len(png_data)
+        output_paths.append(output_path)
+    logger.info("変換が完了しました: %s -> %d サイズ", input_file_path, len(output_paths))
+    return output_paths
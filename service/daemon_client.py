@@ -0,0 +1,141 @@
+import http.client
+import json
+import os
+from typing import Optional
+from urllib.parse import urlencode
+
+# 変換デーモンの既定の待ち受けアドレス（外部から接続できないようループバックのみ）
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 60.0
+
+# 変換モードごとの出力のContent-Type
+OUTPUT_CONTENT_TYPES = {
+    'svg_to_png': 'image/png',
+    'svg_to_ico': 'image/x-icon',
+    'png_to_ico': 'image/x-icon',
+}
+
+
+class DaemonError(RuntimeError):
+    """変換デーモンがエラーを返した場合の例外（statusはHTTPステータスコード）"""
+
+    def __init__(self, message: str, status: int = 0):
+        super().__init__(message)
+        self.status = status
+
+
+class DaemonClient:
+    """変換デーモン（service/conversion_daemon.py）のクライアント
+
+    標準ライブラリのみを使用し、CairoSVG・Pillowを読み込まずに変換を依頼します。
+    接続はリクエスト間で再利用します（デーモンが再起動した場合は1回だけ接続し直します）。
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = DEFAULT_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._connection: Optional[http.client.HTTPConnection] = None
+
+    def _send(self, method: str, path: str, body: Optional[bytes], headers: dict) -> tuple[int, str, bytes]:
+        if self._connection is None:
+            self._connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        self._connection.request(method, path, body, headers)
+        response = self._connection.getresponse()
+        return response.status, response.getheader('Content-Type', ''), response.read()
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None, content_type: Optional[str] = None) -> tuple[int, str, bytes]:
+        """リクエストを送信し、（ステータス, Content-Type, 本文）を返す"""
+        headers = {'Content-Type': content_type} if content_type else {}
+        try:
+            return self._send(method, path, body, headers)
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            # 保持していた接続がデーモン側で閉じられていた場合は接続し直す
+            self.close()
+            return self._send(method, path, body, headers)
+
+    def _request_json(self, method: str, path: str, payload: Optional[dict] = None) -> dict:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        status, _, data = self._request(method, path, body, 'application/json' if body is not None else None)
+        result = json.loads(data.decode('utf-8')) if data else {}
+        if status >= 400:
+            raise DaemonError(result.get('error', f"HTTP {status}"), status)
+        return result
+
+    def health(self) -> dict:
+        """デーモンの状態（プロセスID・ワーカー数・処理件数）を取得"""
+        return self._request_json('GET', '/health')
+
+    def is_running(self) -> bool:
+        """デーモンに接続できるか"""
+        try:
+            self.health()
+            return True
+        except (OSError, DaemonError):
+            self.close()
+            return False
+
+    def convert_data(
+        self,
+        mode: str,
+        data: bytes,
+        icon_size: Optional[int] = None,
+        ico_size: Optional[int] = None,
+        ico_sizes: Optional[list[int]] = None
+    ) -> bytes:
+        """SVG/PNGのバイト列を送信し、変換結果（PNG/ICO）のバイト列を受け取る
+
+        サイズを省略した場合はデーモンの既定値（起動時のconfig.ini）を使用します。
+        """
+        params: dict[str, object] = {'icon_size': icon_size, 'ico_size': ico_size}
+        if ico_sizes:
+            params['ico_sizes'] = ','.join(str(size) for size in ico_sizes)
+        query = urlencode({key: value for key, value in params.items() if value is not None})
+        status, content_type, body = self._request(
+            'POST', f"/convert/{mode}" + (f"?{query}" if query else ''), data, 'application/octet-stream'
+        )
+        if status >= 400:
+            message = json.loads(body.decode('utf-8')).get('error') if content_type == 'application/json' else None
+            raise DaemonError(message or f"HTTP {status}", status)
+        return body
+
+    def convert_file(
+        self,
+        mode: str,
+        source_path: str,
+        output_path: str,
+        icon_size: Optional[int] = None,
+        ico_size: Optional[int] = None,
+        ico_sizes: Optional[list[int]] = None
+    ) -> dict:
+        """入力・出力ファイルのパスを送信してデーモンに変換させる（相対パスはこのプロセスの作業フォルダ基準）
+
+        Returns:
+            変換結果（source_path・output_path・elapsed・cache_hit）
+        """
+        payload = {
+            'mode': mode,
+            'source': os.path.abspath(source_path),
+            'output': os.path.abspath(output_path),
+            'icon_size': icon_size,
+            'ico_size': ico_size,
+            'ico_sizes': ico_sizes,
+        }
+        return self._request_json('POST', '/convert', {key: value for key, value in payload.items() if value is not None})
+
+    def shutdown(self) -> None:
+        """デーモンを終了させる"""
+        self._request_json('POST', '/shutdown', {})
+        self.close()
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self) -> 'DaemonClient':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,185 @@
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Iterator, Optional
+
+# 変換処理の段階名
+STAGE_SVG_PARSE = 'svg_parse'
+STAGE_SVG_RENDER = 'svg_render'
+STAGE_PNG_DECODE = 'png_decode'
+STAGE_RESIZE = 'resize'
+STAGE_ICO_ENCODE = 'ico_encode'
+STAGE_WRITE = 'write'
+# 起動時間の段階名（モジュールの読み込み完了・ウィンドウの初回描画までの経過時間）
+STAGE_STARTUP_IMPORT = 'startup_import'
+STAGE_FIRST_FRAME = 'startup_first_frame'
+
+# プロファイルを保存するまでの1ファイルあたりの所要時間（秒）の既定値
+DEFAULT_PROFILE_THRESHOLD = 1.0
+
+
+@dataclass
+class StageTiming:
+    """変換処理の1段階分の所要時間と入出力バイト数"""
+    stage: str
+    elapsed: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    source: Optional[str] = None
+    size: Optional[int] = None
+
+
+Sink = Callable[[StageTiming], None]
+
+_sinks: list[Sink] = []
+_sinks_lock = threading.Lock()
+# 実行中のcollect_timings()の記録先（ワーカープロセスで計測し、結果と一緒に親プロセスへ返すため）
+_collector: ContextVar[Optional[list[StageTiming]]] = ContextVar('_collector', default=None)
+
+
+def add_sink(sink: Sink) -> None:
+    """計測結果の出力先を追加（StageTimingを受け取る任意の関数を指定可能）"""
+    with _sinks_lock:
+        _sinks.append(sink)
+
+
+def remove_sink(sink: Sink) -> None:
+    """計測結果の出力先を削除"""
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def emit(timing: StageTiming) -> None:
+    """計測結果を登録済みの全ての出力先へ送る"""
+    with _sinks_lock:
+        sinks = list(_sinks)
+    for sink in sinks:
+        sink(timing)
+
+
+@contextmanager
+def stage(name: str, source: Optional[str] = None, bytes_in: int = 0, size: Optional[int] = None) -> Iterator[StageTiming]:
+    """withブロックの所要時間を1段階分として計測
+
+    出力バイト数はブロック内で yield された StageTiming の bytes_out に設定します。
+    collect_timings() の内側では出力先へ送らずに記録のみ行います。
+    """
+    timing = StageTiming(name, bytes_in=bytes_in, source=source, size=size)
+    start = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing.elapsed = time.perf_counter() - start
+        collected = _collector.get()
+        if collected is not None:
+            collected.append(timing)
+        else:
+            emit(timing)
+
+
+@contextmanager
+def collect_timings() -> Iterator[list[StageTiming]]:
+    """withブロック内で計測した段階をリストに記録（出力先へは送らない）"""
+    collected: list[StageTiming] = []
+    token = _collector.set(collected)
+    try:
+        yield collected
+    finally:
+        _collector.reset(token)
+
+
+@dataclass
+class ProfileCapture:
+    """profile_if_slow()の結果（保存した場合のみpathを設定）"""
+    elapsed: float = 0.0
+    path: Optional[str] = None
+
+
+@contextmanager
+def profile_if_slow(
+    name: str,
+    output_dir: Optional[str],
+    threshold: float = DEFAULT_PROFILE_THRESHOLD
+) -> Iterator[ProfileCapture]:
+    """withブロックをcProfileで計測し、threshold秒以上かかった場合のみ `<name>.prof` を保存
+
+    output_dirがNoneの場合は計測しません。保存したファイルは `python -m pstats` や snakeviz で確認できます。
+    """
+    capture = ProfileCapture()
+    if output_dir is None:
+        yield capture
+        return
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield capture
+    finally:
+        profiler.disable()
+        capture.elapsed = time.perf_counter() - start
+        if capture.elapsed >= threshold:
+            os.makedirs(output_dir, exist_ok=True)
+            capture.path = os.path.join(output_dir, f"{name}.prof")
+            profiler.dump_stats(capture.path)
+
+
+class JsonLinesSink:
+    """計測結果をJSON Lines形式でファイルに追記する出力先"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, timing: StageTiming) -> None:
+        line = json.dumps(asdict(timing), ensure_ascii=False)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+@dataclass
+class StageCounter:
+    """1段階分の集計値"""
+    count: int = 0
+    total_elapsed: float = 0.0
+    max_elapsed: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    @property
+    def mean_elapsed(self) -> float:
+        return self.total_elapsed / self.count if self.count else 0.0
+
+
+@dataclass
+class CountersRegistry:
+    """段階ごとの件数・所要時間・バイト数を集計する出力先"""
+    counters: dict[str, StageCounter] = field(default_factory=dict)
+
+    def __call__(self, timing: StageTiming) -> None:
+        counter = self.counters.setdefault(timing.stage, StageCounter())
+        counter.count += 1
+        counter.total_elapsed += timing.elapsed
+        counter.max_elapsed = max(counter.max_elapsed, timing.elapsed)
+        counter.bytes_in += timing.bytes_in
+        counter.bytes_out += timing.bytes_out
+
+    def reset(self) -> None:
+        self.counters.clear()
+
+    def format_summary(self) -> str:
+        """段階ごとの集計を表示用の文字列に整形"""
+        lines = []
+        for name, counter in sorted(self.counters.items(), key=lambda item: item[1].total_elapsed, reverse=True):
+            lines.append(
+                f"{name}: {counter.count}回 合計 {counter.total_elapsed:.3f}秒 "
+                f"平均 {counter.mean_elapsed * 1000:.1f}ms 最大 {counter.max_elapsed * 1000:.1f}ms "
+                f"出力 {counter.bytes_out}バイト"
+            )
+        return "\n".join(lines)
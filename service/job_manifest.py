@@ -0,0 +1,266 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+import tomllib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+
+from service.batch_convert import BatchReport, BatchResult
+from service.conversion_cache import ConversionCache
+from service.job_scheduler import JobGraph, add_conversion
+from service.memory_budget import get_peak_rss, max_peak_rss
+
+logger = logging.getLogger(__name__)
+
+RESULT_MANIFEST_VERSION = 1
+
+# マニフェストの defaults・jobs の各項目に指定できるキー（サイズの名前はconfig.iniの[Icon]と同じ）
+DEFAULTS_KEYS = {'output_path', 'icon_size', 'ico_size', 'ico_sizes'}
+JOB_KEYS = {'source', 'format', 'output', 'output_dir', 'icon_size', 'ico_size', 'sizes'}
+
+# (入力拡張子, 出力形式) -> 変換モード
+JOB_MODES = {
+    ('.svg', 'png'): 'svg_to_png',
+    ('.svg', 'ico'): 'svg_to_ico',
+    ('.png', 'ico'): 'png_to_ico',
+}
+
+
+@dataclass(frozen=True)
+class JobDefaults:
+    """マニフェストで省略した項目の既定値（config.iniの[Paths]・[Icon]と同じ名前）"""
+    output_path: Optional[str] = None
+    icon_size: int = 128
+    ico_size: int = 128
+    ico_sizes: tuple[int, ...] = ()
+
+
+@dataclass(frozen=True)
+class ConversionJob:
+    """1出力ファイル分の変換ジョブ"""
+    source: str
+    output: str
+    format: str
+    mode: str
+    icon_size: int
+    ico_size: int
+    ico_sizes: Optional[tuple[int, ...]] = None
+
+
+@dataclass
+class JobManifest:
+    """変換ジョブの一覧（マニフェストファイルの内容）"""
+    path: str
+    output_dir: str
+    jobs: list[ConversionJob] = field(default_factory=list)
+
+
+def _read_manifest_file(path: str) -> dict[str, Any]:
+    if path.lower().endswith('.toml'):
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    if path.lower().endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    raise ValueError(f"マニフェストはTOMLまたはJSONで指定してください: {path}")
+
+
+def _check_keys(entry: Any, allowed: set[str], name: str) -> None:
+    if not isinstance(entry, dict):
+        raise ValueError(f"{name} はテーブル（オブジェクト）で指定してください: {entry!r}")
+    unknown = sorted(set(entry) - allowed)
+    if unknown:
+        raise ValueError(f"{name} に不明な項目があります: {unknown}（指定できる項目: {sorted(allowed)}）")
+
+
+def _get_size(value: Any, name: str) -> int:
+    if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+        raise ValueError(f"{name} は正の整数で指定してください: {value!r}")
+    return value
+
+
+def _get_sizes(value: Any, name: str) -> tuple[int, ...]:
+    if isinstance(value, int):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(size, int) and size > 0 for size in value):
+        raise ValueError(f"{name} は正の整数のリストで指定してください: {value!r}")
+    return tuple(value)
+
+
+def _expand_job(entry: dict[str, Any], index: int, base_dir: str, output_dir: str, defaults: JobDefaults) -> list[ConversionJob]:
+    """マニフェストの1項目を出力ファイルごとのジョブに展開"""
+    _check_keys(entry, JOB_KEYS, f"jobs[{index}]")
+    if 'source' not in entry:
+        raise ValueError(f"jobs[{index}] に source がありません")
+    output_format = str(entry.get('format', 'ico')).lower()
+    pattern = os.path.join(base_dir, entry['source'])
+    sources = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    if not sources:
+        raise FileNotFoundError(f"jobs[{index}] の source に一致するファイルがありません: {entry['source']}")
+    output = entry.get('output')
+    if output is not None and len(sources) > 1:
+        raise ValueError(f"jobs[{index}] の source が複数のファイルに一致するため output は指定できません")
+
+    job_output_dir = os.path.join(output_dir, entry.get('output_dir', ''))
+    icon_size = _get_size(entry['icon_size'], f"jobs[{index}].icon_size") if 'icon_size' in entry else defaults.icon_size
+    ico_size = _get_size(entry['ico_size'], f"jobs[{index}].ico_size") if 'ico_size' in entry else defaults.ico_size
+    sizes = _get_sizes(entry['sizes'], f"jobs[{index}].sizes") if 'sizes' in entry else None
+
+    jobs = []
+    for source in sources:
+        extension = os.path.splitext(source)[1].lower()
+        mode = JOB_MODES.get((extension, output_format))
+        if mode is None:
+            raise ValueError(f"jobs[{index}]: {extension} から {output_format} には変換できません")
+        base_name = os.path.splitext(os.path.basename(source))[0]
+        if output_format == 'png' and sizes:
+            # PNGはサイズごとに1ファイル（outputには {size} を含める）
+            template = output or f"{base_name}_{{size}}.png"
+            if '{size}' not in template and len(sizes) > 1:
+                raise ValueError(f"jobs[{index}] の output に {{size}} が含まれていません: {template}")
+            jobs.extend(
+                ConversionJob(source, os.path.join(job_output_dir, template.format(size=size)), output_format, mode, size, ico_size)
+                for size in sizes
+            )
+        else:
+            ico_sizes = sizes if sizes is not None else (defaults.ico_sizes or None)
+            if 'ico_size' in entry and 'sizes' not in entry:
+                # ico_sizeのみ指定された場合は単一サイズのICOを出力する
+                ico_sizes = None
+            output_path = os.path.join(job_output_dir, output or f"{base_name}.{output_format}")
+            jobs.append(ConversionJob(source, output_path, output_format, mode, icon_size, ico_size, ico_sizes))
+    return jobs
+
+
+def load_job_manifest(path: str, defaults: Optional[JobDefaults] = None) -> JobManifest:
+    """TOMLまたはJSONのマニフェストを読み込み、出力ファイルごとのジョブに展開します
+
+    source・output_path・outputの相対パスはマニフェストのあるディレクトリを基準とします。
+
+    Args:
+        path: マニフェストファイルのパス（.toml / .json）
+        defaults: マニフェストで省略した項目の既定値（通常はconfig.iniの値）
+
+    Returns:
+        展開したジョブの一覧
+
+    Raises:
+        ValueError: マニフェストの内容が不正な場合
+        FileNotFoundError: sourceに一致するファイルがない場合
+    """
+    defaults = defaults or JobDefaults()
+    data = _read_manifest_file(path)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    options = data.get('defaults', {})
+    _check_keys(options, DEFAULTS_KEYS, 'defaults')
+    defaults = JobDefaults(
+        options.get('output_path', defaults.output_path),
+        _get_size(options['icon_size'], 'defaults.icon_size') if 'icon_size' in options else defaults.icon_size,
+        _get_size(options['ico_size'], 'defaults.ico_size') if 'ico_size' in options else defaults.ico_size,
+        _get_sizes(options['ico_sizes'], 'defaults.ico_sizes') if 'ico_sizes' in options else defaults.ico_sizes,
+    )
+    if not defaults.output_path:
+        raise ValueError("出力ディレクトリ（defaults.output_path）が指定されていません")
+    output_dir = os.path.join(base_dir, defaults.output_path)
+
+    entries = data.get('jobs')
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"マニフェストに jobs がありません: {path}")
+    jobs = []
+    for index, entry in enumerate(entries):
+        jobs.extend(_expand_job(entry, index, base_dir, output_dir, defaults))
+
+    outputs = [os.path.normpath(job.output) for job in jobs]
+    duplicates = sorted({output for output in outputs if outputs.count(output) > 1})
+    if duplicates:
+        raise ValueError(f"出力ファイルが重複しています: {duplicates}")
+    return JobManifest(os.path.abspath(path), output_dir, jobs)
+
+
+def run_job_manifest(
+    manifest: JobManifest,
+    cache: Optional[ConversionCache] = None,
+    max_workers: Optional[int] = None,
+    memory_budget: Optional[int] = None
+) -> BatchReport:
+    """マニフェストの全ジョブを1つのバッチとしてプロセスプールで実行します（キャッシュは全ジョブで共有）
+
+    ジョブは工程（ラスタライズ・PNG書き込み・ICO作成）の依存グラフに分解し、同じSVGを同じサイズで
+    ラスタライズする工程はPNG出力とICOのフレームの間で1回にまとめます。
+    memory_budget指定時は、同時に実行する工程の見積もりメモリ量の合計を予算（バイト）以下に抑えます。
+    """
+    start = time.perf_counter()
+    for output_dir in sorted({os.path.dirname(job.output) for job in manifest.jobs}):
+        os.makedirs(output_dir, exist_ok=True)
+    logger.info("マニフェストを実行: %s (%d ジョブ)", manifest.path, len(manifest.jobs))
+    graph = JobGraph()
+    sinks = [
+        add_conversion(
+            graph, job.mode, job.source, job.output, job.icon_size, job.ico_size,
+            list(job.ico_sizes) if job.ico_sizes else None
+        )
+        for job in manifest.jobs
+    ]
+    node_results = graph.run(cache, max_workers, memory_budget=memory_budget)
+    results = [graph.collect(sink, node_results, job.source, job.output) for job, sink in zip(manifest.jobs, sinks)]
+    peak_rss = max_peak_rss(get_peak_rss(), *(result.peak_rss for result in results))
+    report = BatchReport(results, time.perf_counter() - start, peak_rss)
+    logger.info("マニフェストの実行完了: 成功 %d / 失敗 %d (%.2f秒)", len(report.succeeded), len(report.failed), report.elapsed)
+    return report
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _job_result(job: ConversionJob, result: BatchResult) -> dict[str, Any]:
+    entry: dict[str, Any] = {
+        'source': job.source,
+        'output': job.output,
+        'format': job.format,
+        'mode': job.mode,
+        'sizes': list(job.ico_sizes) if job.ico_sizes else [job.icon_size if job.format == 'png' else job.ico_size],
+        'status': 'ok' if result.succeeded else 'error',
+        'elapsed_ms': result.elapsed * 1000,
+        'cache_hit': result.cache_hit,
+        'peak_rss_bytes': result.peak_rss,
+        'stages_ms': {},
+        'error': result.error,
+    }
+    for timing in result.stages:
+        entry['stages_ms'][timing.stage] = entry['stages_ms'].get(timing.stage, 0.0) + timing.elapsed * 1000
+    if result.succeeded and os.path.isfile(job.output):
+        entry['sha256'] = _hash_file(job.output)
+        entry['bytes'] = os.path.getsize(job.output)
+    return entry
+
+
+def build_result_manifest(manifest: JobManifest, report: BatchReport) -> dict[str, Any]:
+    """実行結果（出力パス・ハッシュ・所要時間・エラー）をまとめた結果マニフェストを作成"""
+    return {
+        'version': RESULT_MANIFEST_VERSION,
+        'manifest': manifest.path,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'elapsed_ms': report.elapsed * 1000,
+        'succeeded': len(report.succeeded),
+        'failed': len(report.failed),
+        'cache_hits': report.cache_hits,
+        'peak_rss_bytes': report.peak_rss,
+        'jobs': [_job_result(job, result) for job, result in zip(manifest.jobs, report.results)],
+    }
+
+
+def write_result_manifest(path: str, result_manifest: dict[str, Any]) -> None:
+    """結果マニフェストをJSONで書き込み"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result_manifest, f, ensure_ascii=False, indent=2)
+    logger.info("結果マニフェストを保存しました: %s", path)
@@ -0,0 +1,404 @@
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from service.batch_convert import BatchResult, _get_process_cache
+from service.conversion_cache import ConversionCache
+from service.instrumentation import StageTiming, collect_timings, emit
+from service.memory_budget import (
+    MemoryBudget,
+    estimate_frames_memory,
+    estimate_render_memory,
+    estimate_task_memory,
+    get_peak_rss,
+    max_peak_rss,
+)
+from service.shared_raster import (
+    MIN_SHARED_BYTES,
+    SharedRaster,
+    Slab,
+    SlabAllocator,
+    get_slab_allocator,
+    load_shared,
+    png_capacity,
+    store_shared,
+)
+from service.worker_pool import get_worker_pool
+
+logger = logging.getLogger(__name__)
+
+NodeKey = tuple
+
+
+@dataclass(frozen=True)
+class Node:
+    """変換処理の1工程（依存する工程の結果を inputs として受け取る）
+
+    funcはワーカープロセスで実行するため、モジュールレベルの関数を指定します。
+    呼び出し形式は func(inputs, cache, *args) です。memoryは実行時に使用するメモリ量の見積もり（バイト）です。
+    output_bytesは出力（bytes・Pillowの画像）の最大サイズの見積もりで、指定した工程の出力は
+    共有メモリ（service.shared_raster）を経由して受け渡します。
+    """
+    key: NodeKey
+    func: Callable[..., Any]
+    args: tuple = ()
+    deps: tuple[NodeKey, ...] = ()
+    memory: int = 0
+    output_bytes: int = 0
+
+
+@dataclass
+class NodeResult:
+    """1工程分の実行結果"""
+    value: Any = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    cache_hit: bool = False
+    stages: list[StageTiming] = field(default_factory=list)
+    peak_rss: Optional[int] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+def _run_node(
+    func: Callable[..., Any],
+    inputs: list[Any],
+    args: tuple,
+    cache: Optional[ConversionCache],
+    slab: Optional[Slab] = None
+) -> NodeResult:
+    """1工程を実行し、例外は結果のエラーとして返す（ワーカープロセスで実行）
+
+    共有メモリで受け取った入力はコピーせずに参照し、slab指定時は出力をslabに書き込んで記述子のみを返します。
+    """
+    start = time.perf_counter()
+    cache = _get_process_cache(cache)
+    hits_before = cache.hits if cache is not None else 0
+    result = NodeResult()
+    with collect_timings() as stages:
+        try:
+            inputs = [load_shared(value) if isinstance(value, SharedRaster) else value for value in inputs]
+            result.value = func(inputs, cache, *args)
+            if slab is not None:
+                result.value = store_shared(result.value, slab)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+    result.elapsed = time.perf_counter() - start
+    result.cache_hit = cache is not None and cache.hits > hits_before
+    result.stages = stages
+    result.peak_rss = get_peak_rss()
+    return result
+
+
+class JobGraph:
+    """変換処理を工程の依存グラフ（DAG）として実行する
+
+    同じキーの工程は複数の変換から追加されても1回だけ実行し、結果を全ての利用先に渡します。
+    例えば同じSVGを同じサイズでラスタライズする工程は、PNG出力とICOのフレームで共有されます。
+    依存する工程が全て完了した工程から順にプロセスプールへ投入し、利用先が全て完了した
+    中間結果は破棄してメモリを解放します。
+    """
+
+    def __init__(self):
+        self.nodes: dict[NodeKey, Node] = {}
+        self.requested = 0
+        # 共有メモリで出力を受け渡している工程と貸し出し中のスラブ
+        self._leases: dict[NodeKey, Slab] = {}
+        self._allocator: Optional[SlabAllocator] = None
+
+    def add(
+        self,
+        key: NodeKey,
+        func: Callable[..., Any],
+        args: tuple = (),
+        deps: tuple[NodeKey, ...] = (),
+        memory: int = 0,
+        output_bytes: int = 0
+    ) -> NodeKey:
+        """工程を追加（同じキーの工程が追加済みの場合は共有する）"""
+        self.requested += 1
+        if key not in self.nodes:
+            missing = [dep for dep in deps if dep not in self.nodes]
+            if missing:
+                raise ValueError(f"依存する工程が追加されていません: {missing}")
+            self.nodes[key] = Node(key, func, tuple(args), tuple(deps), memory, output_bytes)
+        return key
+
+    @property
+    def shared_count(self) -> int:
+        """重複を除いて共有した工程の数"""
+        return self.requested - len(self.nodes)
+
+    def dependencies(self, key: NodeKey) -> list[NodeKey]:
+        """工程が（間接的に）依存する全ての工程（自身を含む、依存元から順）"""
+        ordered: list[NodeKey] = []
+        seen: set[NodeKey] = set()
+
+        def visit(node_key: NodeKey) -> None:
+            if node_key in seen:
+                return
+            seen.add(node_key)
+            for dep in self.nodes[node_key].deps:
+                visit(dep)
+            ordered.append(node_key)
+
+        visit(key)
+        return ordered
+
+    def run(
+        self,
+        cache: Optional[ConversionCache] = None,
+        max_workers: Optional[int] = None,
+        keep: Optional[set[NodeKey]] = None,
+        memory_budget: Optional[int] = None,
+        shared_memory: bool = True
+    ) -> dict[NodeKey, NodeResult]:
+        """全ての工程を実行
+
+        プロセスプールで実行する場合、output_bytesを指定した工程の出力は共有メモリのスラブに書き込み、
+        ワーカーとの間では記述子のみを受け渡します（利用先の工程は共有メモリをコピーせずに参照）。
+        保持する工程の値も共有メモリを参照するビューのため、release_shared() を呼び出すまで有効です。
+
+        Args:
+            cache: 変換結果キャッシュ（各ワーカープロセスで同じディレクトリを共有）
+            max_workers: ワーカープロセス数（省略時はCPUコア数、1の場合は同一プロセスで逐次実行）
+            keep: 利用先の完了後も値を保持する工程（省略時は利用先のない工程のみ保持）
+            memory_budget: 同時に実行する工程の見積もりメモリ量の上限（バイト、省略時は制限なし）
+            shared_memory: Falseの場合は共有メモリを使用せず、全ての値をpickleで受け渡す
+
+        Returns:
+            工程ごとの実行結果（計測結果は出力先へ送信済み）
+        """
+        self.release_shared()
+        consumers: dict[NodeKey, list[NodeKey]] = {key: [] for key in self.nodes}
+        for node in self.nodes.values():
+            for dep in node.deps:
+                consumers[dep].append(node.key)
+        waiting = {key: len(node.deps) for key, node in self.nodes.items()}
+        unconsumed = {key: len(users) for key, users in consumers.items()}
+        keep = keep or set()
+        ready = deque(key for key, count in waiting.items() if count == 0)
+        results: dict[NodeKey, NodeResult] = {}
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        # 共有のプロセスプールは指定したワーカー数で取得し、同時に実行する数のみ件数に合わせる
+        pool_size = max_workers
+        max_workers = max(1, min(max_workers, len(self.nodes)))
+        logger.info(
+            "変換工程: %d 件（共有 %d 件） / %d プロセス", len(self.nodes), self.shared_count, max_workers
+        )
+
+        def finish(key: NodeKey, result: NodeResult) -> None:
+            results[key] = result
+            for timing in result.stages:
+                emit(timing)
+            for consumer in consumers[key]:
+                waiting[consumer] -= 1
+                if waiting[consumer] == 0:
+                    ready.append(consumer)
+            if key in self._leases and not isinstance(result.value, SharedRaster):
+                # 失敗した場合・スラブに収まらなかった場合はスラブを使用していない
+                self._release(key)
+            for dep in self.nodes[key].deps:
+                unconsumed[dep] -= 1
+                if unconsumed[dep] == 0 and dep not in keep:
+                    results[dep].value = None
+                    self._release(dep)
+
+        def prepare(key: NodeKey) -> Optional[list[Any]]:
+            """依存する工程の結果を集める（失敗した工程がある場合は実行せずに失敗とする）"""
+            node = self.nodes[key]
+            failed = [results[dep] for dep in node.deps if not results[dep].succeeded]
+            if failed:
+                finish(key, NodeResult(error=f"依存する工程が失敗しました: {failed[0].error}"))
+                return None
+            return [results[dep].value for dep in node.deps]
+
+        if max_workers == 1:
+            while ready:
+                key = ready.popleft()
+                inputs = prepare(key)
+                if inputs is not None:
+                    node = self.nodes[key]
+                    finish(key, _run_node(node.func, inputs, node.args, cache))
+            return results
+
+        budget = MemoryBudget(memory_budget) if memory_budget else None
+        # 予算を指定した場合は実行中の工程のみ計上するため、投入数をワーカー数までに抑える
+        in_flight_limit = max_workers if budget is not None else len(self.nodes)
+        pool = get_worker_pool(pool_size)
+        allocator = self._allocator = get_slab_allocator() if shared_memory else None
+        futures: dict[Future, NodeKey] = {}
+        while ready or futures:
+            while ready and len(futures) < in_flight_limit:
+                node = self.nodes[ready[0]]
+                if budget is not None and not budget.can_start(node.memory):
+                    budget.wait()
+                    break
+                ready.popleft()
+                inputs = prepare(node.key)
+                if inputs is not None:
+                    if budget is not None:
+                        budget.acquire(node.memory)
+                    slab = self._lease(node)
+                    futures[pool.submit(_run_node, node.func, inputs, node.args, cache, slab)] = node.key
+            if not futures:
+                continue
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = futures.pop(future)
+                if budget is not None:
+                    budget.release(self.nodes[key].memory)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = NodeResult(error=f"{type(e).__name__}: {e}")
+                finish(key, result)
+        if budget is not None:
+            logger.info(
+                "メモリ予算: 上限 %.0fMB / 見積もりの最大 %.0fMB（予算不足で待機 %d 回）",
+                budget.limit_bytes / 1024 / 1024, budget.peak_in_use / 1024 / 1024, budget.waits
+            )
+        if allocator is not None:
+            for key in self._leases:
+                value = results[key].value
+                if isinstance(value, SharedRaster):
+                    results[key].value = allocator.view(value)
+        return results
+
+    def _lease(self, node: Node) -> Optional[Slab]:
+        """出力を共有メモリで受け渡す工程にスラブを貸し出す（小さい出力・上限を超える場合はNone）"""
+        if self._allocator is None or node.output_bytes < MIN_SHARED_BYTES:
+            return None
+        slab = self._allocator.allocate(node.output_bytes)
+        if slab is not None:
+            self._leases[node.key] = slab
+        return slab
+
+    def _release(self, key: NodeKey) -> None:
+        slab = self._leases.pop(key, None)
+        # スラブはアロケータを取得した場合のみ貸し出す
+        if slab is not None and self._allocator is not None:
+            self._allocator.release(slab.name)
+
+    def release_shared(self) -> None:
+        """保持している工程の値が参照する共有メモリのスラブを返却（以降は値を参照できません）"""
+        for key in list(self._leases):
+            self._release(key)
+
+    def collect(self, key: NodeKey, results: dict[NodeKey, NodeResult], source: str, output: str) -> BatchResult:
+        """出力工程とその依存工程の結果を1ファイル分の変換結果にまとめる"""
+        node_results = [results[node_key] for node_key in self.dependencies(key) if node_key in results]
+        error = results[key].error if key in results else "実行されませんでした"
+        return BatchResult(
+            source, output, error,
+            elapsed=sum(result.elapsed for result in node_results),
+            cache_hit=any(result.cache_hit for result in node_results),
+            stages=[timing for result in node_results for timing in result.stages],
+            peak_rss=max_peak_rss(*(result.peak_rss for result in node_results)),
+        )
+
+
+# --- 変換の工程（ワーカープロセスで実行するためモジュールレベルで定義） ---
+
+def render_node(inputs: list[Any], cache: Optional[ConversionCache], source: str, size: int) -> bytes:
+    """SVGを指定サイズのPNGデータにラスタライズ"""
+    from service.convert_svg_to_png import render_cached
+
+    with open(source, 'rb') as f:
+        svg_data = f.read()
+    return render_cached(svg_data, source, size, cache)
+
+
+def write_png_node(inputs: list[Any], cache: Optional[ConversionCache], source: str, output: str) -> str:
+    """ラスタライズ済みのPNGデータをファイルに書き込み"""
+    from service.instrumentation import STAGE_WRITE, stage
+
+    png_data = inputs[0]
+    with stage(STAGE_WRITE, source, len(png_data)) as timing:
+        with open(output, 'wb') as f:
+            f.write(png_data)
+        timing.bytes_out = len(png_data)
+    return output
+
+
+def write_ico_node(inputs: list[Any], cache: Optional[ConversionCache], source: str, output: str, ico_size: Optional[int]) -> str:
+    """ラスタライズ済みのPNGデータ（各フレーム）からICOファイルを作成"""
+    from service.convert_svg_to_ico import write_ico_file
+
+    write_ico_file(inputs, source, output, ico_size)
+    return output
+
+
+def png_to_ico_node(
+    inputs: list[Any],
+    cache: Optional[ConversionCache],
+    source: str,
+    output: str,
+    ico_size: int,
+    ico_sizes: Optional[list[int]]
+) -> str:
+    """PNGファイルをICOファイルに変換"""
+    from service.convert_png_to_ico import convert_png_to_ico
+
+    convert_png_to_ico(source, output, ico_size, ico_sizes, cache)
+    return output
+
+
+def fail_node(inputs: list[Any], cache: Optional[ConversionCache], message: str) -> None:
+    """グラフの作成時に検出したエラーを実行結果として返す"""
+    raise ValueError(message)
+
+
+def add_render(graph: JobGraph, source: str, size: int) -> NodeKey:
+    """SVGを指定サイズのPNGデータにラスタライズする工程を追加（同じ入力・サイズの工程は共有）"""
+    source = os.path.abspath(source)
+    return graph.add(
+        ('render', source, size), render_node, (source, size),
+        memory=estimate_render_memory(source, size), output_bytes=png_capacity(size)
+    )
+
+
+def add_conversion(
+    graph: JobGraph,
+    mode: str,
+    source: str,
+    output: str,
+    icon_size: int,
+    ico_size: int,
+    ico_sizes: Optional[list[int]] = None
+) -> NodeKey:
+    """1ファイル分の変換を工程に分解してグラフに追加し、出力工程のキーを返す
+
+    SVGのラスタライズは（入力, サイズ）ごとに1つの工程とし、PNG出力・ICOのフレームで共有します。
+    """
+    from service.convert_png_to_ico import normalize_ico_sizes
+
+    source = os.path.abspath(source)
+
+    if mode == 'png_to_ico':
+        memory = estimate_task_memory(mode, source, icon_size, ico_size, ico_sizes)
+        return graph.add(('png_to_ico', output), png_to_ico_node, (source, output, ico_size, ico_sizes), memory=memory)
+    if mode == 'svg_to_png':
+        render = add_render(graph, source, icon_size)
+        return graph.add(('png', output), write_png_node, (source, output), (render,))
+    if mode != 'svg_to_ico':
+        raise ValueError(f"不明な変換モードです: {mode}")
+
+    if not ico_sizes:
+        render = add_render(graph, source, icon_size)
+        memory = estimate_frames_memory([icon_size, ico_size])
+        return graph.add(('ico', output), write_ico_node, (source, output, ico_size), (render,), memory)
+    try:
+        frame_sizes = normalize_ico_sizes(ico_sizes)
+    except ValueError as e:
+        return graph.add(('ico', output), fail_node, (str(e),))
+    frames = tuple(add_render(graph, source, size) for size in frame_sizes)
+    return graph.add(('ico', output), write_ico_node, (source, output, None), frames, estimate_frames_memory(frame_sizes))
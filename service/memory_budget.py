@@ -0,0 +1,194 @@
+import os
+import struct
+import sys
+from typing import Any, Optional
+
+# 画像1ピクセルあたりのバイト数（RGBA / cairoのARGB32）
+BYTES_PER_PIXEL = 4
+# 解析済みSVGツリーのメモリ使用量の見積もり（SVGのバイト数に対する倍率）
+TREE_SIZE_FACTOR = 8
+# PNG→ICO変換で元の解像度のまま同時に保持する画像の数（デコード結果・乗算済みモード・間引き後）
+PNG_WORKING_COPIES = 3
+# SVGのラスタライズ1回で同時に保持する画像の数（cairoのサーフェス・PNGデータ・デコード結果）
+RENDER_WORKING_COPIES = 3
+# 寸法を取得できない入力の見積もり（ファイルサイズに対する倍率、圧縮率の高いPNGを想定）
+UNKNOWN_SIZE_FACTOR = 32
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def read_png_dimensions(path: str) -> Optional[tuple[int, int]]:
+    """PNGのヘッダー（IHDR）から画像の幅・高さを取得（PNGでない場合はNone）
+
+    Pillowを読み込まず、先頭の24バイトのみ読み込みます。
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(24)
+    except OSError:
+        return None
+    if len(header) < 24 or not header.startswith(_PNG_SIGNATURE) or header[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II', header[16:24])
+
+
+def _raster_bytes(size: int, copies: int = 1) -> int:
+    return size * size * BYTES_PER_PIXEL * copies
+
+
+def estimate_frames_memory(sizes: list[int]) -> int:
+    """ICOの各フレームとエンコード結果を保持するメモリ量（バイト）の見積もり"""
+    return sum(_raster_bytes(size, 2) for size in sizes)
+
+
+def _file_bytes(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def estimate_render_memory(source_path: str, size: int) -> int:
+    """SVGを1つのサイズでラスタライズするメモリ量（バイト）の見積もり（解析済みツリーを含む）"""
+    return _file_bytes(source_path) * TREE_SIZE_FACTOR + _raster_bytes(size, RENDER_WORKING_COPIES)
+
+
+def estimate_task_memory(
+    mode: str,
+    source_path: str,
+    icon_size: int,
+    ico_size: int,
+    ico_sizes: Optional[list[int]] = None
+) -> int:
+    """1ファイルの変換で使用するメモリ量（バイト）を入力の寸法から見積もります
+
+    PNGはヘッダーの幅・高さ、SVGはファイルサイズ（解析済みツリー）と出力サイズから計算します。
+    実際の使用量より大きめに見積もり、予算内で同時に実行するタスク数の判断に使用します。
+
+    Args:
+        mode: 変換モード（'svg_to_png' / 'png_to_ico' / 'svg_to_ico'）
+        source_path: 入力ファイルのパス
+        icon_size: SVGラスタライズ時のサイズ（ピクセル）
+        ico_size: ICOのサイズ（ピクセル）
+        ico_sizes: マルチサイズICOに格納するサイズのリスト
+    """
+    frame_sizes = list(ico_sizes) if ico_sizes else [ico_size]
+    if mode == 'png_to_ico':
+        dimensions = read_png_dimensions(source_path)
+        if dimensions is None:
+            return _file_bytes(source_path) * UNKNOWN_SIZE_FACTOR + estimate_frames_memory(frame_sizes)
+        width, height = dimensions
+        return width * height * BYTES_PER_PIXEL * PNG_WORKING_COPIES + estimate_frames_memory(frame_sizes)
+
+    if mode == 'svg_to_png':
+        return estimate_render_memory(source_path, icon_size)
+    if ico_sizes:
+        # 各サイズをネイティブ解像度でラスタライズし、全フレームを保持してから書き込む
+        tree_bytes = _file_bytes(source_path) * TREE_SIZE_FACTOR
+        return tree_bytes + sum(_raster_bytes(size, RENDER_WORKING_COPIES) for size in frame_sizes)
+    return estimate_render_memory(source_path, icon_size) + estimate_frames_memory(frame_sizes)
+
+
+class MemoryBudget:
+    """同時に実行するタスクの見積もりメモリ量の合計を上限以下に保つ
+
+    タスクの投入前に can_start() で確認し、acquire() / release() で使用量を記録します。
+    上限を超えるタスクは、他のタスクが実行中でない場合のみ単独で開始できます（上限として計上）。
+    投入側の1スレッドから使用することを想定しています。
+    """
+
+    def __init__(self, limit_bytes: int):
+        if limit_bytes <= 0:
+            raise ValueError(f"メモリ予算は正の値で指定してください: {limit_bytes}")
+        self.limit_bytes = limit_bytes
+        self.in_use = 0
+        self.running = 0
+        self.peak_in_use = 0
+        self.waits = 0
+
+    def reserve_size(self, estimated_bytes: int) -> int:
+        """タスクの見積もりのうち予算に計上する量（上限を超える場合は上限）"""
+        return min(max(0, estimated_bytes), self.limit_bytes)
+
+    def can_start(self, estimated_bytes: int) -> bool:
+        """予算内でタスクを開始できるか"""
+        return self.running == 0 or self.in_use + self.reserve_size(estimated_bytes) <= self.limit_bytes
+
+    def acquire(self, estimated_bytes: int) -> None:
+        self.in_use += self.reserve_size(estimated_bytes)
+        self.running += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def release(self, estimated_bytes: int) -> None:
+        self.in_use -= self.reserve_size(estimated_bytes)
+        self.running -= 1
+
+    def wait(self) -> None:
+        """予算不足で投入を待機したことを記録"""
+        self.waits += 1
+
+
+def _windows_memory_counters() -> Optional[Any]:
+    """WindowsのGetProcessMemoryInfoの結果（取得できない場合はNone）"""
+    # ctypes.windllはWindowsのみに存在する
+    if sys.platform != 'win32':
+        return None
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+        return counters
+    return None
+
+
+def get_peak_rss() -> Optional[int]:
+    """プロセスのピークメモリ使用量（バイト）。取得できない環境ではNone"""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # LinuxはKB単位、macOSはバイト単位
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+    if sys.platform == 'win32':
+        counters = _windows_memory_counters()
+        if counters is not None:
+            return counters.PeakWorkingSetSize
+    return None
+
+
+def get_current_rss() -> Optional[int]:
+    """プロセスの現在のメモリ使用量（バイト）。取得できない環境ではピーク値、それも取得できなければNone"""
+    if sys.platform == 'win32':
+        counters = _windows_memory_counters()
+        return counters.WorkingSetSize if counters is not None else None
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return get_peak_rss()
+
+
+def max_peak_rss(*values: Optional[int]) -> Optional[int]:
+    """取得できたピークメモリ使用量の最大値（全て取得できない場合はNone）"""
+    known = [value for value in values if value is not None]
+    return max(known) if known else None
@@ -0,0 +1,47 @@
+import sys
+from typing import Any, Union, cast
+
+from PIL import Image
+
+from service.resize_strategy import STRAIGHT_MODES
+
+# cairoのARGB32は32ビット整数（ネイティブのバイト順）で、色は不透明度で乗算済み。
+# リトルエンディアンではメモリ上は B, G, R, A の順のため、Pillowの乗算済みモード 'RGBa' に
+# 'BGRa' として読み込めば、バイト順の並べ替えと同時に1回のコピーで画像を作成できる。
+ARGB32_RAW_MODE = 'BGRa' if sys.byteorder == 'little' else 'ARGB'
+
+
+def argb32_to_image(data: Union[bytes, bytearray, memoryview], width: int, height: int, stride: int) -> Image.Image:
+    """cairoのARGB32形式のピクセルデータをPillowの画像（乗算済みモード 'RGBa'）に変換
+
+    PNGへのエンコード・デコードを行わず、行ごとのパディング（stride）を除いて1回のコピーで変換します。
+    戻り値は元のバッファを参照しないため、変換後にサーフェスを破棄できます。
+    透明度を戻す場合は unpremultiply() を使用します（リサイズは乗算済みのまま行う方が速く正確です）。
+
+    Args:
+        data: ピクセルデータ（cairo.ImageSurface.get_data() の戻り値など）
+        width: 幅（ピクセル）
+        height: 高さ（ピクセル）
+        stride: 1行あたりのバイト数（width×4 以上）
+    """
+    if stride < width * 4:
+        raise ValueError(f"strideが幅に対して小さすぎます: {stride} < {width * 4}")
+    # Pillowはバッファプロトコルに対応したオブジェクトを受け付ける（型定義はbytesのみ）
+    buffer = cast(bytes, data)
+    if ARGB32_RAW_MODE == 'BGRa':
+        return Image.frombuffer('RGBa', (width, height), buffer, 'raw', 'BGRa', stride, 1)
+    # ビッグエンディアン（A, R, G, B の順）は値を並べ替えてから乗算済みとして解釈する
+    image = Image.frombuffer('RGBA', (width, height), buffer, 'raw', 'ARGB', stride, 1)
+    return Image.frombytes('RGBa', (width, height), image.tobytes())
+
+
+def surface_to_image(surface: Any) -> Image.Image:
+    """cairocffiのImageSurface（FORMAT_ARGB32）をPillowの画像（乗算済みモード 'RGBa'）に変換"""
+    surface.flush()
+    return argb32_to_image(surface.get_data(), surface.get_width(), surface.get_height(), surface.get_stride())
+
+
+def unpremultiply(image: Image.Image) -> Image.Image:
+    """乗算済みモード（'RGBa' / 'La'）の画像を透明度付きのモード（'RGBA' / 'LA'）に変換"""
+    straight_mode = STRAIGHT_MODES.get(image.mode)
+    return image.convert(straight_mode) if straight_mode else image
@@ -0,0 +1,185 @@
+import math
+from typing import Optional
+
+from PIL import Image, ImageChops, ImageStat
+
+from service.instrumentation import STAGE_RESIZE, stage
+
+# 縮小時の粗い間引き（Image.reduce）とLanczosによる仕上げの境界（出力サイズに対する倍率）
+# 値を大きくするほど元画像に近い解像度からLanczosをかける（品質が上がり、速度が下がる）。
+# Noneの場合は従来通り元の解像度から直接Lanczosでリサイズする。
+DEFAULT_REDUCING_GAP: Optional[float] = 3.0
+
+# 既定のreducing_gapで、元の解像度から直接リサイズした結果との差の許容値（PSNR、dB）
+DEFAULT_PSNR_THRESHOLD = 35.0
+
+
+def _reduce_factor(source_size: tuple[int, int], target_size: int, reducing_gap: Optional[float]) -> int:
+    """Image.reduceで間引く倍率（間引き後もtarget_size×reducing_gap以上を保つ最大の整数）"""
+    if reducing_gap is None:
+        return 1
+    return max(1, math.floor(min(source_size) / (target_size * reducing_gap)))
+
+
+# 透明度付きの画像をリサイズする際に使用する、色を不透明度で乗算済みのモード
+# Pillowは RGBA の画像をリサイズするたびに元の解像度のまま乗算済みモードへ変換するため、
+# 大きい画像ではこの変換がLanczos自体より時間がかかる。変換を1回にまとめ、間引き後の画像で行う。
+PREMULTIPLIED_MODES = {'RGBA': 'RGBa', 'LA': 'La'}
+# 乗算済みモードの画像（cairoから直接受け取った画像など）をリサイズした後に戻すモード
+STRAIGHT_MODES = {premultiplied: mode for mode, premultiplied in PREMULTIPLIED_MODES.items()}
+
+
+def prepare_draft(image: Image.Image, max_size: int, reducing_gap: Optional[float] = DEFAULT_REDUCING_GAP) -> None:
+    """デコード前に、対応する形式（JPEG）であれば縮小してデコードするよう設定
+
+    Image.open 直後（load() 前）に呼び出します。PNGなど draft に対応しない形式では何もしません。
+    """
+    if reducing_gap is None:
+        return
+    target = math.ceil(max_size * reducing_gap)
+    image.draft(image.mode, (target, target))
+
+
+def _premultiply(image: Image.Image) -> Image.Image:
+    premultiplied_mode = PREMULTIPLIED_MODES.get(image.mode)
+    return image.convert(premultiplied_mode) if premultiplied_mode else image
+
+
+def _to_output_mode(image: Image.Image, mode: str) -> Image.Image:
+    """乗算済みモードでリサイズした画像を、元画像のモード（乗算済みの場合は透明度付きのモード）に戻す"""
+    mode = STRAIGHT_MODES.get(mode, mode)
+    return image.convert(mode) if mode in PREMULTIPLIED_MODES else image
+
+
+def _resize_premultiplied(
+    image: Image.Image,
+    size: int,
+    mode: str,
+    reducing_gap: float,
+    box: Optional[tuple[float, float, float, float]] = None
+) -> Image.Image:
+    if box is None:
+        resized = image.resize((size, size), Image.Resampling.LANCZOS, reducing_gap=reducing_gap)
+    else:
+        resized = image.resize((size, size), Image.Resampling.LANCZOS, box=box, reducing_gap=reducing_gap)
+    return _to_output_mode(resized, mode)
+
+
+def resize_image(image: Image.Image, size: int, reducing_gap: Optional[float] = DEFAULT_REDUCING_GAP) -> Image.Image:
+    """画像を正方形のsizeにリサイズ
+
+    大きく縮小する場合は Image.reduce で出力サイズのreducing_gap倍程度まで間引いてから、
+    最後にLanczosでリサイズします。乗算済みモード（'RGBa'）の画像は透明度付きのモード（'RGBA'）で返します。
+
+    Args:
+        image: リサイズする画像
+        size: 出力サイズ（ピクセル）
+        reducing_gap: 間引きとLanczosの境界（Noneの場合は元の解像度から直接Lanczos）
+    """
+    if reducing_gap is None:
+        return _to_output_mode(image.resize((size, size), Image.Resampling.LANCZOS), image.mode)
+    return _resize_premultiplied(_premultiply(image), size, image.mode, reducing_gap)
+
+
+def resize_sizes(
+    image: Image.Image,
+    sizes: list[int],
+    reducing_gap: Optional[float] = DEFAULT_REDUCING_GAP,
+    source: Optional[str] = None
+) -> list[Image.Image]:
+    """1つの画像から複数サイズの画像を作成（サイズごとにresize段階として計測）
+
+    乗算済みモードへの変換と、最大サイズに合わせた間引き（Image.reduce）は1回のみ行い、
+    その結果から各サイズをリサイズします。小さいサイズではさらに間引いてからLanczosをかけます。
+    共有する変換・間引きの所要時間は最初のサイズの段階に含めます。
+
+    Returns:
+        sizesと同じ順のリサイズ済み画像のリスト
+    """
+    if reducing_gap is None:
+        frames = []
+        for size in sizes:
+            with stage(STAGE_RESIZE, source, size=size):
+                frames.append(resize_image(image, size, None))
+        return frames
+
+    frames: list[Image.Image] = []
+    base = image
+    box = None
+    for size in sizes:
+        with stage(STAGE_RESIZE, source, size=size):
+            if not frames:
+                factor = _reduce_factor(image.size, max(sizes), reducing_gap)
+                base = _premultiply(image)
+                if factor > 1:
+                    # 元のサイズがfactorで割り切れない場合、間引いた画像の右端・下端の画素は端数の行・列のみの平均になる。
+                    # 元画像の範囲（端数を含む小数の座標）をboxで指定し、位置・倍率がずれないようにする
+                    box = (0, 0, image.size[0] / factor, image.size[1] / factor)
+                    base = base.reduce(factor)
+            frames.append(_resize_premultiplied(base, size, image.mode, reducing_gap, box))
+    return frames
+
+
+def build_mipmap_chain(
+    image: Image.Image,
+    max_size: int,
+    min_size: int,
+    reducing_gap: Optional[float] = DEFAULT_REDUCING_GAP
+) -> list[Image.Image]:
+    """最大サイズから半分ずつ縮小した画像のピラミッド（ミップマップ）を作成
+
+    先頭は元画像をmax_sizeにリサイズしたもので、以降は直前の段をLanczosで半分にします
+    （Image.reduce(2) による平均より輪郭がぼけにくく、小さい画像のため処理時間の差はわずか）。
+    min_size以下の段まで作成します。透明度付きの画像は乗算済みモードのまま返します。
+    """
+    levels = [_premultiply(image).resize((max_size, max_size), Image.Resampling.LANCZOS, reducing_gap=reducing_gap)]
+    while levels[-1].size[0] > min_size and levels[-1].size[0] > 1:
+        half = max(1, levels[-1].size[0] // 2)
+        levels.append(levels[-1].resize((half, half), Image.Resampling.LANCZOS))
+    return levels
+
+
+def resize_mipmap(
+    image: Image.Image,
+    sizes: list[int],
+    reducing_gap: Optional[float] = DEFAULT_REDUCING_GAP,
+    source: Optional[str] = None
+) -> list[Image.Image]:
+    """ミップマップから複数サイズの画像を作成（サイズごとにresize段階として計測）
+
+    元画像からのリサイズは最大サイズへの1回のみで、各サイズはそれ以上で最も近い段から
+    Lanczosでリサイズします（段と同じサイズはそのまま使用）。ピラミッドの作成時間は最初のサイズの段階に含めます。
+
+    Returns:
+        sizesと同じ順のリサイズ済み画像のリスト
+    """
+    frames: list[Image.Image] = []
+    levels: list[Image.Image] = []
+    for size in sizes:
+        with stage(STAGE_RESIZE, source, size=size):
+            if not levels:
+                levels = build_mipmap_chain(image, max(sizes), min(sizes), reducing_gap)
+            level = min((level for level in levels if level.size[0] >= size), key=lambda level: level.size[0])
+            if level.size[0] != size:
+                level = level.resize((size, size), Image.Resampling.LANCZOS)
+            frames.append(_to_output_mode(level, image.mode))
+    return frames
+
+
+def resample_name(reducing_gap: Optional[float] = DEFAULT_REDUCING_GAP, mipmap: bool = False) -> str:
+    """変換結果キャッシュのキーに含めるリサイズ方法の名前"""
+    name = 'LANCZOS' if reducing_gap is None else f"LANCZOS+reduce{reducing_gap:g}"
+    return f"{name}+mipmap" if mipmap else name
+
+
+def psnr(image_a: Image.Image, image_b: Image.Image) -> float:
+    """同じサイズの2つの画像のPSNR（dB、値が大きいほど近い。完全に一致する場合はinf）"""
+    if image_a.size != image_b.size:
+        raise ValueError(f"画像のサイズが異なります: {image_a.size} != {image_b.size}")
+    mode = 'RGBA' if 'A' in image_a.getbands() or 'A' in image_b.getbands() else 'RGB'
+    difference = ImageChops.difference(image_a.convert(mode), image_b.convert(mode))
+    squared = ImageStat.Stat(difference).sum2
+    mse = sum(squared) / (len(squared) * image_a.size[0] * image_a.size[1])
+    if mse == 0:
+        return math.inf
+    return 10 * math.log10(255 ** 2 / mse)
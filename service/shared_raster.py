@@ -0,0 +1,209 @@
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Optional, cast
+
+logger = logging.getLogger(__name__)
+
+# 共有メモリのブロック（スラブ）の最小サイズ。これ以上は2のべき乗に切り上げ、同じ大きさのスラブを再利用する
+DEFAULT_MIN_SLAB_BYTES = 256 * 1024
+# 確保するスラブの合計の上限（超える場合は共有メモリを使用せずにpickleで受け渡す）
+DEFAULT_MAX_POOL_BYTES = 256 * 1024 * 1024
+# これより小さい出力は共有メモリを使用しない（パイプでの受け渡しの方が速い）
+MIN_SHARED_BYTES = 64 * 1024
+# ワーカープロセスで開いたままにする共有メモリの数
+MAX_ATTACHED = 64
+
+
+@dataclass(frozen=True)
+class Slab:
+    """ワーカーに渡す書き込み先（共有メモリの名前と容量）"""
+    name: str
+    capacity: int
+
+
+@dataclass(frozen=True)
+class SharedRaster:
+    """共有メモリに書き込んだ工程の出力の記述子（プロセス間ではこの情報のみを受け渡す）
+
+    kindは 'bytes'（PNG/ICOデータ等）または 'image'（Pillowの画像のピクセル、mode・sizeで復元）です。
+    """
+    name: str
+    nbytes: int
+    kind: str = 'bytes'
+    mode: str = ''
+    size: tuple[int, int] = (0, 0)
+
+
+class SlabAllocator:
+    """共有メモリのブロック（スラブ）を大きさごとに再利用するアロケータ（コーディネータ側で使用）
+
+    共有メモリの作成・破棄は比較的遅いため、解放されたスラブは破棄せずに保持し、同じ大きさの
+    要求に再利用します。合計がmax_bytesを超える場合は未使用のスラブから破棄し、それでも足りない場合は
+    確保せずにNoneを返します（呼び出し元は通常のpickleでの受け渡しにフォールバックします）。
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_POOL_BYTES, min_slab_bytes: int = DEFAULT_MIN_SLAB_BYTES):
+        self.max_bytes = max_bytes
+        self.min_slab_bytes = min_slab_bytes
+        self.created = 0
+        self.reused = 0
+        self._blocks: dict[str, shared_memory.SharedMemory] = {}
+        self._free: dict[int, list[str]] = {}
+        self._leased: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _slab_size(self, nbytes: int) -> int:
+        size = self.min_slab_bytes
+        while size < nbytes:
+            size *= 2
+        return size
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(block.size for block in self._blocks.values())
+
+    @property
+    def leased_count(self) -> int:
+        return len(self._leased)
+
+    def allocate(self, nbytes: int) -> Optional[Slab]:
+        """nbytes以上の容量のスラブを貸し出す（上限を超える場合はNone）"""
+        capacity = self._slab_size(nbytes)
+        with self._lock:
+            free = self._free.get(capacity)
+            if free:
+                name = free.pop()
+                self.reused += 1
+            else:
+                if not self._make_room(capacity):
+                    return None
+                block = shared_memory.SharedMemory(create=True, size=capacity)
+                name = block.name
+                self._blocks[name] = block
+                self.created += 1
+            self._leased.add(name)
+            return Slab(name, capacity)
+
+    def _make_room(self, capacity: int) -> bool:
+        """未使用のスラブを破棄して新しいスラブの容量を空ける"""
+        total = self.total_bytes
+        for free in self._free.values():
+            while free and total + capacity > self.max_bytes:
+                name = free.pop()
+                total -= self._blocks[name].size
+                self._destroy(name)
+        return total + capacity <= self.max_bytes
+
+    def _destroy(self, name: str) -> None:
+        block = self._blocks.pop(name)
+        block.close()
+        block.unlink()
+
+    def release(self, name: str) -> None:
+        """貸し出したスラブを返却（以降は別の工程の出力に再利用される）"""
+        with self._lock:
+            if name not in self._leased:
+                return
+            self._leased.discard(name)
+            self._free.setdefault(self._blocks[name].size, []).append(name)
+
+    def view(self, ref: SharedRaster) -> Any:
+        """コーディネータ側で出力をコピーせずに参照（スラブを返却するまで有効）"""
+        return _to_value(_buffer(self._blocks[ref.name]), ref)
+
+    def close(self) -> None:
+        """全てのスラブを破棄"""
+        with self._lock:
+            for name in list(self._blocks):
+                try:
+                    self._destroy(name)
+                except BufferError:
+                    # 参照中のビューが残っている場合は破棄のみ行い、プロセスの終了時に解放する
+                    self._blocks.pop(name, None)
+            self._free.clear()
+            self._leased.clear()
+
+
+# ワーカープロセスで開いた共有メモリ（名前 -> SharedMemory、最近使用した順）
+_attached: OrderedDict[str, shared_memory.SharedMemory] = OrderedDict()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """共有メモリを開く（同じスラブは再利用されるため、開いたものを保持して再度開かない）"""
+    block = _attached.get(name)
+    if block is not None:
+        _attached.move_to_end(name)
+        return block
+    block = _attached[name] = shared_memory.SharedMemory(name=name)
+    while len(_attached) > MAX_ATTACHED:
+        _, evicted = _attached.popitem(last=False)
+        try:
+            evicted.close()
+        except BufferError:
+            pass
+    return block
+
+
+def _buffer(block: shared_memory.SharedMemory) -> memoryview:
+    """共有メモリのバッファ（close()の後はNoneになるため、閉じている場合はエラー）"""
+    buffer = block.buf
+    if buffer is None:
+        raise ValueError(f"共有メモリは閉じられています: {block.name}")
+    return buffer
+
+
+def _to_value(buffer: memoryview, ref: SharedRaster) -> Any:
+    if ref.kind == 'image':
+        from PIL import Image
+
+        # Pillowはバッファプロトコルに対応したオブジェクトを受け付ける（型定義はbytesのみ）
+        return Image.frombuffer(ref.mode, ref.size, cast(bytes, buffer[:ref.nbytes]), 'raw', ref.mode, 0, 1)
+    return buffer[:ref.nbytes]
+
+
+def store_shared(value: Any, slab: Slab) -> Any:
+    """工程の出力（bytes・Pillowの画像）をスラブに書き込んで記述子を返す（ワーカープロセスで実行）
+
+    容量に収まらない値や対応していない型の値は、そのまま返します（pickleで受け渡し）。
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        data, kind, mode, size = value, 'bytes', '', (0, 0)
+    elif hasattr(value, 'tobytes') and hasattr(value, 'mode'):
+        data, kind, mode, size = value.tobytes(), 'image', value.mode, value.size
+    else:
+        return value
+    nbytes = len(data)
+    if nbytes > slab.capacity:
+        logger.debug("出力が共有メモリの容量を超えるため通常の方法で受け渡します: %d > %d", nbytes, slab.capacity)
+        return value
+    _buffer(_attach(slab.name))[:nbytes] = data
+    return SharedRaster(slab.name, nbytes, kind, mode, size)
+
+
+def load_shared(ref: SharedRaster) -> Any:
+    """記述子から出力をコピーせずに参照（ワーカープロセスで実行、bytesはmemoryview・画像はPillowの画像）"""
+    return _to_value(_buffer(_attach(ref.name)), ref)
+
+
+def png_capacity(size: int) -> int:
+    """size×sizeのPNGデータの最大サイズの見積もり（圧縮できない場合のRGBA＋フィルタ・チャンクのオーバーヘッド）"""
+    raw = size * (size * 4 + 1)
+    return raw + raw // 1000 + 4096
+
+
+_allocator: Optional[SlabAllocator] = None
+_allocator_lock = threading.Lock()
+
+
+def get_slab_allocator() -> SlabAllocator:
+    """プロセス内で共有するスラブアロケータを取得（初回のみ作成、終了時に全てのスラブを破棄）"""
+    global _allocator
+    with _allocator_lock:
+        if _allocator is None:
+            _allocator = SlabAllocator()
+            atexit.register(_allocator.close)
+        return _allocator
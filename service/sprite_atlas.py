@@ -0,0 +1,369 @@
+import io
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
+
+from service.batch_convert import BatchResult, collect_source_files
+from service.conversion_cache import ConversionCache
+from service.instrumentation import STAGE_WRITE, stage
+from service.job_scheduler import JobGraph, NodeKey, add_render
+from service.memory_budget import get_peak_rss, max_peak_rss
+
+logger = logging.getLogger(__name__)
+
+ATLAS_INDEX_VERSION = 1
+DEFAULT_MAX_SHEET_SIZE = 2048
+DEFAULT_PADDING = 1
+DEFAULT_ATLAS_NAME = 'atlas'
+DEFAULT_CSS_PREFIX = 'icon'
+
+
+class SkylinePacker:
+    """スカイライン法（Bottom-Left）で矩形を1枚のシートに配置する
+
+    配置済みの矩形の上端を左から順に (x, y, 幅) の区間として保持し、新しい矩形は
+    上端（y＋高さ）が最も低くなる位置（同じ場合は左）に置きます。
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self._skyline: list[tuple[int, int, int]] = [(0, 0, width)]
+
+    def _fit(self, index: int, width: int, height: int) -> Optional[int]:
+        """index番目の区間の左端に置いた場合のy座標（収まらない場合はNone）"""
+        x = self._skyline[index][0]
+        if x + width > self.width:
+            return None
+        y = 0
+        remaining = width
+        while remaining > 0:
+            _, segment_y, segment_width = self._skyline[index]
+            y = max(y, segment_y)
+            if y + height > self.height:
+                return None
+            remaining -= segment_width
+            index += 1
+        return y
+
+    def insert(self, width: int, height: int) -> Optional[tuple[int, int]]:
+        """矩形を配置して左上の座標を返す（シートに収まらない場合はNone）"""
+        best: Optional[tuple[int, int, int, int]] = None
+        for index, (x, _, _) in enumerate(self._skyline):
+            y = self._fit(index, width, height)
+            if y is not None and (best is None or (y + height, x) < best[:2]):
+                best = (y + height, x, y, index)
+        if best is None:
+            return None
+        _, x, y, index = best
+        self._place(index, x, y + height, width)
+        return x, y
+
+    def _place(self, index: int, x: int, top: int, width: int) -> None:
+        self._skyline.insert(index, (x, top, width))
+        right = x + width
+        # 新しい区間に隠れた区間を削除・短縮
+        index += 1
+        while index < len(self._skyline):
+            segment_x, segment_y, segment_width = self._skyline[index]
+            if segment_x >= right:
+                break
+            if segment_x + segment_width <= right:
+                del self._skyline[index]
+                continue
+            self._skyline[index] = (right, segment_y, segment_x + segment_width - right)
+            break
+        # 同じ高さで隣り合う区間を結合
+        merged = [self._skyline[0]]
+        for segment in self._skyline[1:]:
+            last_x, last_y, last_width = merged[-1]
+            if segment[1] == last_y:
+                merged[-1] = (last_x, last_y, last_width + segment[2])
+            else:
+                merged.append(segment)
+        self._skyline = merged
+
+
+def _round_up_power_of_two(value: int) -> int:
+    size = 1
+    while size < value:
+        size *= 2
+    return size
+
+
+def _insert(packers: list[SkylinePacker], width: int, height: int, sheet_size: int) -> tuple[int, int, int]:
+    """既存のシートのうち最初に収まるシートへ配置し、（シート番号, x, y）を返す（収まらない場合はシートを追加）"""
+    for sheet, packer in enumerate(packers):
+        position = packer.insert(width, height)
+        if position is not None:
+            return (sheet, *position)
+    packer = SkylinePacker(sheet_size, sheet_size)
+    position = packer.insert(width, height)
+    if position is None:
+        raise ValueError(f"シート（{sheet_size}px）に収まらない矩形があります: {width}x{height}")
+    packers.append(packer)
+    return (len(packers) - 1, *position)
+
+
+def pack_rectangles(
+    dimensions: list[tuple[int, int]],
+    max_size: int = DEFAULT_MAX_SHEET_SIZE,
+    padding: int = DEFAULT_PADDING,
+    power_of_two: bool = False
+) -> tuple[list[tuple[int, int, int]], list[tuple[int, int]]]:
+    """矩形（幅, 高さ）を一辺max_size以下のシートに配置する（入りきらない場合はシートを追加）
+
+    高さ・幅の大きい順に、既存のシートのうち最初に収まるシートへ配置します。
+    矩形の間にはpadding分の間隔を空け、シートの大きさは配置した範囲に合わせて縮めます。
+    power_of_twoを指定した場合、2のべき乗に切り上げたシートがmax_sizeを超えるとValueErrorを送出します。
+
+    Returns:
+        入力順の配置（シート番号, x, y）と、シートごとの（幅, 高さ）
+    """
+    oversized = [dimension for dimension in dimensions if max(dimension) > max_size]
+    if oversized:
+        raise ValueError(f"シートの最大サイズ（{max_size}px）を超える画像があります: {oversized[0][0]}x{oversized[0][1]}")
+    packers: list[SkylinePacker] = []
+    placed: dict[int, tuple[int, int, int]] = {}
+    order = sorted(range(len(dimensions)), key=lambda i: (-dimensions[i][1], -dimensions[i][0], i))
+    for i in order:
+        # 右端・下端の矩形の後ろには間隔が不要なため、シートの大きさにもpadding分を加えて配置する
+        width, height = dimensions[i][0] + padding, dimensions[i][1] + padding
+        placed[i] = _insert(packers, width, height, max_size + padding)
+    placements = [placed[i] for i in range(len(dimensions))]
+
+    sheet_sizes = [[0, 0] for _ in packers]
+    for (sheet, x, y), (width, height) in zip(placements, dimensions):
+        sheet_sizes[sheet][0] = max(sheet_sizes[sheet][0], x + width)
+        sheet_sizes[sheet][1] = max(sheet_sizes[sheet][1], y + height)
+    if power_of_two:
+        sheet_sizes = [[_round_up_power_of_two(width), _round_up_power_of_two(height)] for width, height in sheet_sizes]
+        for width, height in sheet_sizes:
+            if max(width, height) > max_size:
+                raise ValueError(
+                    f"2のべき乗に切り上げたシートの大きさ（{width}x{height}）がシートの最大サイズ（{max_size}px）を超えています"
+                )
+    return placements, [(width, height) for width, height in sheet_sizes]
+
+
+@dataclass(frozen=True)
+class AtlasSprite:
+    """シート上の1画像の位置"""
+    name: str
+    source_path: str
+    size: int
+    sheet: int
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+@dataclass
+class AtlasSheet:
+    """出力したシート画像"""
+    path: str
+    width: int
+    height: int
+
+
+@dataclass
+class AtlasReport:
+    """アトラスの作成結果"""
+    sheets: list[AtlasSheet] = field(default_factory=list)
+    sprites: list[AtlasSprite] = field(default_factory=list)
+    failed: list[BatchResult] = field(default_factory=list)
+    index_path: Optional[str] = None
+    css_path: Optional[str] = None
+    elapsed: float = 0.0
+    peak_rss: Optional[int] = None
+
+
+def get_sprite_names(source_paths: list[str], sizes: list[int]) -> list[tuple[str, str, int]]:
+    """入力ファイルとサイズの組ごとの画像名（入力の共通フォルダからの相対パス、拡張子なし）
+
+    複数サイズを指定した場合は名前の末尾に @サイズ を付けます。
+
+    Returns:
+        （画像名, 入力ファイル, サイズ）のリスト
+    """
+    if not source_paths:
+        return []
+    base_dir = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in source_paths])
+    entries = []
+    for path in source_paths:
+        name = os.path.splitext(os.path.relpath(os.path.abspath(path), base_dir))[0].replace(os.sep, '/')
+        for size in sizes:
+            entries.append((f"{name}@{size}" if len(sizes) > 1 else name, path, size))
+    return entries
+
+
+def _css_class(prefix: str, name: str) -> str:
+    return f"{prefix}-{re.sub(r'[^A-Za-z0-9_-]', '-', name)}"
+
+
+def get_css_classes(names: list[str], prefix: str = DEFAULT_CSS_PREFIX) -> dict[str, str]:
+    """画像名ごとのCSSのクラス名（使用できない文字は - に置き換え）
+
+    置き換えにより別の画像と同じクラス名になる場合（例: "a b" と "a-b"）はValueErrorを送出します。
+    """
+    classes: dict[str, str] = {}
+    names_by_class: dict[str, str] = {}
+    for name in names:
+        css_class = _css_class(prefix, name)
+        other = names_by_class.setdefault(css_class, name)
+        if other != name:
+            raise ValueError(f"CSSのクラス名が重複します: .{css_class}（{other} / {name}）")
+        classes[name] = css_class
+    return classes
+
+
+def _css_offset(value: int) -> str:
+    return f"-{value}px" if value else "0"
+
+
+def build_atlas_css(report: AtlasReport, prefix: str = DEFAULT_CSS_PREFIX) -> str:
+    """画像ごとのクラス（例: .icon-home）でシートの位置を指定するCSSを作成"""
+    classes = get_css_classes([sprite.name for sprite in report.sprites], prefix)
+    lines = [f".{prefix} {{ display: inline-block; background-repeat: no-repeat; }}"]
+    for sprite in report.sprites:
+        sheet_file = os.path.basename(report.sheets[sprite.sheet].path)
+        lines.append(
+            f".{classes[sprite.name]} {{ width: {sprite.width}px; height: {sprite.height}px; "
+            f"background-image: url(\"{sheet_file}\"); "
+            f"background-position: {_css_offset(sprite.x)} {_css_offset(sprite.y)}; }}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def build_atlas_index(report: AtlasReport, sizes: list[int], padding: int) -> dict[str, Any]:
+    """シートのファイル名・大きさと画像ごとの座標をまとめたインデックスを作成"""
+    return {
+        'version': ATLAS_INDEX_VERSION,
+        'sizes': sizes,
+        'padding': padding,
+        'sheets': [
+            {'file': os.path.basename(sheet.path), 'width': sheet.width, 'height': sheet.height}
+            for sheet in report.sheets
+        ],
+        'sprites': {
+            sprite.name: {
+                'sheet': sprite.sheet, 'x': sprite.x, 'y': sprite.y,
+                'width': sprite.width, 'height': sprite.height, 'size': sprite.size,
+            }
+            for sprite in report.sprites
+        },
+    }
+
+
+def _compose_sheet(path: str, width: int, height: int, sprites: list[tuple[AtlasSprite, Any]]) -> None:
+    """ラスタライズ済みのPNGデータをシートに貼り付けて保存"""
+    from PIL import Image
+
+    sheet = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    for sprite, png_data in sprites:
+        with Image.open(io.BytesIO(png_data)) as image:
+            sheet.paste(image.convert('RGBA'), (sprite.x, sprite.y))
+    with stage(STAGE_WRITE, path) as timing:
+        sheet.save(path, format='PNG', optimize=True)
+        timing.bytes_out = os.path.getsize(path)
+
+
+def build_atlas(
+    source: Union[str, list[str]],
+    output_dir: str,
+    size: int = 64,
+    sizes: Optional[list[int]] = None,
+    max_size: int = DEFAULT_MAX_SHEET_SIZE,
+    padding: int = DEFAULT_PADDING,
+    name: str = DEFAULT_ATLAS_NAME,
+    css_prefix: str = DEFAULT_CSS_PREFIX,
+    power_of_two: bool = False,
+    cache: Optional[ConversionCache] = None,
+    max_workers: Optional[int] = None
+) -> AtlasReport:
+    """SVGをラスタライズして1枚以上のシート（スプライトシート）にまとめ、座標のインデックスを出力する
+
+    ラスタライズは依存グラフ（service.job_scheduler）でプロセスプールに並列投入し、PNGデータは
+    共有メモリのまま受け取ります。全ての画像の大きさが揃ってから配置を1回だけ計算し、シートを作成します。
+    ラスタライズに失敗した画像は配置せずにレポートのfailedに記録します。CSSのクラス名が重複する画像がある場合は
+    ラスタライズの前にValueErrorを送出します。
+
+    出力ファイル（name='atlas' の場合）:
+        atlas.png（シートが複数の場合は atlas-0.png, atlas-1.png, ...）、atlas.json、atlas.css
+
+    Args:
+        source: 入力ディレクトリ、globパターン、またはそれらのリスト
+        output_dir: 出力ディレクトリ
+        size: ラスタライズするサイズ（ピクセル）
+        sizes: 複数サイズを出力する場合のサイズ（指定時はsizeより優先し、画像名に @サイズ を付ける）
+        max_size: シートの一辺の最大サイズ（ピクセル）
+        padding: 画像の間隔（ピクセル）
+        name: 出力ファイル名（拡張子なし）
+        css_prefix: CSSのクラス名の接頭辞
+        power_of_two: シートの幅・高さを2のべき乗に切り上げる（切り上げた大きさがmax_sizeを超える場合はValueError）
+        cache: 変換結果キャッシュ（SVG→PNG変換と結果を共有）
+        max_workers: ワーカープロセス数（省略時はCPUコア数）
+    """
+    from PIL import Image
+
+    start = time.perf_counter()
+    sizes = list(dict.fromkeys(sizes)) if sizes else [size]
+    if max(sizes) > max_size:
+        raise ValueError(f"サイズ（{max(sizes)}px）がシートの最大サイズ（{max_size}px）を超えています")
+    entries = get_sprite_names(collect_source_files(source, '.svg'), sizes)
+    # ラスタライズの前にクラス名の重複を確認し、出力を書き込まずにエラーとする
+    get_css_classes([sprite_name for sprite_name, _, _ in entries], css_prefix)
+    report = AtlasReport()
+    if not entries:
+        logger.warning("入力に一致するSVGファイルがありません: %s", source)
+        return report
+
+    graph = JobGraph()
+    renders: list[NodeKey] = [add_render(graph, path, sprite_size) for _, path, sprite_size in entries]
+    results = graph.run(cache, max_workers, keep=set(renders))
+    try:
+        rendered: list[tuple[str, str, int, Any]] = []
+        dimensions: list[tuple[int, int]] = []
+        for (sprite_name, path, sprite_size), key in zip(entries, renders):
+            result = results[key]
+            if not result.succeeded:
+                report.failed.append(BatchResult(path, '', result.error, result.elapsed))
+                continue
+            with Image.open(io.BytesIO(result.value)) as image:
+                dimensions.append(image.size)
+            rendered.append((sprite_name, path, sprite_size, result.value))
+
+        placements, sheet_sizes = pack_rectangles(dimensions, max_size, padding, power_of_two)
+        os.makedirs(output_dir, exist_ok=True)
+        for sheet, (width, height) in enumerate(sheet_sizes):
+            file_name = f"{name}.png" if len(sheet_sizes) == 1 else f"{name}-{sheet}.png"
+            report.sheets.append(AtlasSheet(os.path.join(output_dir, file_name), width, height))
+        sheet_sprites: list[list[tuple[AtlasSprite, Any]]] = [[] for _ in sheet_sizes]
+        for (sprite_name, path, sprite_size, png_data), (sheet, x, y), (width, height) in zip(rendered, placements, dimensions):
+            sprite = AtlasSprite(sprite_name, path, sprite_size, sheet, x, y, width, height)
+            report.sprites.append(sprite)
+            sheet_sprites[sheet].append((sprite, png_data))
+        for atlas_sheet, sprites in zip(report.sheets, sheet_sprites):
+            _compose_sheet(atlas_sheet.path, atlas_sheet.width, atlas_sheet.height, sprites)
+    finally:
+        graph.release_shared()
+
+    report.index_path = os.path.join(output_dir, f"{name}.json")
+    with open(report.index_path, 'w', encoding='utf-8') as f:
+        json.dump(build_atlas_index(report, sizes, padding), f, ensure_ascii=False, indent=2)
+    report.css_path = os.path.join(output_dir, f"{name}.css")
+    with open(report.css_path, 'w', encoding='utf-8') as f:
+        f.write(build_atlas_css(report, css_prefix))
+
+    report.elapsed = time.perf_counter() - start
+    report.peak_rss = max_peak_rss(get_peak_rss(), *(result.peak_rss for result in results.values()))
+    logger.info(
+        "アトラスを作成しました: %d 件 / %d 枚（失敗 %d 件） (%.2f秒)",
+        len(report.sprites), len(report.sheets), len(report.failed), report.elapsed
+    )
+    return report
@@ -0,0 +1,149 @@
+import copy
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, cast
+
+from cairosvg.parser import Node, Tree
+from cairosvg.surface import PNGSurface
+from PIL import Image
+
+from service.instrumentation import STAGE_SVG_PARSE, STAGE_SVG_RENDER, stage
+from service.memory_budget import TREE_SIZE_FACTOR
+from service.raster_bridge import surface_to_image
+
+DEFAULT_MAX_TREE_BYTES = 64 * 1024 * 1024
+# CairoSVGの既定の解像度
+DEFAULT_DPI = 96
+
+
+def copy_tree(node: Node, parent: Optional[Node] = None) -> Node:
+    """解析済みツリーを描画用に複製する
+
+    CairoSVGは描画中にノードを書き換える（mask・patternのタグを 'g' に変更し、opacityを上書き・乗算する等）ため、
+    同じツリーを2回以上描画すると結果が変わります。描画ごとにノード（属性の辞書・子ノードのリスト）のみを複製し、
+    XML・CSSの解析結果（element・style）は共有します。
+    """
+    copied = copy.copy(node)
+    if parent is not None:
+        copied.parent = parent
+    # Nodeのchildrenは初期値が空のタプルのため、型定義上はリストを代入できない
+    copied.children = cast(Any, [copy_tree(child, copied) for child in node.children])
+    return copied
+
+
+def _image_surface(surface: PNGSurface) -> Any:
+    """描画済みのPNGSurfaceからcairoのImageSurfaceを取得（描画前はNoneのため確認する）"""
+    if surface.cairo is None:
+        raise ValueError("SVGを描画できませんでした（cairoのサーフェスがありません）")
+    return surface.cairo
+
+
+class SvgRenderer:
+    """解析済みのSVGツリーを再利用して複数サイズをラスタライズする
+
+    cairosvg.svg2png は呼び出しごとにXML/CSSを解析し直すため、同じSVGから複数サイズを出力すると
+    解析が繰り返されます。このクラスは解析結果（cairosvg の Tree）を保持し、最近使用したものから
+    見積もりメモリ使用量の合計が max_bytes 以下になるよう古いものを破棄します（LRU）。
+    保持したツリーは描画しません（描画ごとに copy_tree() で複製したツリーを使用します）。
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_TREE_BYTES):
+        self.max_bytes = max_bytes
+        self.parses = 0
+        self.hits = 0
+        self._trees: OrderedDict[tuple[str, Optional[str]], tuple[Node, int]] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get_tree(self, svg_data: bytes, url: Optional[str] = None) -> Node:
+        """解析済みツリーを取得（未解析の場合は解析して保持、描画する場合は copy_tree() で複製すること）
+
+        Args:
+            svg_data: SVGのバイト列
+            url: SVGファイルのパス（相対参照の解決とキーに使用）
+        """
+        key = (hashlib.sha256(svg_data).hexdigest(), url)
+        with self._lock:
+            entry = self._trees.get(key)
+            if entry is not None:
+                self._trees.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        with stage(STAGE_SVG_PARSE, url, len(svg_data)):
+            tree = Tree(bytestring=svg_data, url=url)
+        estimated_bytes = len(svg_data) * TREE_SIZE_FACTOR
+        with self._lock:
+            self.parses += 1
+            if estimated_bytes <= self.max_bytes and key not in self._trees:
+                self._trees[key] = (tree, estimated_bytes)
+                self._total_bytes += estimated_bytes
+                while self._total_bytes > self.max_bytes:
+                    _, (_, evicted_bytes) = self._trees.popitem(last=False)
+                    self._total_bytes -= evicted_bytes
+        return tree
+
+    def render_png(self, svg_data: bytes, url: Optional[str] = None, size: Optional[int] = None) -> bytes:
+        """SVGを指定サイズ（省略時は元のサイズ）のPNGデータにラスタライズ"""
+        tree = copy_tree(self.get_tree(svg_data, url))
+        output = io.BytesIO()
+        with stage(STAGE_SVG_RENDER, url, len(svg_data), size) as timing:
+            surface = PNGSurface(tree, output, DEFAULT_DPI, output_width=size, output_height=size)
+            surface.finish()
+            timing.bytes_out = output.tell()
+        return output.getvalue()
+
+    def render_image(self, svg_data: bytes, url: Optional[str] = None, size: Optional[int] = None) -> Image.Image:
+        """SVGを指定サイズのPillowの画像（乗算済みモード 'RGBa'）にラスタライズ
+
+        cairoのサーフェス（ARGB32）のピクセルをそのままPillowへ渡し、PNGのエンコード・デコードを省略します。
+        """
+        tree = copy_tree(self.get_tree(svg_data, url))
+        with stage(STAGE_SVG_RENDER, url, len(svg_data), size) as timing:
+            # PNGSurfaceは描画までを初期化時に行い、finish()でPNGを書き出すため、finish()は呼び出さない
+            cairo_surface = _image_surface(PNGSurface(tree, None, DEFAULT_DPI, output_width=size, output_height=size))
+            image = surface_to_image(cairo_surface)
+            cairo_surface.finish()
+            timing.bytes_out = image.size[0] * image.size[1] * 4
+        return image
+
+    def render_sizes(self, svg_data: bytes, url: Optional[str], sizes: list[int]) -> dict[int, bytes]:
+        """1回の解析で複数サイズのPNGデータを作成"""
+        return {size: self.render_png(svg_data, url, size) for size in dict.fromkeys(sizes)}
+
+    @property
+    def total_bytes(self) -> int:
+        """保持している解析済みツリーの見積もりメモリ使用量"""
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._trees)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._trees.clear()
+            self._total_bytes = 0
+
+
+# プロセスごとに共有するレンダラー（ワーカープロセスではタスク間で解析結果を再利用）
+_default_renderer: Optional[SvgRenderer] = None
+
+
+def get_renderer() -> SvgRenderer:
+    """プロセス共通のSvgRendererを取得"""
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = SvgRenderer()
+    return _default_renderer
+
+
+def render_png(svg_data: bytes, url: Optional[str] = None, size: Optional[int] = None) -> bytes:
+    """プロセス共通のレンダラーでSVGをPNGデータにラスタライズ"""
+    return get_renderer().render_png(svg_data, url, size)
+
+
+def render_image(svg_data: bytes, url: Optional[str] = None, size: Optional[int] = None) -> Image.Image:
+    """プロセス共通のレンダラーでSVGをPillowの画像（乗算済みモード 'RGBa'）にラスタライズ"""
+    return get_renderer().render_image(svg_data, url, size)
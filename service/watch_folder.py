@@ -0,0 +1,199 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait as wait_futures
+from typing import Optional
+
+from service.batch_convert import BatchResult, convert_file, get_output_path
+from service.conversion_cache import ConversionCache
+from service.instrumentation import emit
+from service.worker_pool import WarmPool, get_worker_pool
+from utils.config_manager import AppSettings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_SETTLE_SECONDS = 1.0
+
+# 監視対象の拡張子（SVGはsvg_mode、PNGはICOに変換）
+WATCH_EXTENSIONS = ('.svg', '.png')
+
+
+class FolderWatcher:
+    """フォルダを監視し、追加されたSVG/PNGファイルを自動で変換する
+
+    ファイルシステムイベントの代わりに一定間隔でフォルダを走査します。書き込み途中のファイルを
+    変換しないよう、サイズと更新時刻がsettle_seconds秒変化しなくなってから変換します。
+    変換中・待機中のタスク数はmax_pendingまでに制限し、それを超えたファイルはパスのみを
+    キューに保持するため、大量のファイルが一度に追加されてもメモリを使い切りません。
+    """
+
+    def __init__(
+        self,
+        watch_dir: str,
+        output_dir: str,
+        icon_size: int = 128,
+        ico_size: int = 128,
+        ico_sizes: Optional[list[int]] = None,
+        cache: Optional[ConversionCache] = None,
+        svg_mode: str = 'svg_to_ico',
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+        process_existing: bool = False
+    ):
+        if svg_mode not in ('svg_to_png', 'svg_to_ico'):
+            raise ValueError(f"不明なSVGの変換モードです: {svg_mode}")
+        self.watch_dir = watch_dir
+        self.output_dir = output_dir
+        self.icon_size = icon_size
+        self.ico_size = ico_size
+        self.ico_sizes = ico_sizes
+        self.cache = cache
+        self.svg_mode = svg_mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 2
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+
+        self._pool: Optional[WarmPool] = None
+        self._in_flight: dict[Future, str] = {}
+        self._ready: deque[str] = deque()
+        # 変化を監視中のファイル: パス -> (サイズ, 更新時刻, 最後に変化を検出した時刻)
+        self._candidates: dict[str, tuple[int, int, float]] = {}
+        # 変換済み（またはキュー投入済み）のファイル: パス -> (サイズ, 更新時刻)
+        self._handled: dict[str, tuple[int, int]] = {}
+        # 自分が出力したファイル（監視フォルダと出力フォルダが同じ場合に再変換しないため）
+        self._produced: set[str] = set()
+
+        if not process_existing:
+            for path, size, mtime_ns in self._scan():
+                self._handled[path] = (size, mtime_ns)
+
+    @classmethod
+    def from_settings(cls, settings: AppSettings, **kwargs) -> 'FolderWatcher':
+        """config.iniの設定（[Paths]・[Icon]・[Cache]・[Watch]）から作成し、引数で上書き"""
+        options = {
+            'icon_size': settings.icon_size,
+            'ico_size': settings.ico_size,
+            'ico_sizes': list(settings.ico_sizes) or None,
+            'cache': ConversionCache.from_settings(settings),
+            'svg_mode': settings.watch_svg_mode,
+            'poll_interval': settings.watch_poll_interval,
+            'settle_seconds': settings.watch_settle_seconds,
+        }
+        options.update({key: value for key, value in kwargs.items() if value is not None})
+        watch_dir = options.pop('watch_dir', None) or settings.downloads_path
+        output_dir = options.pop('output_dir', None) or settings.output_path
+        return cls(watch_dir, output_dir, **options)
+
+    def _scan(self) -> list[tuple[str, int, int]]:
+        """監視フォルダ内の対象ファイルの（パス, サイズ, 更新時刻）一覧"""
+        files = []
+        try:
+            entries = list(os.scandir(self.watch_dir))
+        except FileNotFoundError:
+            return files
+        for entry in entries:
+            if not entry.name.lower().endswith(WATCH_EXTENSIONS) or not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((os.path.abspath(entry.path), stat.st_size, stat.st_mtime_ns))
+        return files
+
+    def _get_mode(self, path: str) -> str:
+        return self.svg_mode if path.lower().endswith('.svg') else 'png_to_ico'
+
+    def _detect_settled_files(self, now: float) -> None:
+        """新規・更新ファイルのうち、書き込みが終わったものを変換待ちキューに追加"""
+        for path, size, mtime_ns in self._scan():
+            if path in self._produced or self._handled.get(path) == (size, mtime_ns):
+                continue
+            candidate = self._candidates.get(path)
+            if candidate is None or candidate[:2] != (size, mtime_ns):
+                self._candidates[path] = (size, mtime_ns, now)
+                continue
+            if now - candidate[2] >= self.settle_seconds and size > 0:
+                del self._candidates[path]
+                self._handled[path] = (size, mtime_ns)
+                self._ready.append(path)
+
+    def _dispatch(self) -> None:
+        """変換中のタスク数がmax_pending未満の間だけキューから投入"""
+        while self._ready and len(self._in_flight) < self.max_pending:
+            if self._pool is None:
+                os.makedirs(self.output_dir, exist_ok=True)
+                self._pool = get_worker_pool(self.max_workers)
+            path = self._ready.popleft()
+            mode = self._get_mode(path)
+            output_path = get_output_path(path, self.output_dir, mode)
+            self._produced.add(os.path.abspath(output_path))
+            future = self._pool.submit(
+                convert_file, mode, path, output_path, self.icon_size, self.ico_size, self.ico_sizes, self.cache
+            )
+            self._in_flight[future] = path
+
+    def _collect(self) -> list[BatchResult]:
+        """完了した変換結果を取得"""
+        results = []
+        for future in [future for future in self._in_flight if future.done()]:
+            path = self._in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                result = BatchResult(path, '', f"{type(e).__name__}: {e}")
+            for timing in result.stages:
+                emit(timing)
+            if result.succeeded:
+                logger.info("自動変換しました: %s -> %s", result.source_path, result.output_path)
+            else:
+                logger.error("自動変換に失敗しました: %s: %s", result.source_path, result.error)
+            results.append(result)
+        return results
+
+    @property
+    def pending_count(self) -> int:
+        """変換待ち・変換中のファイル数"""
+        return len(self._ready) + len(self._in_flight)
+
+    def poll_once(self, now: Optional[float] = None) -> list[BatchResult]:
+        """フォルダを1回走査して変換を進め、完了した結果を返す"""
+        results = self._collect()
+        self._detect_settled_files(time.monotonic() if now is None else now)
+        self._dispatch()
+        return results
+
+    def run(self, stop_event: Optional[threading.Event] = None) -> None:
+        """stop_eventがセットされるまで（Ctrl+Cでも停止）監視を続ける"""
+        stop_event = stop_event or threading.Event()
+        logger.info("フォルダ監視を開始しました: %s -> %s", self.watch_dir, self.output_dir)
+        # 最初のファイルが追加される前にワーカーを起動し、変換ライブラリを読み込んでおく
+        get_worker_pool(self.max_workers).warm_up()
+        try:
+            while not stop_event.is_set():
+                self.poll_once()
+                stop_event.wait(self.poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+            logger.info("フォルダ監視を終了しました")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """変換中のタスクの完了を待つ（wait=Falseの場合は開始前のタスクを取り消す）
+
+        共有のプロセスプールは終了せず、次の監視・一括変換で再利用します。
+        """
+        if self._pool is not None:
+            if not wait:
+                for future in self._in_flight:
+                    future.cancel()
+            wait_futures(list(self._in_flight))
+            self._collect()
+            self._pool = None
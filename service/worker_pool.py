@@ -0,0 +1,206 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from service.memory_budget import get_current_rss
+from utils.config_manager import AppSettings
+from utils.logging_config import init_worker_logging, worker_initializer
+
+logger = logging.getLogger(__name__)
+
+# ワーカーを入れ替えるまでに1プロセスで実行するタスク数（0の場合は入れ替えない）
+DEFAULT_MAX_TASKS_PER_CHILD = 200
+# タスクの完了時にこのメモリ使用量（バイト）を超えていたワーカーは入れ替える（0の場合は確認しない）
+DEFAULT_RSS_LIMIT = 1024 * 1024 * 1024
+
+# ワーカープロセス側の状態（_init_workerで設定）
+_worker_rss_limit = 0
+_worker_recycle_event = None
+
+
+def preload_modules() -> None:
+    """変換で使用するライブラリ（CairoSVG・cffi・lxml・Pillow）を読み込み、cairoを初期化
+
+    ワーカーの起動時に1回だけ実行し、最初のタスクで読み込み時間がかからないようにします。
+    読み込みに失敗した場合もワーカーは起動し、エラーは変換タスクの結果として返します。
+    """
+    try:
+        from PIL import Image
+
+        import service.convert_png_to_ico  # noqa: F401
+        import service.convert_svg_to_ico  # noqa: F401
+        import service.convert_svg_to_png  # noqa: F401
+
+        Image.init()
+        import cairocffi
+
+        cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 1, 1).finish()
+    except Exception as e:
+        logger.warning("変換ライブラリを事前に読み込めませんでした: %s: %s", type(e).__name__, e)
+
+
+def _init_worker(log_queue, level: int, rss_limit: int, recycle_event, preload: bool) -> None:
+    """ワーカープロセスの初期化処理（ログ転送の設定とライブラリの事前読み込み）"""
+    global _worker_rss_limit, _worker_recycle_event
+    init_worker_logging(log_queue, level)
+    _worker_rss_limit = rss_limit
+    _worker_recycle_event = recycle_event
+    if preload:
+        preload_modules()
+
+
+def _run_task(func: Callable[..., Any], *args: Any) -> Any:
+    """タスクを実行し、完了時のメモリ使用量が上限を超えていれば入れ替えを要求（ワーカープロセスで実行）"""
+    try:
+        return func(*args)
+    finally:
+        if _worker_rss_limit and _worker_recycle_event is not None:
+            rss = get_current_rss()
+            if rss is not None and rss > _worker_rss_limit:
+                logger.debug("ワーカーのメモリ使用量が上限を超えました: %.0fMB (pid %d)", rss / 1024 / 1024, os.getpid())
+                _worker_recycle_event.set()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class WarmPool:
+    """変換ライブラリを読み込み済みのワーカーを保持し、複数の一括変換・GUI操作・フォルダ監視で再利用するプロセスプール
+
+    - 各ワーカーは起動時に preload_modules() でCairoSVG・Pillowを読み込みます
+    - max_tasks_per_child 件のタスクを実行したワーカーは新しいプロセスに入れ替えます（メモリリーク対策）
+    - タスクの完了時にメモリ使用量が rss_limit を超えたワーカーがあった場合は、投入済みのタスクが全て完了した後の
+      投入時にプロセスプールを入れ替えます（一括変換の途中では入れ替えず、新旧のワーカーを同時に起動しません）
+    - ワーカーが異常終了してプロセスプールが使用できなくなった場合は、次の投入時に作り直します
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_tasks_per_child: int = DEFAULT_MAX_TASKS_PER_CHILD,
+        rss_limit: int = DEFAULT_RSS_LIMIT,
+        preload: bool = True
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_tasks_per_child = max_tasks_per_child
+        self.rss_limit = rss_limit
+        self.preload = preload
+        self.recycles = 0
+        # max_tasks_per_childはforkでは使用できないため、その場合はspawnで起動する（Windowsは常にspawn）
+        self._context = multiprocessing.get_context('spawn' if max_tasks_per_child else None)
+        self._recycle_event = self._context.Event()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # 投入済みで未完了のタスク（メモリ使用量による入れ替えは、これが空になるまで待つ）
+        self._in_flight: set[Future] = set()
+        # 取り消したタスクの完了コールバック（_task_done）は取り消したスレッドで呼ばれるため再入可能にする
+        self._lock = threading.RLock()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        if os.name == 'posix' and self._context.get_start_method() == 'fork':
+            # 共有メモリ（service.shared_raster）を追跡するプロセスをワーカーと共有するため、fork前に起動しておく
+            # （ワーカーが独自に起動すると、ワーカーの終了時に使用中の共有メモリが破棄される）
+            from multiprocessing import resource_tracker
+
+            resource_tracker.ensure_running()
+        log_queue, level = worker_initializer()['initargs']
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(log_queue, level, self.rss_limit, self._recycle_event, self.preload),
+            max_tasks_per_child=self.max_tasks_per_child or None,
+        )
+
+    def _retire(self, reason: str) -> None:
+        """現在のプロセスプールを新しいタスクに使用せず、投入済みのタスクの完了後に終了させる"""
+        if self._executor is not None:
+            logger.info("ワーカーを入れ替えます: %s", reason)
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self.recycles += 1
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        """タスクを投入（funcと引数はpickle可能である必要があります）"""
+        with self._lock:
+            if self._recycle_event.is_set() and not self._in_flight:
+                self._recycle_event.clear()
+                self._retire("メモリ使用量が上限を超えました")
+            if self._executor is None:
+                self._executor = self._create_executor()
+            try:
+                future = self._executor.submit(_run_task, func, *args)
+            except BrokenProcessPool:
+                self._retire("ワーカーが異常終了しました")
+                self._executor = self._create_executor()
+                future = self._executor.submit(_run_task, func, *args)
+            self._in_flight.add(future)
+        # 完了したタスクはすぐに外し、結果を保持し続けない（完了済みの場合はこのスレッドで呼ばれる）
+        future.add_done_callback(self._task_done)
+        return future
+
+    def _task_done(self, future: Future) -> None:
+        with self._lock:
+            self._in_flight.discard(future)
+
+    def warm_up(self) -> list[Future]:
+        """全てのワーカーを起動してライブラリを読み込ませる（完了を待たずに戻る）"""
+        return [self.submit(_ping) for _ in range(self.max_workers)]
+
+    @property
+    def is_running(self) -> bool:
+        return self._executor is not None
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+                self._executor = None
+
+
+# ワーカー数ごとに共有するプロセスプール
+_pools: dict[int, WarmPool] = {}
+_pools_lock = threading.Lock()
+_pool_options = {'max_tasks_per_child': DEFAULT_MAX_TASKS_PER_CHILD, 'rss_limit': DEFAULT_RSS_LIMIT}
+
+
+def configure_worker_pools(max_tasks_per_child: Optional[int] = None, rss_limit: Optional[int] = None) -> None:
+    """以降に作成する共有プロセスプールの設定を変更（config.iniの[Batch]の値を指定）"""
+    if max_tasks_per_child is not None:
+        _pool_options['max_tasks_per_child'] = max_tasks_per_child
+    if rss_limit is not None:
+        _pool_options['rss_limit'] = rss_limit
+
+
+def configure_worker_pools_from_settings(settings: AppSettings) -> None:
+    """config.iniの[Batch]の設定（max_tasks_per_child・worker_rss_limit_mb）を共有プロセスプールに適用"""
+    configure_worker_pools(settings.max_tasks_per_child, settings.worker_rss_limit_mb * 1024 * 1024)
+
+
+def get_worker_pool(max_workers: Optional[int] = None) -> WarmPool:
+    """指定したワーカー数（省略時はCPUコア数）の共有プロセスプールを取得（初回のみ作成）"""
+    max_workers = max_workers or os.cpu_count() or 1
+    with _pools_lock:
+        pool = _pools.get(max_workers)
+        if pool is None:
+            pool = _pools[max_workers] = WarmPool(
+                max_workers, _pool_options['max_tasks_per_child'], _pool_options['rss_limit']
+            )
+        return pool
+
+
+def shutdown_worker_pools(wait: bool = False) -> None:
+    """全ての共有プロセスプールを終了（待機中のタスクは取り消す）"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+atexit.register(shutdown_worker_pools)
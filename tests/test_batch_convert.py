@@ -0,0 +1,207 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import Future
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from service.batch_convert import (
+    BatchReport,
+    BatchResult,
+    batch_convert,
+    collect_source_files,
+    execute_tasks,
+    get_output_path,
+)
+from service.conversion_cache import ConversionCache
+
+
+def _write_png(path, size=64, color=(0, 128, 255, 255)):
+    """テスト用のPNGファイルを作成"""
+    Image.new('RGBA', (size, size), color).save(path, format='PNG')
+
+
+class TestCollectSourceFiles:
+    """collect_source_files関数のテストクラス"""
+
+    def test_collect_from_directory(self, tmp_path):
+        """正常系: ディレクトリ指定時は拡張子が一致するファイルのみ収集する"""
+        (tmp_path / "b.svg").write_text("<svg/>")
+        (tmp_path / "a.svg").write_text("<svg/>")
+        (tmp_path / "c.png").write_bytes(b"")
+
+        files = collect_source_files(str(tmp_path), '.svg')
+
+        assert [os.path.basename(path) for path in files] == ["a.svg", "b.svg"]
+
+    def test_collect_from_glob_list(self, tmp_path):
+        """正常系: 複数のglobパターンから重複なく収集する"""
+        (tmp_path / "a.svg").write_text("<svg/>")
+        pattern = str(tmp_path / "*.svg")
+
+        files = collect_source_files([pattern, pattern], '.svg')
+
+        assert len(files) == 1
+
+
+class TestBatchConvert:
+    """batch_convert関数のテストクラス"""
+
+    def test_get_output_path(self):
+        """正常系: 変換モードに応じた拡張子の出力パスを返す"""
+        assert get_output_path(os.path.join("in", "icon.svg"), "out", 'svg_to_ico') == os.path.join("out", "icon.ico")
+
+    def test_batch_convert_invalid_mode(self, tmp_path):
+        """異常系: 不明な変換モードはValueError"""
+        with pytest.raises(ValueError):
+            batch_convert(str(tmp_path), str(tmp_path), mode='unknown')
+
+    @patch('service.convert_svg_to_png.convert_svg_to_png')
+    def test_batch_convert_reports_errors_per_file(self, mock_convert, tmp_path):
+        """異常系: 失敗したファイルのみエラーとしてレポートされる"""
+        (tmp_path / "ok.svg").write_text("<svg/>")
+        (tmp_path / "ng.svg").write_text("<svg/>")
+
+        def convert(src, dst, size, cache):
+            if os.path.basename(src) == "ng.svg":
+                raise ValueError("broken")
+            return dst
+
+        mock_convert.side_effect = convert
+
+        report = batch_convert(str(tmp_path), str(tmp_path / "out"), 'svg_to_png', max_workers=1)
+
+        assert isinstance(report, BatchReport)
+        assert len(report.succeeded) == 1
+        assert len(report.failed) == 1
+        assert "broken" in str(report.failed[0].error)
+
+    def test_batch_convert_png_to_ico_with_process_pool(self, tmp_path):
+        """正常系: プロセスプールでPNG→ICOを一括変換する"""
+        for name in ("a", "b", "c"):
+            _write_png(tmp_path / f"{name}.png")
+        output_dir = tmp_path / "out"
+
+        report = batch_convert(str(tmp_path / "*.png"), str(output_dir), 'png_to_ico', ico_size=32, max_workers=2)
+
+        assert len(report.succeeded) == 3
+        assert all(isinstance(result, BatchResult) for result in report.results)
+        assert sorted(os.listdir(output_dir)) == ["a.ico", "b.ico", "c.ico"]
+
+    def test_png_to_ico_without_cairosvg(self, tmp_path):
+        """正常系: CairoSVGを読み込めない環境でもPNG→ICO変換はできる"""
+        Image.new('RGBA', (64, 64), (255, 0, 0, 255)).save(tmp_path / "icon.png")
+        code = (
+            "import sys; sys.modules['cairosvg'] = None\n"
+            "from service.batch_convert import convert_file\n"
+            f"result = convert_file('png_to_ico', {str(tmp_path / 'icon.png')!r}, {str(tmp_path / 'icon.ico')!r}, 128, 32)\n"
+            "print(result.error)"
+        )
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=project_root)
+
+        assert result.stdout.strip() == "None"
+        assert (tmp_path / "icon.ico").exists()
+
+    def test_batch_convert_reports_output_collisions(self, tmp_path):
+        """異常系: 別フォルダの同名ファイルは出力ファイルが重複するため変換せずに失敗とする"""
+        for name in ("a/icon.png", "b/icon.png", "a/other.png"):
+            (tmp_path / name).parent.mkdir(exist_ok=True)
+            Image.new('RGBA', (32, 32), (255, 0, 0, 255)).save(tmp_path / name)
+        output_dir = tmp_path / "out"
+
+        report = batch_convert(str(tmp_path / "**" / "*.png"), str(output_dir), mode='png_to_ico', ico_size=16, max_workers=1)
+
+        assert sorted(os.path.relpath(result.source_path, tmp_path) for result in report.failed) == [
+            os.path.join("a", "icon.png"), os.path.join("b", "icon.png")
+        ]
+        assert "出力ファイルが重複しています" in str(report.failed[0].error)
+        assert os.listdir(output_dir) == ["other.ico"]
+
+    @patch('service.batch_convert.get_worker_pool')
+    def test_execute_tasks_reports_cancelled_tasks(self, mock_get_worker_pool, tmp_path):
+        """異常系: 取り消されたタスクも結果のリストに失敗として含める"""
+        cancelled = Future()
+        cancelled.cancel()
+        cancelled.set_running_or_notify_cancel()
+        mock_get_worker_pool.return_value.submit.return_value = cancelled
+        tasks = [('png_to_ico', str(tmp_path / name), str(tmp_path / f"{name}.ico"), None, 16, None, None) for name in ("a", "b")]
+
+        results = execute_tasks(tasks, max_workers=2)
+
+        assert [result.source_path for result in results] == [task[1] for task in tasks]
+        assert all(not result.succeeded for result in results)
+
+    def test_batch_convert_with_memory_budget(self, tmp_path):
+        """正常系: メモリ予算を超える場合も待機して全ファイルを変換し、ピークメモリ使用量をレポートする"""
+        for name in ("a", "b", "c"):
+            _write_png(tmp_path / f"{name}.png", size=256)
+
+        # 1タスク分の見積もりより小さい予算では1件ずつ実行される
+        report = batch_convert(str(tmp_path / "*.png"), str(tmp_path / "out"), 'png_to_ico', ico_size=32, max_workers=2, memory_budget=1024)
+
+        assert len(report.succeeded) == 3
+        assert report.peak_rss is None or report.peak_rss > 0
+
+    def test_batch_convert_reports_cache_hits(self, tmp_path):
+        """正常系: 2回目の一括変換ではキャッシュヒットがレポートされる"""
+        _write_png(tmp_path / "a.png", color=(255, 0, 0, 255))
+        _write_png(tmp_path / "b.png", color=(0, 255, 0, 255))
+        cache = ConversionCache(str(tmp_path / "cache"))
+
+        first = batch_convert(str(tmp_path / "*.png"), str(tmp_path / "out"), 'png_to_ico', max_workers=1, cache=cache)
+        second = batch_convert(str(tmp_path / "*.png"), str(tmp_path / "out"), 'png_to_ico', max_workers=1, cache=cache)
+
+        assert first.cache_hits == 0
+        assert second.cache_hits == 2
+
+    def test_batch_convert_incremental_skips_unchanged(self, tmp_path):
+        """正常系: 変更のないファイルはスキップされ、入力の更新や設定変更時は再変換される"""
+        _write_png(tmp_path / "a.png", color=(255, 0, 0, 255))
+        _write_png(tmp_path / "b.png", color=(0, 255, 0, 255))
+        output_dir = str(tmp_path / "out")
+
+        first = batch_convert(str(tmp_path / "*.png"), output_dir, 'png_to_ico', ico_size=32, max_workers=1, incremental=True)
+        second = batch_convert(str(tmp_path / "*.png"), output_dir, 'png_to_ico', ico_size=32, max_workers=1, incremental=True)
+        _write_png(tmp_path / "a.png", color=(0, 0, 255, 255))
+        stat = os.stat(tmp_path / "a.png")
+        os.utime(tmp_path / "a.png", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        third = batch_convert(str(tmp_path / "*.png"), output_dir, 'png_to_ico', ico_size=32, max_workers=1, incremental=True)
+        fourth = batch_convert(str(tmp_path / "*.png"), output_dir, 'png_to_ico', ico_size=16, max_workers=1, incremental=True)
+
+        assert len(first.skipped) == 0
+        assert len(second.skipped) == 2
+        assert [os.path.basename(result.source_path) for result in third.results if not result.skipped] == ["a.png"]
+        assert len(fourth.skipped) == 0
+
+    def test_batch_convert_incremental_ignores_unused_params(self, tmp_path):
+        """正常系: 変換モードで使用しないパラメーター（PNG→ICOのicon_size）の変更では再変換しない"""
+        _write_png(tmp_path / "a.png")
+        output_dir = str(tmp_path / "out")
+
+        batch_convert(str(tmp_path / "*.png"), output_dir, 'png_to_ico', icon_size=128, ico_size=32, max_workers=1, incremental=True)
+        second = batch_convert(str(tmp_path / "*.png"), output_dir, 'png_to_ico', icon_size=64, ico_size=32, max_workers=1, incremental=True)
+
+        assert len(second.skipped) == 1
+
+    def test_batch_convert_incremental_source_changed_during_conversion(self, tmp_path):
+        """正常系: 変換中に更新された入力は、次回の差分変換でスキップせずに再変換される"""
+        _write_png(tmp_path / "a.png", color=(255, 0, 0, 255))
+        output_dir = str(tmp_path / "out")
+
+        def execute_and_modify(tasks, *args):
+            results = execute_tasks(tasks, *args)
+            # 出力より古い更新時刻で書き換え、記録した入力の状態との違いだけで再変換されることを確認する
+            _write_png(tmp_path / "a.png", color=(0, 0, 255, 255))
+            stat = os.stat(tmp_path / "a.png")
+            os.utime(tmp_path / "a.png", ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+            return results
+
+        with patch('service.batch_convert.execute_tasks', side_effect=execute_and_modify):
+            batch_convert(str(tmp_path / "*.png"), output_dir, 'png_to_ico', ico_size=32, max_workers=1, incremental=True)
+        second = batch_convert(str(tmp_path / "*.png"), output_dir, 'png_to_ico', ico_size=32, max_workers=1, incremental=True)
+
+        assert len(second.skipped) == 0
@@ -0,0 +1,96 @@
+import os
+
+from service.build_manifest import MANIFEST_FILE_NAME, BuildManifest
+
+
+def _touch(path, content=b"data", mtime_ns=None):
+    """テスト用のファイルを作成し、更新時刻を設定"""
+    path.write_bytes(content)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestBuildManifest:
+    """BuildManifestクラスのテストクラス"""
+
+    PARAMS = {'mode': 'svg_to_png', 'icon_size': 128, 'ico_size': 128, 'ico_sizes': [16, 32]}
+
+    def test_up_to_date_after_record_and_reload(self, tmp_path):
+        """正常系: 記録・保存した出力は再読み込み後も最新と判定される"""
+        source = tmp_path / "icon.svg"
+        output = tmp_path / "icon.png"
+        _touch(source, mtime_ns=10**18)
+        _touch(output, mtime_ns=2 * 10**18)
+        manifest = BuildManifest(str(tmp_path))
+        manifest.record(str(source), str(output), self.PARAMS, os.stat(source))
+        manifest.save()
+
+        reloaded = BuildManifest(str(tmp_path))
+
+        assert (tmp_path / MANIFEST_FILE_NAME).exists()
+        assert reloaded.is_up_to_date(str(source), str(output), dict(self.PARAMS))
+
+    def test_not_up_to_date_without_record(self, tmp_path):
+        """正常系: 記録のない出力は最新と判定されない"""
+        _touch(tmp_path / "icon.svg")
+        _touch(tmp_path / "icon.png")
+
+        assert not BuildManifest(str(tmp_path)).is_up_to_date(str(tmp_path / "icon.svg"), str(tmp_path / "icon.png"), self.PARAMS)
+
+    def test_not_up_to_date_when_source_changes(self, tmp_path):
+        """正常系: 入力のサイズまたは更新時刻が変わると最新と判定されない"""
+        source = tmp_path / "icon.svg"
+        output = tmp_path / "icon.png"
+        _touch(source, mtime_ns=10**18)
+        _touch(output, mtime_ns=2 * 10**18)
+        manifest = BuildManifest(str(tmp_path))
+        manifest.record(str(source), str(output), self.PARAMS, os.stat(source))
+
+        _touch(source, b"changed", mtime_ns=10**18)
+
+        assert not manifest.is_up_to_date(str(source), str(output), self.PARAMS)
+
+    def test_not_up_to_date_when_source_changes_during_conversion(self, tmp_path):
+        """正常系: 変換前に取得した状態を記録するため、変換中に入力が更新された場合は最新と判定されない"""
+        source = tmp_path / "icon.svg"
+        output = tmp_path / "icon.png"
+        _touch(source, mtime_ns=10**18)
+        manifest = BuildManifest(str(tmp_path))
+        source_stats = manifest.stat_sources([str(source), str(tmp_path / "missing.svg")])
+
+        _touch(source, b"changed", mtime_ns=2 * 10**18)
+        _touch(output, mtime_ns=3 * 10**18)
+        manifest.record(str(source), str(output), self.PARAMS, source_stats[str(source)])
+
+        assert list(source_stats) == [str(source)]
+        assert not manifest.is_up_to_date(str(source), str(output), self.PARAMS)
+
+    def test_not_up_to_date_when_params_change(self, tmp_path):
+        """正常系: 変換パラメータが変わると最新と判定されない"""
+        source = tmp_path / "icon.svg"
+        output = tmp_path / "icon.png"
+        _touch(source, mtime_ns=10**18)
+        _touch(output, mtime_ns=2 * 10**18)
+        manifest = BuildManifest(str(tmp_path))
+        manifest.record(str(source), str(output), self.PARAMS, os.stat(source))
+
+        assert not manifest.is_up_to_date(str(source), str(output), {**self.PARAMS, 'icon_size': 256})
+
+    def test_not_up_to_date_when_output_missing_or_older(self, tmp_path):
+        """正常系: 出力が存在しない、または入力より古い場合は最新と判定されない"""
+        source = tmp_path / "icon.svg"
+        output = tmp_path / "icon.png"
+        _touch(source, mtime_ns=2 * 10**18)
+        _touch(output, mtime_ns=10**18)
+        manifest = BuildManifest(str(tmp_path))
+        manifest.record(str(source), str(output), self.PARAMS, os.stat(source))
+
+        assert not manifest.is_up_to_date(str(source), str(output), self.PARAMS)
+        output.unlink()
+        assert not manifest.is_up_to_date(str(source), str(output), self.PARAMS)
+
+    def test_corrupted_manifest_is_ignored(self, tmp_path):
+        """異常系: 壊れた変換記録は無視して空の状態から始める"""
+        (tmp_path / MANIFEST_FILE_NAME).write_text("{broken")
+
+        assert BuildManifest(str(tmp_path)).entries == {}
@@ -0,0 +1,297 @@
+import dataclasses
+import json
+import subprocess
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+from PIL import Image
+
+import cli
+from utils.config_manager import AppSettings
+
+
+@pytest.fixture(autouse=True)
+def mock_setup_logging():
+    """テスト中にルートロガーのハンドラを置き換えないようにする"""
+    with patch('cli.setup_logging') as mock:
+        yield mock
+
+
+class TestCli:
+    """cli.pyのテストクラス"""
+
+    def test_cli_does_not_import_tkinter(self):
+        """正常系: CLIの読み込みでtkinterがインポートされない"""
+        code = "import sys, cli; print('tkinter' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip() == "False"
+
+    def test_parser_convert_arguments(self):
+        """正常系: convertサブコマンドの引数が解析される"""
+        args = cli.build_parser().parse_args(
+            ["convert", "svg2ico", "a/*.svg", "b", "-o", "out", "--size", "256", "--ico-size", "64", "-j", "4"]
+        )
+
+        assert args.mode == "svg2ico"
+        assert args.inputs == ["a/*.svg", "b"]
+        assert args.output_dir == "out"
+        assert (args.size, args.ico_size, args.jobs) == (256, 64, 4)
+
+    def test_parser_rejects_unknown_mode(self):
+        """異常系: 不明な変換モードはエラー終了する"""
+        with pytest.raises(SystemExit):
+            cli.build_parser().parse_args(["convert", "svg2jpg", "a.svg"])
+
+    @patch('cli.get_settings')
+    def test_load_defaults_from_settings(self, mock_get_settings, tmp_path):
+        """正常系: 既定値は共通の設定（AppSettings）から作成し、キャッシュも設定から作成する"""
+        mock_get_settings.return_value = AppSettings(
+            11, 250, 460, '', 'out', 256, 64, (16, 32), cache_enabled=True, cache_dir=str(tmp_path),
+            memory_budget_mb=512, daemon_port=9000, log_level='DEBUG'
+        )
+
+        defaults = cli._load_defaults()
+
+        assert (defaults['output_dir'], defaults['icon_size'], defaults['ico_size'], defaults['ico_sizes']) == ('out', 256, 64, [16, 32])
+        assert (defaults['memory_budget_mb'], defaults['daemon_port'], defaults['log_level']) == (512, 9000, 'DEBUG')
+        assert defaults['cache'].cache_dir == str(tmp_path)
+
+        # ico_sizesが空の場合はマルチサイズを指定しない（--size・--ico-sizeの単一サイズで出力）
+        mock_get_settings.return_value = dataclasses.replace(mock_get_settings.return_value, ico_sizes=())
+        assert cli._load_defaults()['ico_sizes'] is None
+
+    @patch('cli.get_settings', side_effect=FileNotFoundError)
+    def test_load_defaults_without_config(self, mock_get_settings):
+        """異常系: config.iniを読み込めない場合は組み込みの既定値を使用する"""
+        defaults = cli._load_defaults()
+
+        assert (defaults['output_dir'], defaults['icon_size'], defaults['cache']) == (None, cli.DEFAULT_ICON_SIZE, None)
+
+    @patch('cli.get_settings', side_effect=ValueError("config.iniの[Icon] ico_sizesの指定が不正です: 16,abc"))
+    def test_load_defaults_with_invalid_config(self, mock_get_settings, capsys):
+        """異常系: config.iniの値が不正な場合は警告を表示して組み込みの既定値を使用する"""
+        defaults = cli._load_defaults()
+
+        assert (defaults['icon_size'], defaults['ico_sizes']) == (cli.DEFAULT_ICON_SIZE, None)
+        assert "ico_sizes" in capsys.readouterr().err
+
+    @patch('cli._load_defaults')
+    @patch('service.batch_convert.batch_convert')
+    def test_main_convert_success(self, mock_batch_convert, mock_load_defaults):
+        """正常系: 一括変換APIに引数が渡され、成功時は0を返す"""
+        mock_load_defaults.return_value = {'output_dir': 'default_out', 'icon_size': 128, 'ico_size': 128, 'ico_sizes': [16, 32], 'cache': None}
+        mock_batch_convert.return_value = Mock(results=[Mock()], failed=[])
+
+        exit_code = cli.main(["convert", "png2ico", "icons", "--ico-size", "32", "-j", "2"])
+
+        assert exit_code == 0
+        mock_batch_convert.assert_called_once_with(
+            ["icons"], 'default_out', mode='png_to_ico', icon_size=128, ico_size=32, max_workers=2, ico_sizes=None, cache=None, incremental=False,
+            profile_dir=None, profile_threshold=1.0, memory_budget=None
+        )
+
+    @patch('cli._load_defaults')
+    @patch('service.batch_convert.batch_convert')
+    def test_main_convert_memory_budget(self, mock_batch_convert, mock_load_defaults):
+        """正常系: --memory-budget（MB）をバイトに換算して渡し、0の場合は制限しない"""
+        mock_load_defaults.return_value = {
+            'output_dir': 'out', 'icon_size': 128, 'ico_size': 128, 'ico_sizes': None, 'cache': None, 'memory_budget_mb': 512
+        }
+        mock_batch_convert.return_value = Mock(results=[Mock()], failed=[])
+
+        cli.main(["convert", "svg2png", "icons"])
+        cli.main(["convert", "svg2png", "icons", "--memory-budget", "64"])
+        cli.main(["convert", "svg2png", "icons", "--memory-budget", "0"])
+
+        budgets = [call.kwargs['memory_budget'] for call in mock_batch_convert.call_args_list]
+        assert budgets == [512 * 1024 * 1024, 64 * 1024 * 1024, None]
+
+    @patch('cli._load_defaults')
+    @patch('service.batch_convert.batch_convert')
+    def test_main_convert_uses_ico_sizes(self, mock_batch_convert, mock_load_defaults):
+        """正常系: --ico-sizes指定時、または未指定時はconfig.iniのマルチサイズを使用する"""
+        mock_load_defaults.return_value = {'output_dir': 'out', 'icon_size': 128, 'ico_size': 128, 'ico_sizes': [16, 32], 'cache': None}
+        mock_batch_convert.return_value = Mock(results=[Mock()], failed=[])
+
+        cli.main(["convert", "svg2ico", "icons", "--ico-sizes", "24,48"])
+        assert mock_batch_convert.call_args[1]['ico_sizes'] == [24, 48]
+
+        cli.main(["convert", "svg2ico", "icons"])
+        assert mock_batch_convert.call_args[1]['ico_sizes'] == [16, 32]
+
+        cli.main(["convert", "svg2ico", "icons", "--incremental"])
+        assert mock_batch_convert.call_args[1]['incremental'] is True
+
+    def test_parser_rejects_invalid_ico_sizes(self):
+        """異常系: 不正なサイズ指定はエラー終了する"""
+        with pytest.raises(SystemExit):
+            cli.build_parser().parse_args(["convert", "svg2ico", "a.svg", "--ico-sizes", "16,abc"])
+
+    @patch('cli._load_defaults')
+    @patch('service.batch_convert.batch_convert')
+    def test_main_convert_failure_exit_code(self, mock_batch_convert, mock_load_defaults):
+        """異常系: 失敗したファイルがある場合は1を返す"""
+        mock_load_defaults.return_value = {'output_dir': 'out', 'icon_size': 128, 'ico_size': 128, 'ico_sizes': None, 'cache': None}
+        failed = Mock(source_path="a.png", error="ValueError: broken")
+        mock_batch_convert.return_value = Mock(results=[failed], failed=[failed])
+
+        assert cli.main(["convert", "png2ico", "a.png"]) == 1
+
+    @patch('cli._load_defaults')
+    def test_main_convert_without_output_dir(self, mock_load_defaults):
+        """異常系: 出力ディレクトリが決まらない場合は2を返す"""
+        mock_load_defaults.return_value = {'output_dir': None, 'icon_size': 128, 'ico_size': 128, 'ico_sizes': None, 'cache': None}
+
+        assert cli.main(["convert", "png2ico", "a.png"]) == 2
+
+    @patch('cli._load_defaults')
+    @patch('service.batch_convert.batch_convert')
+    def test_main_convert_cache_options(self, mock_batch_convert, mock_load_defaults, tmp_path):
+        """正常系: --cache-dirでキャッシュを有効化し、--no-cacheでconfig.iniの設定より優先して無効化する"""
+        config_cache = cli.ConversionCache(str(tmp_path / "config_cache"))
+        mock_load_defaults.return_value = {'output_dir': 'out', 'icon_size': 128, 'ico_size': 128, 'ico_sizes': None, 'cache': config_cache}
+        mock_batch_convert.return_value = Mock(results=[Mock()], failed=[])
+
+        cli.main(["convert", "png2ico", "a.png"])
+        assert mock_batch_convert.call_args[1]['cache'] is config_cache
+
+        cli.main(["convert", "png2ico", "a.png", "--cache-dir", str(tmp_path / "cli_cache")])
+        assert mock_batch_convert.call_args[1]['cache'].cache_dir == str(tmp_path / "cli_cache")
+
+        cli.main(["convert", "png2ico", "a.png", "--no-cache"])
+        assert mock_batch_convert.call_args[1]['cache'] is None
+
+    @patch('cli._load_defaults')
+    @patch('service.batch_convert.batch_convert')
+    def test_main_convert_timings(self, mock_batch_convert, mock_load_defaults, tmp_path, capsys):
+        """正常系: --timings指定時は計測結果をファイルに追記し、集計を表示する"""
+        from service.instrumentation import StageTiming, emit
+
+        mock_load_defaults.return_value = {'output_dir': 'out', 'icon_size': 128, 'ico_size': 128, 'ico_sizes': None, 'cache': None}
+
+        def convert(*args, **kwargs):
+            emit(StageTiming('svg_render', 0.25))
+            return Mock(results=[Mock()], failed=[])
+
+        mock_batch_convert.side_effect = convert
+        timings_path = tmp_path / "timings.jsonl"
+
+        assert cli.main(["convert", "svg2png", "a.svg", "--timings", str(timings_path)]) == 0
+
+        assert len(timings_path.read_text(encoding='utf-8').splitlines()) == 1
+        assert "svg_render: 1回" in capsys.readouterr().out
+
+    def test_main_cache_stats_and_clear(self, tmp_path, capsys):
+        """正常系: cacheサブコマンドで統計表示と削除ができる"""
+        cache = cli.ConversionCache(str(tmp_path))
+        cache.put(cache.make_key(b"data"), b"output")
+
+        assert cli.main(["cache", "stats", "--cache-dir", str(tmp_path)]) == 0
+        assert "エントリ数: 1" in capsys.readouterr().out
+
+        assert cli.main(["cache", "clear", "--cache-dir", str(tmp_path)]) == 0
+        assert cache.stats().entries == 0
+
+    @patch('cli._load_defaults')
+    @patch('service.batch_convert.batch_convert')
+    def test_main_convert_reports_cache_usage(self, mock_batch_convert, mock_load_defaults, tmp_path, capsys):
+        """正常系: 実行ごとのキャッシュヒット数を表示し、cache statsで累計のヒット率を表示する"""
+        from service.batch_convert import BatchReport, BatchResult
+
+        mock_load_defaults.return_value = {'output_dir': 'out', 'icon_size': 128, 'ico_size': 128, 'ico_sizes': None, 'cache': None}
+        mock_batch_convert.return_value = BatchReport([
+            BatchResult('a.png', 'a.ico', cache_hit=True), BatchResult('b.png', 'b.ico'),
+            BatchResult('c.png', 'c.ico', skipped=True), BatchResult('d.png', 'd.ico', error="broken")
+        ])
+
+        cli.main(["convert", "png2ico", "*.png", "--cache-dir", str(tmp_path)])
+        cli.main(["convert", "png2ico", "*.png", "--cache-dir", str(tmp_path)])
+        assert "キャッシュ: ヒット 1 / 2 件" in capsys.readouterr().out
+
+        assert cli.main(["cache", "stats", "--cache-dir", str(tmp_path)]) == 0
+        assert "ヒット率: 50.0%（ヒット 2 / ミス 2" in capsys.readouterr().out
+
+    @patch('cli._load_defaults')
+    @patch('service.sprite_atlas.build_atlas')
+    def test_main_atlas(self, mock_build_atlas, mock_load_defaults, capsys):
+        """正常系: atlasサブコマンドの引数がアトラスの作成に渡される"""
+        mock_load_defaults.return_value = {'output_dir': 'out', 'icon_size': 128, 'ico_size': 128, 'ico_sizes': None, 'cache': None}
+        mock_build_atlas.return_value = Mock(sprites=[Mock()], sheets=[Mock()], failed=[], index_path="out/atlas.json")
+
+        assert cli.main(["atlas", "icons", "--sizes", "16,32", "--max-size", "512", "--power-of-two", "-j", "2"]) == 0
+
+        args, kwargs = mock_build_atlas.call_args
+        assert args == (["icons"], 'out')
+        assert (kwargs['size'], kwargs['sizes'], kwargs['max_size'], kwargs['padding']) == (128, [16, 32], 512, 1)
+        assert (kwargs['power_of_two'], kwargs['max_workers'], kwargs['name']) == (True, 2, "atlas")
+        assert "out/atlas.json" in capsys.readouterr().out
+
+    @patch('service.watch_folder.FolderWatcher.from_settings')
+    @patch('cli.get_settings')
+    def test_main_watch(self, mock_get_settings, mock_from_settings):
+        """正常系: watchサブコマンドの引数が監視設定に渡される"""
+        assert cli.main(["watch", "-i", "in", "-o", "out", "-j", "2", "--settle", "0.5", "--existing"]) == 0
+
+        kwargs = mock_from_settings.call_args[1]
+        assert (kwargs['watch_dir'], kwargs['output_dir'], kwargs['max_workers']) == ("in", "out", 2)
+        assert (kwargs['settle_seconds'], kwargs['process_existing'], kwargs['poll_interval']) == (0.5, True, None)
+        mock_from_settings.return_value.run.assert_called_once()
+
+    @patch('cli._load_defaults')
+    def test_main_run_manifest(self, mock_load_defaults, tmp_path):
+        """正常系: runサブコマンドでマニフェストを実行し、結果マニフェストを出力する"""
+        mock_load_defaults.return_value = {
+            'output_dir': None, 'icon_size': 128, 'ico_size': 128, 'ico_sizes': [16, 32], 'cache': None, 'log_level': None
+        }
+        Image.new('RGBA', (64, 64), (255, 0, 0, 255)).save(tmp_path / "icon.png")
+        manifest_path = tmp_path / "icons.json"
+        manifest_path.write_text(json.dumps({
+            'defaults': {'output_path': "out"},
+            'jobs': [{'source': "icon.png", 'format': "ico"}],
+        }), encoding='utf-8')
+
+        assert cli.main(["run", str(manifest_path), "-j", "1", "--no-cache"]) == 0
+
+        result = json.loads((tmp_path / "icons.result.json").read_text(encoding='utf-8'))
+        assert result['succeeded'] == 1
+        assert result['jobs'][0]['sizes'] == [16, 32]
+        assert (tmp_path / "out" / "icon.ico").exists()
+
+    def test_main_run_invalid_manifest(self, tmp_path, capsys):
+        """異常系: 読み込めないマニフェストは終了コード2"""
+        manifest_path = tmp_path / "icons.json"
+        manifest_path.write_text(json.dumps({'defaults': {'output_path': "out"}, 'jobs': []}), encoding='utf-8')
+
+        assert cli.main(["run", str(manifest_path)]) == 2
+        assert "マニフェストを読み込めません" in capsys.readouterr().err
+
+    @patch('cli._load_defaults')
+    def test_main_log_options(self, mock_load_defaults, mock_setup_logging, tmp_path):
+        """正常系: -q/-vとconfig.iniの[Logging]でログレベルが設定される"""
+        mock_load_defaults.return_value = {'cache': None, 'log_level': 'WARNING'}
+
+        cli.main(["cache", "stats", "--cache-dir", str(tmp_path)])
+        mock_setup_logging.assert_called_with('WARNING', quiet=False)
+
+        cli.main(["cache", "stats", "--cache-dir", str(tmp_path), "-v"])
+        mock_setup_logging.assert_called_with('DEBUG', quiet=False)
+
+        cli.main(["cache", "stats", "--cache-dir", str(tmp_path), "-q"])
+        mock_setup_logging.assert_called_with('WARNING', quiet=True)
+
+    @patch('service.daemon_client.DaemonClient')
+    def test_main_send(self, mock_client_class, tmp_path):
+        """正常系: sendサブコマンドで入力・出力のパスとサイズをデーモンに送信する"""
+        client = mock_client_class.return_value.__enter__.return_value
+
+        assert cli.main(["send", "svg2ico", "icon.svg", "-o", "icon.ico", "--ico-size", "64", "--port", "9000"]) == 0
+
+        assert mock_client_class.call_args.args == ("127.0.0.1", 9000)
+        client.convert_file.assert_called_once_with('svg_to_ico', "icon.svg", "icon.ico", None, 64, None)
+
+    def test_main_send_without_output(self, capsys):
+        """異常系: ファイルを入力する場合は出力ファイルの指定が必要"""
+        assert cli.main(["send", "svg2ico", "icon.svg"]) == 2
+        assert "出力ファイルが指定されていません" in capsys.readouterr().err
@@ -1,11 +1,20 @@
 import configparser
+import dataclasses
 import os
 import sys
 from unittest.mock import Mock, mock_open, patch
 
 import pytest
 
-from utils.config_manager import CONFIG_PATH, get_config_path, load_config, save_config
+from utils.config_manager import (
+    CONFIG_PATH,
+    AppSettings,
+    ConfigService,
+    get_config_path,
+    get_ico_sizes,
+    load_config,
+    save_config,
+)
 
 
 class TestGetConfigPath:
@@ -99,27 +108,25 @@ class TestLoadConfig:
         with pytest.raises(PermissionError):
             load_config()
 
-    @patch('builtins.print')
     @patch('builtins.open', side_effect=FileNotFoundError())
     @patch('utils.config_manager.CONFIG_PATH', 'C:\\test\\config.ini')
-    def test_load_config_prints_file_not_found_error(self, mock_file, mock_print):
-        """異常系: FileNotFoundError時にエラーメッセージが出力される"""
+    def test_load_config_logs_file_not_found_error(self, mock_file, caplog):
+        """異常系: FileNotFoundError時にエラーログが出力される"""
         with pytest.raises(FileNotFoundError):
             load_config()
 
-        mock_print.assert_called()
-        assert "設定ファイルが見つかりません" in mock_print.call_args[0][0]
+        assert caplog.records[-1].levelname == 'ERROR'
+        assert "設定ファイルが見つかりません" in caplog.records[-1].getMessage()
 
-    @patch('builtins.print')
     @patch('builtins.open', new_callable=mock_open, read_data='[Invalid')
     @patch('utils.config_manager.CONFIG_PATH', 'C:\\test\\config.ini')
-    def test_load_config_prints_parse_error(self, mock_file, mock_print):
-        """異常系: 解析エラー時にエラーメッセージが出力される"""
+    def test_load_config_logs_parse_error(self, mock_file, caplog):
+        """異常系: 解析エラー時にエラーログが出力される"""
         with pytest.raises(configparser.Error):
             load_config()
 
-        mock_print.assert_called()
-        assert "設定ファイルの解析中にエラーが発生しました" in mock_print.call_args[0][0]
+        assert caplog.records[-1].levelname == 'ERROR'
+        assert "設定ファイルの解析中にエラーが発生しました" in caplog.records[-1].getMessage()
 
 
 class TestSaveConfig:
@@ -157,18 +164,17 @@ class TestSaveConfig:
         with pytest.raises(PermissionError):
             save_config(config)
 
-    @patch('builtins.print')
     @patch('builtins.open', side_effect=IOError('Write error'))
     @patch('utils.config_manager.CONFIG_PATH', 'C:\\test\\config.ini')
-    def test_save_config_prints_io_error(self, mock_file, mock_print):
-        """異常系: IOError時にエラーメッセージが出力される"""
+    def test_save_config_logs_io_error(self, mock_file, caplog):
+        """異常系: IOError時にエラーログが出力される"""
         config = configparser.ConfigParser()
 
         with pytest.raises(IOError):
             save_config(config)
 
-        mock_print.assert_called()
-        assert "設定ファイルの保存中にエラーが発生しました" in mock_print.call_args[0][0]
+        assert caplog.records[-1].levelname == 'ERROR'
+        assert "設定ファイルの保存中にエラーが発生しました" in caplog.records[-1].getMessage()
 
     @patch('builtins.open', new_callable=mock_open)
     @patch('utils.config_manager.CONFIG_PATH', 'C:\\test\\config.ini')
@@ -195,6 +201,107 @@ class TestSaveConfig:
         mock_file.assert_called_once_with('C:\\test\\config.ini', 'w', encoding='utf-8')
 
 
+class TestGetIcoSizes:
+    """get_ico_sizes関数のテストクラス"""
+
+    def test_get_ico_sizes_from_list(self):
+        """正常系: カンマ区切りのico_sizesをリストで返す"""
+        config = configparser.ConfigParser()
+        config.read_string("[Icon]\nico_size = 128\nico_sizes = 16, 32 ,48,\n")
+
+        assert get_ico_sizes(config) == [16, 32, 48]
+
+    def test_get_ico_sizes_empty_when_unset(self):
+        """正常系: ico_sizesが未設定または空の場合は空のリスト（ico_sizeの単一サイズで出力）を返す"""
+        config = configparser.ConfigParser()
+        config.read_string("[Icon]\nico_size = 64\n")
+        assert get_ico_sizes(config) == []
+
+        config.set('Icon', 'ico_sizes', '')
+        assert get_ico_sizes(config) == []
+
+    def test_get_ico_sizes_invalid(self):
+        """異常系: 整数でない値が含まれる場合は設定項目を示すValueError"""
+        config = configparser.ConfigParser()
+        config.read_string("[Icon]\nico_size = 64\nico_sizes = 16,abc\n")
+
+        with pytest.raises(ValueError, match="ico_sizes"):
+            get_ico_sizes(config)
+
+
+CONFIG_TEXT = """[Appearance]
+font_size = 11
+window_width = 250
+window_height = 460
+
+[Paths]
+downloads_path = C:\\Downloads
+output_path = C:\\output
+
+[Icon]
+icon_size = 128
+ico_size = {ico_size}
+ico_sizes = 16, 32
+"""
+
+
+class TestConfigService:
+    """ConfigServiceクラスのテストクラス"""
+
+    @pytest.fixture
+    def config_file(self, tmp_path):
+        path = tmp_path / "config.ini"
+        path.write_text(CONFIG_TEXT.format(ico_size=64), encoding='utf-8')
+        return path
+
+    def test_settings_are_typed_and_immutable(self, config_file):
+        """正常系: 型変換済みの設定が返され、変更できない"""
+        settings = ConfigService(str(config_file)).get()
+
+        assert isinstance(settings, AppSettings)
+        assert (settings.window_height, settings.ico_size, settings.ico_sizes) == (460, 64, (16, 32))
+        assert (settings.keep_png, settings.cache_enabled, settings.log_level) == (False, False, 'INFO')
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            setattr(settings, 'ico_size', 32)
+
+    def test_get_does_not_reread_unchanged_file(self, config_file):
+        """正常系: ファイルが変更されていなければ再読み込みしない"""
+        service = ConfigService(str(config_file))
+        first = service.get()
+
+        with patch('utils.config_manager.load_config') as mock_load_config:
+            assert service.get() is first
+            assert service.check_for_changes() is False
+
+        mock_load_config.assert_not_called()
+
+    def test_get_reloads_when_file_changes(self, config_file):
+        """正常系: 更新時刻が変わった場合は再読み込みし、リスナーへ通知する"""
+        service = ConfigService(str(config_file))
+        service.get()
+        received = []
+        service.add_listener(received.append)
+
+        config_file.write_text(CONFIG_TEXT.format(ico_size=256), encoding='utf-8')
+        stat = os.stat(config_file)
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert service.get().ico_size == 256
+        assert [settings.ico_size for settings in received] == [256]
+
+    def test_reload_forces_read(self, config_file):
+        """正常系: reload()は変更の有無にかかわらず読み込み直す"""
+        service = ConfigService(str(config_file))
+        first = service.get()
+
+        assert service.reload() is not first
+
+    def test_missing_file_raises(self, tmp_path):
+        """異常系: 設定ファイルがない場合はFileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            ConfigService(str(tmp_path / "missing.ini")).get()
+
+
 class TestConfigPath:
     """CONFIG_PATH定数のテストクラス"""
 
@@ -209,3 +316,9 @@ class TestConfigPath:
     def test_config_path_contains_config_ini(self):
         """正常系: CONFIG_PATHにconfig.iniが含まれる"""
         assert 'config.ini' in CONFIG_PATH
+
+    def test_shipped_config_outputs_single_size_ico(self):
+        """正常系: 同梱のconfig.iniではマルチサイズICOを指定しない（ico_sizeの1フレームのみを出力）"""
+        settings = AppSettings.from_config(load_config(CONFIG_PATH))
+
+        assert settings.ico_sizes == ()
@@ -0,0 +1,154 @@
+import dataclasses
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from service.conversion_cache import CacheStats, ConversionCache, get_library_versions
+from service.convert_png_to_ico import convert_png_to_ico
+from utils.config_manager import AppSettings
+
+
+class TestConversionCache:
+    """ConversionCacheクラスのテストクラス"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return ConversionCache(str(tmp_path / "cache"), max_bytes=1024)
+
+    def test_make_key_depends_on_source_and_params(self, cache):
+        """正常系: 入力データまたはパラメータが異なるとキーが変わる"""
+        key = cache.make_key(b"data", size=16)
+
+        assert key == cache.make_key(b"data", size=16)
+        assert key != cache.make_key(b"other", size=16)
+        assert key != cache.make_key(b"data", size=32)
+
+    def test_make_key_depends_on_library_versions(self, cache):
+        """正常系: ライブラリのバージョンが変わるとキーが変わる"""
+        key = cache.make_key(b"data", size=16)
+
+        with patch('service.conversion_cache.get_library_versions', return_value={'pillow': '0.0.0'}):
+            assert cache.make_key(b"data", size=16) != key
+
+    def test_get_and_put(self, cache):
+        """正常系: 保存したデータを取得でき、ヒット/ミスが記録される"""
+        key = cache.make_key(b"data")
+
+        assert cache.get(key) is None
+        cache.put(key, b"output")
+
+        assert cache.get(key) == b"output"
+        stats = cache.stats()
+        assert isinstance(stats, CacheStats)
+        assert (stats.hits, stats.misses, stats.stores, stats.entries) == (1, 1, 1, 1)
+        assert stats.hit_rate == 0.5
+
+    def test_lru_eviction(self, cache):
+        """正常系: 上限を超えると最終アクセスが古いエントリから削除される"""
+        keys = [cache.make_key(bytes([i])) for i in range(3)]
+        cache.put(keys[0], b"a" * 400)
+        cache.put(keys[1], b"b" * 400)
+        os.utime(cache._entry_path(keys[0]), (1, 1))
+        os.utime(cache._entry_path(keys[1]), (2, 2))
+        cache.get(keys[0])
+
+        cache.put(keys[2], b"c" * 400)
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert cache.evictions == 1
+        assert cache.stats().total_bytes <= 1024
+
+    def test_overwrite_does_not_count_twice(self, cache):
+        """正常系: 同じキーを上書きしても置き換えたエントリの分は合計サイズに含めず、削除しない"""
+        keys = [cache.make_key(bytes([i])) for i in range(2)]
+        cache.put(keys[0], b"a" * 400)
+        cache.put(keys[1], b"b" * 400)
+
+        for _ in range(3):
+            cache.put(keys[1], b"c" * 400)
+
+        assert cache.evictions == 0
+        assert cache._total_bytes == cache.stats().total_bytes == 800
+
+    def test_concurrent_put_from_threads(self, cache):
+        """正常系: 複数のスレッドから同じキーに書き込んでも一時ファイルが混ざらず、いずれかの内容になる"""
+        key = cache.make_key(b"data")
+        payloads = [bytes([i]) * 200 for i in range(8)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda data: cache.put(key, data), payloads * 10))
+
+        assert cache.get(key) in payloads
+        assert not [name for _, _, names in os.walk(cache.cache_dir) for name in names if name.endswith('.tmp')]
+
+    def test_clear(self, cache):
+        """正常系: 全エントリが削除される"""
+        cache.put(cache.make_key(b"data"), b"output")
+
+        cache.clear()
+
+        assert cache.stats().entries == 0
+
+    def test_record_usage(self, cache):
+        """正常系: 実行ごとのヒット/ミス数を累計し、clear()で削除する"""
+        assert cache.load_usage() == CacheStats()
+
+        cache.record_usage(3, 1)
+        usage = cache.record_usage(1, 3)
+
+        assert (usage.hits, usage.misses, usage.hit_rate) == (4, 4, 0.5)
+        assert cache.load_usage() == usage
+        assert cache.stats().entries == 0
+        cache.clear()
+        assert cache.load_usage() == CacheStats()
+
+    def test_from_settings(self, tmp_path):
+        """正常系: 読み込み済みの設定からキャッシュを作成し、無効な場合はNoneを返す"""
+        settings = AppSettings(11, 250, 460, '', '', 128, 128, (128,), cache_enabled=True, cache_max_size_mb=2)
+
+        cache = ConversionCache.from_settings(settings)
+
+        assert cache is not None
+        assert cache.max_bytes == 2 * 1024 * 1024
+        assert ConversionCache.from_settings(dataclasses.replace(settings, cache_enabled=False)) is None
+
+    def test_get_library_versions(self):
+        """正常系: キーに含めるライブラリのバージョンを返す"""
+        versions = get_library_versions()
+
+        assert set(versions) == {'CairoSVG', 'cairocffi', 'pillow'}
+
+
+class TestConvertPngToIcoWithCache:
+    """キャッシュを使用したPNG→ICO変換のテストクラス"""
+
+    def test_cache_hit_skips_pillow(self, tmp_path):
+        """正常系: キャッシュヒット時はPillowを呼び出さずに同じICOを出力する"""
+        png_path = tmp_path / "test.png"
+        Image.new('RGBA', (64, 64), (255, 0, 0, 255)).save(png_path)
+        cache = ConversionCache(str(tmp_path / "cache"))
+
+        convert_png_to_ico(str(png_path), str(tmp_path / "first.ico"), 32, cache=cache)
+        with patch('service.convert_png_to_ico.Image.open') as mock_open:
+            convert_png_to_ico(str(png_path), str(tmp_path / "second.ico"), 32, cache=cache)
+
+        mock_open.assert_not_called()
+        assert (tmp_path / "first.ico").read_bytes() == (tmp_path / "second.ico").read_bytes()
+        assert cache.hits == 1
+
+    def test_cache_key_includes_size(self, tmp_path):
+        """正常系: サイズが異なる場合はキャッシュを使用しない"""
+        png_path = tmp_path / "test.png"
+        Image.new('RGBA', (64, 64), (255, 0, 0, 255)).save(png_path)
+        cache = ConversionCache(str(tmp_path / "cache"))
+
+        convert_png_to_ico(str(png_path), str(tmp_path / "a.ico"), 32, cache=cache)
+        convert_png_to_ico(str(png_path), str(tmp_path / "b.ico"), 16, cache=cache)
+
+        assert (cache.hits, cache.misses) == (0, 2)
+        with Image.open(tmp_path / "b.ico") as ico:
+            assert ico.size == (16, 16)
@@ -0,0 +1,191 @@
+import http.client
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from service.conversion_daemon import ConversionDaemon
+from service.daemon_client import DaemonClient, DaemonError
+
+
+def _make_png_bytes(size):
+    """テスト用のPNGバイト列を生成"""
+    buffer = io.BytesIO()
+    Image.new('RGBA', (size, size), (255, 0, 0, 255)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """空きポートで待ち受け、デーモンのプロセスで変換するデーモン（tmp_path以下にのみ出力）"""
+    daemon = ConversionDaemon(port=0, max_workers=1, ico_size=32, output_root=str(tmp_path))
+    thread = daemon.start()
+    yield daemon
+    daemon.shutdown()
+    thread.join(timeout=10)
+
+
+@pytest.fixture
+def client(daemon):
+    with DaemonClient(port=daemon.port) as client:
+        yield client
+
+
+def _post(daemon, path, body, headers):
+    """クライアントを使用せずにリクエストを送信し、（ステータス, 本文）を返す"""
+    connection = http.client.HTTPConnection('127.0.0.1', daemon.port, timeout=10)
+    try:
+        connection.request('POST', path, body, headers)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def _post_raw(daemon, path, headers, body=b""):
+    """Content-Length等のヘッダーを自動で付けずにリクエストを送信し、ステータスを返す"""
+    connection = http.client.HTTPConnection('127.0.0.1', daemon.port, timeout=10)
+    try:
+        connection.putrequest('POST', path)
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders(body)
+        return connection.getresponse().status
+    finally:
+        connection.close()
+
+
+class TestConversionDaemon:
+    """ConversionDaemonクラス・DaemonClientクラスのテストクラス"""
+
+    def test_health(self, client):
+        """正常系: 状態を取得できる"""
+        status = client.health()
+
+        assert status['status'] == 'ok'
+        assert status['workers'] == 1
+        assert client.is_running()
+
+    def test_convert_data_png_to_ico(self, client):
+        """正常系: PNGのバイト列からICOのバイト列を返す（サイズ省略時はデーモンの既定値）"""
+        ico_data = client.convert_data('png_to_ico', _make_png_bytes(64))
+        multi_data = client.convert_data('png_to_ico', _make_png_bytes(64), ico_sizes=[16, 32])
+
+        with Image.open(io.BytesIO(ico_data)) as ico:
+            assert ico.size == (32, 32)
+        with Image.open(io.BytesIO(multi_data)) as ico:
+            assert ico.info['sizes'] == {(16, 16), (32, 32)}
+
+    @patch('service.convert_svg_to_png.render_png')
+    def test_convert_data_svg_to_png_reuses_connection(self, mock_render_png, client, daemon):
+        """正常系: SVGのバイト列をラスタライズし、複数のリクエストで接続を再利用する"""
+        mock_render_png.return_value = b"png"
+
+        results = [client.convert_data('svg_to_png', b"<svg/>", icon_size=48) for _ in range(3)]
+
+        assert results == [b"png"] * 3
+        mock_render_png.assert_called_with(b"<svg/>", None, 48)
+        assert daemon.requests == 3
+
+    def test_convert_file(self, client, tmp_path):
+        """正常系: 指定したパスのファイルを変換し、出力フォルダを作成する"""
+        source = tmp_path / "icon.png"
+        source.write_bytes(_make_png_bytes(64))
+        output = tmp_path / "out" / "icon.ico"
+
+        result = client.convert_file('png_to_ico', str(source), str(output), ico_size=16)
+
+        assert result['output_path'] == str(output)
+        with Image.open(output) as ico:
+            assert ico.size == (16, 16)
+
+    def test_conversion_errors(self, client, tmp_path):
+        """異常系: 変換に失敗した場合はDaemonError（422）、接続は以降も使用できる"""
+        with pytest.raises(DaemonError) as error:
+            client.convert_data('png_to_ico', b"not a png")
+        assert error.value.status == 422
+
+        with pytest.raises(DaemonError, match="FileNotFoundError"):
+            client.convert_file('png_to_ico', str(tmp_path / "missing.png"), str(tmp_path / "missing.ico"))
+
+        with pytest.raises(DaemonError) as error:
+            client.convert_data('svg_to_bmp', b"<svg/>")
+        assert error.value.status == 404
+        assert client.health()['status'] == 'ok'
+
+    def test_rejects_unsafe_requests(self, daemon):
+        """異常系: 相対パス・ブラウザから送信できる形式・ループバック以外のHostは受け付けない"""
+        body = json.dumps({'mode': 'png_to_ico', 'source': "icon.png", 'output': "icon.ico"})
+
+        assert _post(daemon, '/convert', body, {'Content-Type': 'application/json'})[0] == 400
+        assert _post(daemon, '/convert', body, {'Content-Type': 'text/plain'})[0] == 415
+        assert _post(daemon, '/convert/png_to_ico', b"", {
+            'Content-Type': 'application/octet-stream', 'Host': 'example.com'
+        })[0] == 403
+
+    def test_rejects_output_outside_root(self, daemon, client, tmp_path):
+        """異常系: 出力先フォルダの外（'..' を含むパスを含む）には書き込まない"""
+        source = tmp_path / "icon.png"
+        source.write_bytes(_make_png_bytes(64))
+
+        for output in (tmp_path.parent / "icon.ico", tmp_path / ".." / "escape.ico"):
+            with pytest.raises(DaemonError) as error:
+                client.convert_file('png_to_ico', str(source), str(output))
+            assert error.value.status == 403
+            assert not output.exists()
+
+    def test_file_conversion_disabled_without_output_root(self, tmp_path):
+        """異常系: 出力先フォルダを指定しない場合はファイルを出力しない"""
+        daemon = ConversionDaemon(port=0, max_workers=1)
+        thread = daemon.start()
+        try:
+            with DaemonClient(port=daemon.port) as client, pytest.raises(DaemonError) as error:
+                client.convert_file('png_to_ico', str(tmp_path / "icon.png"), str(tmp_path / "icon.ico"))
+        finally:
+            daemon.shutdown()
+            thread.join(timeout=10)
+
+        assert error.value.status == 403
+
+    def test_rejects_non_loopback_bind(self):
+        """異常系: ループバックアドレス以外では待ち受けない"""
+        with pytest.raises(ValueError):
+            ConversionDaemon(host='0.0.0.0', port=0)
+
+    def test_validates_content_length(self, daemon):
+        """異常系: Content-Lengthがない・負の値・数値以外・上限超過の場合はエラー（接続を待ち続けない）"""
+        headers = {'Content-Type': 'application/octet-stream'}
+
+        assert _post_raw(daemon, '/convert/png_to_ico', headers) == 411
+        assert _post_raw(daemon, '/convert/png_to_ico', {**headers, 'Content-Length': '-1'}) == 400
+        assert _post_raw(daemon, '/convert/png_to_ico', {**headers, 'Content-Length': 'abc'}) == 400
+        daemon.max_request_bytes = 10
+        assert _post_raw(daemon, '/convert/png_to_ico', {**headers, 'Content-Length': '11'}, b"x" * 11) == 413
+
+    def test_shutdown(self, tmp_path):
+        """正常系: /shutdownでデーモンが終了する"""
+        daemon = ConversionDaemon(port=0, max_workers=1)
+        thread = daemon.start()
+
+        with DaemonClient(port=daemon.port) as client:
+            client.shutdown()
+        thread.join(timeout=10)
+
+        assert not thread.is_alive()
+        assert not DaemonClient(port=daemon.port, timeout=1).is_running()
+
+    def test_worker_pool(self):
+        """正常系: ワーカー数が2以上の場合は読み込み済みのワーカープロセスで変換する"""
+        daemon = ConversionDaemon(port=0, max_workers=2)
+        thread = daemon.start()
+        try:
+            with DaemonClient(port=daemon.port) as client:
+                ico_data = client.convert_data('png_to_ico', _make_png_bytes(64), ico_size=16)
+        finally:
+            daemon.shutdown()
+            thread.join(timeout=10)
+
+        with Image.open(io.BytesIO(ico_data)) as ico:
+            assert ico.size == (16, 16)
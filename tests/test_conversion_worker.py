@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from app.conversion_worker import ConversionWorker
+from service.worker_pool import get_worker_pool
+
+
+def _square(value):
+    """ワーカープロセスで実行するテスト用関数"""
+    return value * value
+
+
+def _sleep(seconds):
+    """ワーカープロセスで実行するテスト用関数"""
+    time.sleep(seconds)
+    return seconds
+
+
+def _wait_until_idle(worker, timeout=10.0):
+    """全タスクが完了するまでpollを繰り返す"""
+    done = []
+    deadline = time.monotonic() + timeout
+    while worker.is_busy and time.monotonic() < deadline:
+        done.extend(worker.poll())
+        time.sleep(0.01)
+    return done
+
+
+class TestConversionWorker:
+    """ConversionWorkerクラスのテストクラス"""
+
+    @pytest.fixture
+    def worker(self):
+        worker = ConversionWorker(max_workers=1)
+        yield worker
+        worker.shutdown()
+
+    def test_submit_and_poll(self, worker):
+        """正常系: 投入したタスクの結果をpollで取得し、進捗が集計される"""
+        for value in range(3):
+            worker.submit(_square, value)
+
+        done = _wait_until_idle(worker)
+
+        assert sorted(future.result() for future in done) == [0, 1, 4]
+        assert (worker.total, worker.completed, worker.cancelled) == (3, 3, 0)
+        assert worker.throughput > 0
+        assert not worker.is_busy
+
+    def test_poll_does_not_block(self, worker):
+        """正常系: 実行中のタスクがあってもpollはすぐに戻る"""
+        worker.submit(_sleep, 0.5)
+
+        start = time.perf_counter()
+        assert worker.poll() == []
+        assert time.perf_counter() - start < 0.1
+        assert worker.is_busy
+
+    def test_cancel_pending_tasks(self, worker):
+        """正常系: 開始前のタスクは取り消され、取消件数として集計される"""
+        for _ in range(5):
+            worker.submit(_sleep, 0.2)
+
+        cancelled = worker.cancel()
+        _wait_until_idle(worker)
+
+        assert cancelled > 0
+        assert worker.cancelled == cancelled
+        assert worker.completed + worker.cancelled == 5
+
+    def test_progress_resets_for_new_work(self, worker):
+        """正常系: 前回のタスクが全て完了した後の投入では進捗がリセットされる"""
+        worker.submit(_square, 2)
+        _wait_until_idle(worker)
+
+        worker.submit(_square, 3)
+
+        assert (worker.total, worker.completed) == (1, 0)
+
+    def test_shares_pool_between_workers(self, worker):
+        """正常系: 同じワーカー数のConversionWorkerはプロセスプールを共有し、shutdown後も再利用できる"""
+        worker.submit(_square, 2)
+        _wait_until_idle(worker)
+        worker.shutdown()
+
+        other = ConversionWorker(max_workers=1)
+        future = other.submit(_square, 3)
+
+        assert future.result(timeout=30) == 9
+        assert other._pool is get_worker_pool(1)
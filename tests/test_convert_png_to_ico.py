@@ -1,18 +1,20 @@
+import logging
 from unittest.mock import Mock, call, patch
 
 import pytest
 from PIL import Image
 
-from service.convert_png_to_ico import convert_png_to_ico
+from service.convert_png_to_ico import convert_png_to_ico, normalize_ico_sizes
+from service.resize_strategy import DEFAULT_REDUCING_GAP, resize_mipmap
 
 
 class TestConvertPngToIco:
     """PNG to ICO変換処理のテストクラス"""
 
     @patch('service.convert_png_to_ico.Image.open')
-    @patch('builtins.print')
-    def test_convert_png_to_ico_success(self, mock_print, mock_image_open):
+    def test_convert_png_to_ico_success(self, mock_image_open, caplog):
         """正常系: PNGからICOへの変換が成功する"""
+        caplog.set_level(logging.INFO)
         mock_image = Mock(spec=Image.Image)
         mock_resized_image = Mock(spec=Image.Image)
         mock_image_open.return_value = mock_image
@@ -25,9 +27,9 @@ class TestConvertPngToIco:
         convert_png_to_ico(png_path, ico_path, size)
 
         mock_image_open.assert_called_once_with(png_path)
-        mock_image.resize.assert_called_once_with((size, size), Image.Resampling.LANCZOS)
+        mock_image.resize.assert_called_once_with((size, size), Image.Resampling.LANCZOS, reducing_gap=DEFAULT_REDUCING_GAP)
         mock_resized_image.save.assert_called_once_with(ico_path, format='ICO', sizes=[(size, size)])
-        assert mock_print.call_count == 4
+        assert [record.getMessage() for record in caplog.records if record.levelname == 'INFO'] == [f"変換完了: {png_path} -> {ico_path}"]
 
     @patch('service.convert_png_to_ico.Image.open')
     def test_convert_png_to_ico_default_size(self, mock_image_open):
@@ -39,7 +41,7 @@ class TestConvertPngToIco:
 
         convert_png_to_ico("test.png", "test.ico")
 
-        mock_image.resize.assert_called_once_with((128, 128), Image.Resampling.LANCZOS)
+        mock_image.resize.assert_called_once_with((128, 128), Image.Resampling.LANCZOS, reducing_gap=DEFAULT_REDUCING_GAP)
 
     @patch('service.convert_png_to_ico.Image.open')
     def test_convert_png_to_ico_custom_size(self, mock_image_open):
@@ -52,7 +54,7 @@ class TestConvertPngToIco:
         custom_size = 256
         convert_png_to_ico("test.png", "test.ico", custom_size)
 
-        mock_image.resize.assert_called_once_with((custom_size, custom_size), Image.Resampling.LANCZOS)
+        mock_image.resize.assert_called_once_with((custom_size, custom_size), Image.Resampling.LANCZOS, reducing_gap=DEFAULT_REDUCING_GAP)
 
     @patch('service.convert_png_to_ico.Image.open')
     def test_convert_png_to_ico_file_not_found(self, mock_image_open):
@@ -92,7 +94,7 @@ class TestConvertPngToIco:
 
         convert_png_to_ico("test.png", "test.ico", 0)
 
-        mock_image.resize.assert_called_once_with((0, 0), Image.Resampling.LANCZOS)
+        mock_image.resize.assert_called_once_with((0, 0), Image.Resampling.LANCZOS, reducing_gap=DEFAULT_REDUCING_GAP)
 
     @patch('service.convert_png_to_ico.Image.open')
     def test_convert_png_to_ico_negative_size(self, mock_image_open):
@@ -104,7 +106,7 @@ class TestConvertPngToIco:
 
         convert_png_to_ico("test.png", "test.ico", -100)
 
-        mock_image.resize.assert_called_once_with((-100, -100), Image.Resampling.LANCZOS)
+        mock_image.resize.assert_called_once_with((-100, -100), Image.Resampling.LANCZOS, reducing_gap=DEFAULT_REDUCING_GAP)
 
     @patch('service.convert_png_to_ico.Image.open')
     def test_convert_png_to_ico_large_size(self, mock_image_open):
@@ -117,7 +119,7 @@ class TestConvertPngToIco:
         large_size = 1024
         convert_png_to_ico("test.png", "test.ico", large_size)
 
-        mock_image.resize.assert_called_once_with((large_size, large_size), Image.Resampling.LANCZOS)
+        mock_image.resize.assert_called_once_with((large_size, large_size), Image.Resampling.LANCZOS, reducing_gap=DEFAULT_REDUCING_GAP)
 
     @patch('service.convert_png_to_ico.Image.open')
     def test_convert_png_to_ico_uses_lanczos_resampling(self, mock_image_open):
@@ -134,3 +136,40 @@ class TestConvertPngToIco:
         # 2番目の引数としてLANCZOSが渡されていることを確認
         assert len(call_args[0]) >= 2
         assert call_args[0][1] == Image.Resampling.LANCZOS
+
+
+class TestConvertPngToMultiSizeIco:
+    """マルチサイズICO変換のテストクラス"""
+
+    def test_convert_png_to_ico_multi_size(self, tmp_path):
+        """正常系: 指定した全サイズが1つのICOに格納される"""
+        png_path = tmp_path / "test.png"
+        ico_path = tmp_path / "test.ico"
+        Image.new('RGBA', (512, 512), (255, 0, 0, 255)).save(png_path)
+
+        convert_png_to_ico(str(png_path), str(ico_path), sizes=[16, 32, 48, 256])
+
+        with Image.open(ico_path) as ico:
+            assert ico.info['sizes'] == {(16, 16), (32, 32), (48, 48), (256, 256)}
+
+    def test_convert_png_to_ico_mipmap(self, tmp_path):
+        """正常系: ミップマップから作成した全サイズが1つのICOに格納される"""
+        png_path = tmp_path / "test.png"
+        ico_path = tmp_path / "test.ico"
+        Image.new('RGBA', (1024, 1024), (0, 128, 255, 255)).save(png_path)
+
+        with patch('service.convert_png_to_ico.resize_mipmap', wraps=resize_mipmap) as mock_mipmap:
+            convert_png_to_ico(str(png_path), str(ico_path), sizes=[16, 24, 32, 256], mipmap=True)
+
+        mock_mipmap.assert_called_once()
+        with Image.open(ico_path) as ico:
+            assert ico.info['sizes'] == {(16, 16), (24, 24), (32, 32), (256, 256)}
+
+    def test_normalize_ico_sizes_sorts_and_filters(self):
+        """正常系: 重複とICOで扱えないサイズを除外して降順に並べる"""
+        assert normalize_ico_sizes([32, 16, 512, 32, 0]) == [32, 16]
+
+    def test_normalize_ico_sizes_no_valid_size(self):
+        """異常系: 有効なサイズがない場合はValueError"""
+        with pytest.raises(ValueError):
+            normalize_ico_sizes([512, -1])
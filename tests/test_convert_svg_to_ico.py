@@ -0,0 +1,113 @@
+import io
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from service.conversion_cache import ConversionCache
+from service.convert_svg_to_ico import convert_svg_to_ico
+from service.convert_svg_to_png import convert_svg_to_png
+
+
+def _make_png_bytes(size):
+    """テスト用のPNGバイト列を生成"""
+    buffer = io.BytesIO()
+    Image.new('RGBA', (size, size), (255, 0, 0, 255)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _make_image(size):
+    """cairoから受け取る画像と同じ乗算済みモード（RGBa）のテスト用画像を生成"""
+    return Image.new('RGBA', (size, size), (255, 0, 0, 128)).convert('RGBa')
+
+
+@pytest.fixture
+def svg_path(tmp_path):
+    """テスト用のSVGファイル"""
+    path = tmp_path / "test.svg"
+    path.write_bytes(b"<svg/>")
+    return path
+
+
+class TestConvertSvgToIco:
+    """SVG to ICO変換処理のテストクラス"""
+
+    @patch('service.convert_svg_to_ico.render_png')
+    @patch('service.convert_svg_to_ico.render_image')
+    def test_convert_svg_to_ico_success(self, mock_render_image, mock_render_png, svg_path, tmp_path):
+        """正常系: 中間ファイル・PNGデータを経由せずにSVGからICOへ変換される"""
+        mock_render_image.return_value = _make_image(128)
+        ico_path = tmp_path / "test.ico"
+
+        convert_svg_to_ico(str(svg_path), str(ico_path), 128, 64)
+
+        mock_render_image.assert_called_once_with(b"<svg/>", str(svg_path), 128)
+        mock_render_png.assert_not_called()
+        with Image.open(ico_path) as ico:
+            assert ico.size == (64, 64)
+            # 乗算済みの色は透明度を戻してから保存される
+            assert ico.convert('RGBA').getpixel((32, 32)) == (255, 0, 0, 128)
+        assert not (tmp_path / "test.png").exists()
+
+    @patch('service.convert_svg_to_ico.render_png')
+    def test_convert_svg_to_ico_keeps_png(self, mock_render_png, svg_path, tmp_path):
+        """正常系: png_path指定時は中間PNGを保存する"""
+        png_data = _make_png_bytes(128)
+        mock_render_png.return_value = png_data
+        ico_path = tmp_path / "test.ico"
+        png_path = tmp_path / "test.png"
+
+        convert_svg_to_ico(str(svg_path), str(ico_path), 128, 128, str(png_path))
+
+        assert png_path.read_bytes() == png_data
+        assert ico_path.exists()
+
+    @patch('service.convert_svg_to_ico.render_image')
+    def test_convert_svg_to_ico_file_not_found(self, mock_render_image, tmp_path):
+        """異常系: 入力ファイルが見つからない場合はFileNotFoundErrorが発生"""
+        with pytest.raises(FileNotFoundError):
+            convert_svg_to_ico(str(tmp_path / "nonexistent.svg"), str(tmp_path / "test.ico"))
+
+        mock_render_image.assert_not_called()
+        assert not (tmp_path / "test.ico").exists()
+
+    @patch('service.convert_svg_to_ico.render_image')
+    def test_convert_svg_to_ico_multi_size_renders_each_size(self, mock_render_image, svg_path, tmp_path):
+        """正常系: マルチサイズ指定時は各サイズをネイティブ解像度でラスタライズする"""
+        ico_path = tmp_path / "test.ico"
+        mock_render_image.side_effect = lambda svg_data, url, size: _make_image(size)
+
+        convert_svg_to_ico(str(svg_path), str(ico_path), sizes=[16, 32, 48])
+
+        rendered_sizes = sorted(call.args[2] for call in mock_render_image.call_args_list)
+        assert rendered_sizes == [16, 32, 48]
+        assert all(call.args[0] == b"<svg/>" for call in mock_render_image.call_args_list)
+        with Image.open(ico_path) as ico:
+            assert ico.info['sizes'] == {(16, 16), (32, 32), (48, 48)}
+
+    @patch('service.convert_svg_to_png.render_png')
+    def test_convert_svg_to_ico_cache_hit_skips_rendering(self, mock_render_png, svg_path, tmp_path):
+        """正常系: キャッシュヒット時はCairoSVGを呼び出さずに同じICOを出力する"""
+        mock_render_png.return_value = _make_png_bytes(128)
+        cache = ConversionCache(str(tmp_path / "cache"))
+
+        convert_svg_to_ico(str(svg_path), str(tmp_path / "first.ico"), cache=cache)
+        convert_svg_to_ico(str(svg_path), str(tmp_path / "second.ico"), cache=cache)
+
+        assert mock_render_png.call_count == 1
+        # 1回目はICOとラスタライズ結果の両方がミス、2回目はICOがヒット
+        assert (cache.hits, cache.misses) == (1, 2)
+        assert (tmp_path / "first.ico").read_bytes() == (tmp_path / "second.ico").read_bytes()
+
+    @patch('service.convert_svg_to_png.render_png')
+    def test_convert_svg_to_ico_reuses_svg_to_png_render(self, mock_render_png, svg_path, tmp_path):
+        """正常系: 同じSVG・サイズのSVG→PNG変換の結果をキャッシュから再利用する"""
+        mock_render_png.return_value = _make_png_bytes(128)
+        cache = ConversionCache(str(tmp_path / "cache"))
+
+        convert_svg_to_png(str(svg_path), str(tmp_path / "test.png"), 128, cache)
+        convert_svg_to_ico(str(svg_path), str(tmp_path / "test.ico"), icon_size=128, ico_size=64, cache=cache)
+
+        mock_render_png.assert_called_once_with(b"<svg/>", str(svg_path), 128)
+        with Image.open(tmp_path / "test.ico") as ico:
+            assert ico.size == (64, 64)
@@ -1,3 +1,4 @@
+import logging
 import os
 from unittest.mock import Mock, patch
 
@@ -42,20 +43,20 @@ class TestConvertSvgToPng:
         assert "Conversion error" in str(exc_info.value)
 
     @patch('service.convert_svg_to_png.cairosvg.svg2png')
-    @patch('builtins.print')
-    def test_convert_svg_to_png_prints_success_message(self, mock_print, mock_svg2png):
-        """正常系: 変換成功時にメッセージが出力される"""
+    def test_convert_svg_to_png_logs_success_message(self, mock_svg2png, caplog):
+        """正常系: 変換成功時にINFOログが出力される"""
+        caplog.set_level(logging.INFO)
         input_file = "test.svg"
         output_file = "test.png"
 
         convert_svg_to_png(input_file, output_file)
 
-        mock_print.assert_called_with(f"変換が完了しました: {output_file}")
+        assert caplog.records[-1].levelname == 'INFO'
+        assert caplog.records[-1].getMessage() == f"変換が完了しました: {output_file}"
 
     @patch('service.convert_svg_to_png.cairosvg.svg2png')
-    @patch('builtins.print')
-    def test_convert_svg_to_png_prints_file_not_found_error(self, mock_print, mock_svg2png):
-        """異常系: FileNotFoundError時にエラーメッセージが出力される"""
+    def test_convert_svg_to_png_logs_file_not_found_error(self, mock_svg2png, caplog):
+        """異常系: FileNotFoundError時にエラーログが出力される"""
         mock_svg2png.side_effect = FileNotFoundError("File not found")
         input_file = "nonexistent.svg"
         output_file = "test.png"
@@ -63,12 +64,12 @@ class TestConvertSvgToPng:
         with pytest.raises(FileNotFoundError):
             convert_svg_to_png(input_file, output_file)
 
-        mock_print.assert_called_with(f"エラー: 入力ファイルが見つかりません: {input_file}")
+        assert caplog.records[-1].levelname == 'ERROR'
+        assert caplog.records[-1].getMessage() == f"入力ファイルが見つかりません: {input_file}"
 
     @patch('service.convert_svg_to_png.cairosvg.svg2png')
-    @patch('builtins.print')
-    def test_convert_svg_to_png_prints_generic_error(self, mock_print, mock_svg2png):
-        """異常系: 一般的なエラー時にエラーメッセージが出力される"""
+    def test_convert_svg_to_png_logs_generic_error(self, mock_svg2png, caplog):
+        """異常系: 一般的なエラー時にエラーログが出力される"""
         error_msg = "Conversion error"
         mock_svg2png.side_effect = Exception(error_msg)
         input_file = "test.svg"
@@ -77,7 +78,17 @@ class TestConvertSvgToPng:
         with pytest.raises(Exception):
             convert_svg_to_png(input_file, output_file)
 
-        mock_print.assert_called_with(f"エラーが発生しました: {error_msg}")
+        assert caplog.records[-1].levelname == 'ERROR'
+        assert caplog.records[-1].getMessage() == f"エラーが発生しました: {error_msg}"
+
+    @patch('service.convert_svg_to_png.cairosvg.svg2png')
+    def test_convert_svg_to_png_debug_messages_not_formatted_when_disabled(self, mock_svg2png, caplog):
+        """正常系: DEBUGが無効な場合はファイルごとの詳細メッセージを出力しない"""
+        caplog.set_level(logging.WARNING)
+
+        convert_svg_to_png("test.svg", "test.png", 64)
+
+        assert caplog.records == []
 
     @patch('service.convert_svg_to_png.cairosvg.svg2png')
     def test_convert_svg_to_png_with_none_input(self, mock_svg2png):
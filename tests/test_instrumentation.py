@@ -0,0 +1,118 @@
+import json
+import os
+
+from PIL import Image
+
+from service.batch_convert import batch_convert
+from service.convert_png_to_ico import convert_png_to_ico
+from service.instrumentation import (
+    CountersRegistry,
+    JsonLinesSink,
+    StageTiming,
+    add_sink,
+    collect_timings,
+    profile_if_slow,
+    remove_sink,
+    stage,
+)
+
+
+class TestInstrumentation:
+    """instrumentationモジュールのテストクラス"""
+
+    def test_stage_emits_to_sinks(self):
+        """正常系: 計測結果が登録済みの出力先へ送られる"""
+        received = []
+        add_sink(received.append)
+        try:
+            with stage('resize', 'a.png', bytes_in=10, size=32) as timing:
+                timing.bytes_out = 20
+        finally:
+            remove_sink(received.append)
+
+        assert len(received) == 1
+        assert (received[0].stage, received[0].source, received[0].bytes_in, received[0].bytes_out, received[0].size) == ('resize', 'a.png', 10, 20, 32)
+        assert received[0].elapsed >= 0
+
+    def test_collect_timings_does_not_emit(self):
+        """正常系: collect_timings()内の計測は出力先へ送らずに記録される"""
+        received = []
+        add_sink(received.append)
+        try:
+            with collect_timings() as collected:
+                with stage('svg_render'):
+                    pass
+        finally:
+            remove_sink(received.append)
+
+        assert [timing.stage for timing in collected] == ['svg_render']
+        assert received == []
+
+    def test_counters_registry(self):
+        """正常系: 段階ごとに件数・所要時間・バイト数を集計する"""
+        counters = CountersRegistry()
+        counters(StageTiming('resize', 0.5, bytes_out=100))
+        counters(StageTiming('resize', 1.5, bytes_out=50))
+
+        counter = counters.counters['resize']
+        assert (counter.count, counter.total_elapsed, counter.max_elapsed, counter.bytes_out) == (2, 2.0, 1.5, 150)
+        assert counter.mean_elapsed == 1.0
+        assert "resize: 2回" in counters.format_summary()
+
+    def test_json_lines_sink(self, tmp_path):
+        """正常系: 1件ごとに1行のJSONとして追記する"""
+        path = tmp_path / "timings.jsonl"
+        sink = JsonLinesSink(str(path))
+        sink(StageTiming('ico_encode', 0.1, source='a.png'))
+        sink(StageTiming('write', 0.2))
+
+        lines = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+        assert [line['stage'] for line in lines] == ['ico_encode', 'write']
+        assert lines[0]['source'] == 'a.png'
+
+    def test_profile_if_slow(self, tmp_path):
+        """正常系: 閾値以上かかった場合のみプロファイルを保存する"""
+        with profile_if_slow('slow.svg', str(tmp_path), threshold=0) as capture:
+            sum(range(1000))
+        with profile_if_slow('fast.svg', str(tmp_path), threshold=60) as fast_capture:
+            pass
+
+        assert capture.path == os.path.join(str(tmp_path), 'slow.svg.prof')
+        assert capture.path is not None and os.path.exists(capture.path)
+        assert fast_capture.path is None
+
+    def test_profile_if_slow_disabled(self):
+        """正常系: 出力先を指定しない場合は計測しない"""
+        with profile_if_slow('a.svg', None, threshold=0) as capture:
+            pass
+
+        assert capture.path is None
+
+    def test_png_to_ico_stages(self, tmp_path):
+        """正常系: PNG→ICO変換でデコード・リサイズ・エンコードが計測される"""
+        png_path = tmp_path / "icon.png"
+        Image.new('RGBA', (64, 64), (255, 0, 0, 255)).save(png_path)
+
+        with collect_timings() as collected:
+            convert_png_to_ico(str(png_path), str(tmp_path / "icon.ico"), sizes=[16, 32])
+
+        assert [timing.stage for timing in collected] == ['png_decode', 'resize', 'resize', 'ico_encode']
+        assert all(timing.source == str(png_path) for timing in collected)
+
+    def test_batch_convert_emits_worker_timings(self, tmp_path):
+        """正常系: 一括変換の計測結果が結果に格納され、呼び出し元の出力先へ送られる"""
+        Image.new('RGBA', (64, 64), (255, 0, 0, 255)).save(tmp_path / "icon.png")
+        counters = CountersRegistry()
+        add_sink(counters)
+        try:
+            report = batch_convert(
+                str(tmp_path), str(tmp_path / "out"), mode='png_to_ico', max_workers=1,
+                profile_dir=str(tmp_path / "profiles"), profile_threshold=0
+            )
+        finally:
+            remove_sink(counters)
+
+        result = report.results[0]
+        assert {timing.stage for timing in result.stages} == {'png_decode', 'resize', 'ico_encode'}
+        assert counters.counters['resize'].count == 1
+        assert result.profile_path == os.path.join(str(tmp_path / "profiles"), "icon.png.prof")
@@ -0,0 +1,147 @@
+import json
+import os
+
+import pytest
+from PIL import Image
+
+from service.job_manifest import (
+    JobDefaults,
+    build_result_manifest,
+    load_job_manifest,
+    run_job_manifest,
+    write_result_manifest,
+)
+
+
+@pytest.fixture
+def project(tmp_path):
+    """PNG・SVGを含むマニフェスト用のプロジェクトディレクトリ"""
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    Image.new('RGBA', (256, 256), (255, 0, 0, 255)).save(source_dir / "app.png")
+    Image.new('RGBA', (128, 128), (0, 0, 255, 255)).save(source_dir / "tray.png")
+    (source_dir / "logo.svg").write_text("<svg/>")
+    return tmp_path
+
+
+def write_toml(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+class TestLoadJobManifest:
+    """load_job_manifestのテストクラス"""
+
+    def test_load_toml(self, project):
+        """正常系: TOMLのジョブを出力ファイルごとに展開する（省略した項目は既定値）"""
+        path = write_toml(project / "icons.toml", """
+[defaults]
+output_path = "dist"
+ico_sizes = [16, 32, 256]
+
+[[jobs]]
+source = "src/*.png"
+format = "ico"
+
+[[jobs]]
+source = "src/logo.svg"
+format = "png"
+sizes = [32, 64]
+output_dir = "png"
+""")
+
+        manifest = load_job_manifest(path, JobDefaults(icon_size=256, ico_size=64))
+
+        outputs = [os.path.relpath(job.output, project) for job in manifest.jobs]
+        assert outputs == [
+            os.path.join("dist", "app.ico"), os.path.join("dist", "tray.ico"),
+            os.path.join("dist", "png", "logo_32.png"), os.path.join("dist", "png", "logo_64.png"),
+        ]
+        assert [job.mode for job in manifest.jobs] == ['png_to_ico', 'png_to_ico', 'svg_to_png', 'svg_to_png']
+        assert manifest.jobs[0].ico_sizes == (16, 32, 256)
+        assert [job.icon_size for job in manifest.jobs[2:]] == [32, 64]
+
+    def test_load_json_uses_defaults(self, project):
+        """正常系: JSONのマニフェストで省略した項目に既定値（config.iniの[Paths]・[Icon]）を使う"""
+        path = project / "icons.json"
+        path.write_text(json.dumps({'jobs': [
+            {'source': "src/logo.svg", 'format': "ico", 'output': "logo.ico"},
+            {'source': "src/app.png", 'format': "ico", 'ico_size': 48},
+            {'source': "src/logo.svg", 'format': "png", 'icon_size': 24, 'output': "logo_24.png"},
+        ]}), encoding='utf-8')
+
+        manifest = load_job_manifest(str(path), JobDefaults(str(project / "out"), 512, 128, (16, 48)))
+
+        logo, app, png = manifest.jobs
+        assert logo.output == os.path.join(str(project / "out"), "logo.ico")
+        assert (logo.mode, logo.icon_size, logo.ico_sizes) == ('svg_to_ico', 512, (16, 48))
+        assert (app.ico_size, app.ico_sizes) == (48, None)
+        assert png.icon_size == 24
+
+    @pytest.mark.parametrize("jobs, message", [
+        ([], "jobs"),
+        ([{'format': "ico"}], "source"),
+        ([{'source': "src/app.png", 'format': "png"}], "変換できません"),
+        ([{'source': "src/*.png", 'format': "ico", 'output': "a.ico"}], "output"),
+        ([{'source': "src/app.png"}, {'source': "src/app.png"}], "重複"),
+        ([{'source': "src/logo.svg", 'format': "png", 'sizes': [16, 32], 'output': "logo.png"}], "{size}"),
+        ([{'source': "src/logo.svg", 'format': "png", 'sizes': "16"}], "sizes"),
+        ([{'source': "src/logo.svg", 'format': "png", 'size': 32}], "不明な項目"),
+        ([{'source': "src/logo.svg", 'format': "png", 'icon_size': "large"}], r"jobs\[0\]\.icon_size"),
+        ([{'source': "src/app.png", 'format': "ico", 'ico_size': 0}], r"jobs\[0\]\.ico_size"),
+        (["src/app.png"], "テーブル"),
+    ])
+    def test_invalid_manifest(self, project, jobs, message):
+        """異常系: 不正なマニフェストはValueError"""
+        path = project / "icons.json"
+        path.write_text(json.dumps({'defaults': {'output_path': "out"}, 'jobs': jobs}), encoding='utf-8')
+
+        with pytest.raises(ValueError, match=message):
+            load_job_manifest(str(path))
+
+    def test_missing_source(self, project):
+        """異常系: sourceに一致するファイルがない場合はFileNotFoundError"""
+        path = write_toml(project / "icons.toml", '[defaults]\noutput_path = "out"\n[[jobs]]\nsource = "src/none.svg"\n')
+
+        with pytest.raises(FileNotFoundError):
+            load_job_manifest(path)
+
+    def test_unsupported_extension(self, project):
+        """異常系: TOML・JSON以外のマニフェストはValueError"""
+        with pytest.raises(ValueError):
+            load_job_manifest(str(project / "icons.yaml"))
+
+
+class TestRunJobManifest:
+    """run_job_manifestのテストクラス"""
+
+    def test_run_and_write_result(self, project):
+        """正常系: 全ジョブを実行し、出力パス・ハッシュ・所要時間・エラーを結果マニフェストに記録する"""
+        (project / "src" / "broken.png").write_bytes(b"not png")
+        path = write_toml(project / "icons.toml", """
+[defaults]
+output_path = "dist"
+
+[[jobs]]
+source = "src/app.png"
+format = "ico"
+sizes = [16, 32]
+
+[[jobs]]
+source = "src/broken.png"
+format = "ico"
+""")
+        manifest = load_job_manifest(path)
+
+        report = run_job_manifest(manifest, max_workers=1)
+        result = build_result_manifest(manifest, report)
+        write_result_manifest(str(project / "result.json"), result)
+
+        assert (result['succeeded'], result['failed']) == (1, 1)
+        ok, error = result['jobs']
+        assert ok['status'] == 'ok' and len(ok['sha256']) == 64 and ok['bytes'] > 0
+        assert ok['sizes'] == [16, 32] and 'resize' in ok['stages_ms']
+        assert error['status'] == 'error' and error['error'] and 'sha256' not in error
+        with Image.open(project / "dist" / "app.ico") as ico:
+            assert ico.info['sizes'] == {(16, 16), (32, 32)}
+        assert json.loads((project / "result.json").read_text(encoding='utf-8')) == result
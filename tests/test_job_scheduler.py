@@ -0,0 +1,170 @@
+import io
+import os
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from service.conversion_cache import ConversionCache
+from service.job_scheduler import JobGraph, add_conversion
+
+
+def fake_render_png(svg_data, url=None, size=64):
+    """CairoSVGの代わりに指定サイズの画像を返すテスト用関数"""
+    buffer = io.BytesIO()
+    Image.new('RGBA', (size, size), (255, 0, 0, 255)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def constant_node(inputs, cache, value):
+    return value
+
+
+def sum_node(inputs, cache):
+    return sum(inputs)
+
+
+def failing_node(inputs, cache):
+    raise RuntimeError("失敗")
+
+
+def bytes_node(inputs, cache, length):
+    return bytes(length)
+
+
+def describe_node(inputs, cache):
+    return type(inputs[0]).__name__, len(inputs[0])
+
+
+@pytest.fixture
+def mock_render():
+    with patch('service.convert_svg_to_png.render_png', side_effect=fake_render_png) as mock:
+        yield mock
+
+
+@pytest.fixture
+def svg_file(tmp_path):
+    path = tmp_path / "logo.svg"
+    path.write_text("<svg/>")
+    return str(path)
+
+
+class TestJobGraph:
+    """JobGraphクラスのテストクラス"""
+
+    def test_shares_same_key(self):
+        """正常系: 同じキーの工程は1回だけ実行し、結果を全ての利用先に渡す"""
+        graph = JobGraph()
+        graph.add(('a',), constant_node, (2,))
+        graph.add(('a',), constant_node, (2,))
+        graph.add(('b',), constant_node, (3,))
+        graph.add(('sum',), sum_node, (), (('a',), ('b',)))
+
+        results = graph.run(max_workers=1)
+
+        assert graph.shared_count == 1
+        assert results[('sum',)].value == 5
+        assert results[('a',)].value is None  # 利用先の完了後に中間結果を解放
+
+    def test_dependency_failure(self):
+        """異常系: 依存する工程が失敗した場合は実行せずに失敗とする"""
+        graph = JobGraph()
+        graph.add(('a',), failing_node)
+        graph.add(('sum',), sum_node, (), (('a',),))
+
+        results = graph.run(max_workers=1)
+
+        assert "RuntimeError: 失敗" in str(results[('a',)].error)
+        assert "依存する工程が失敗しました" in str(results[('sum',)].error)
+
+    def test_missing_dependency(self):
+        """異常系: 追加されていない工程には依存できない"""
+        with pytest.raises(ValueError, match="依存する工程が追加されていません"):
+            JobGraph().add(('sum',), sum_node, (), (('a',),))
+
+    def test_process_pool_matches_inline(self):
+        """正常系: プロセスプール（メモリ予算による待機を含む）でも同一プロセスでの実行と同じ結果になる"""
+        def build():
+            graph = JobGraph()
+            for value in range(4):
+                graph.add(('value', value), constant_node, (value,))
+            graph.add(('sum',), sum_node, (), tuple(('value', value) for value in range(4)))
+            return graph
+
+        inline = build().run(max_workers=1)
+        pooled = build().run(max_workers=2)
+        budgeted = build().run(max_workers=2, memory_budget=1)
+
+        assert inline[('sum',)].value == pooled[('sum',)].value == budgeted[('sum',)].value == 6
+
+
+class TestAddConversion:
+    """add_conversion関数のテストクラス"""
+
+    def test_shares_render_between_png_and_ico(self, tmp_path, svg_file, mock_render):
+        """正常系: 同じSVG・サイズのPNG出力とICOのフレームでラスタライズを共有する"""
+        graph = JobGraph()
+        png_output = str(tmp_path / "logo_32.png")
+        ico_output = str(tmp_path / "logo.ico")
+        png_key = add_conversion(graph, 'svg_to_png', svg_file, png_output, 32, 32)
+        ico_key = add_conversion(graph, 'svg_to_ico', svg_file, ico_output, 128, 128, [16, 32])
+
+        results = graph.run(max_workers=1)
+
+        assert mock_render.call_count == 2  # 16と32のみ（32はPNG出力と共有）
+        assert graph.shared_count == 1
+        assert results[png_key].succeeded and results[ico_key].succeeded
+        with Image.open(png_output) as image:
+            assert image.size == (32, 32)
+        with Image.open(ico_output) as ico:
+            assert ico.info['sizes'] == {(16, 16), (32, 32)}
+
+    def test_collect_includes_shared_stages(self, tmp_path, svg_file, mock_render):
+        """正常系: 1ファイル分の結果には依存する工程の計測結果を含める"""
+        graph = JobGraph()
+        output = str(tmp_path / "logo.ico")
+        key = add_conversion(graph, 'svg_to_ico', svg_file, output, 64, 32)
+
+        result = graph.collect(key, graph.run(max_workers=1), svg_file, output)
+
+        assert result.succeeded and result.output_path == output
+        assert {'resize', 'ico_encode', 'write'} <= {timing.stage for timing in result.stages}
+        with Image.open(output) as ico:
+            assert ico.info['sizes'] == {(32, 32)}
+
+    def test_uses_cache(self, tmp_path, svg_file, mock_render):
+        """正常系: キャッシュ指定時は2回目のラスタライズをキャッシュから取得する"""
+        cache = ConversionCache(str(tmp_path / "cache"))
+        for name in ("first.png", "second.png"):
+            graph = JobGraph()
+            key = add_conversion(graph, 'svg_to_png', svg_file, str(tmp_path / name), 32, 32)
+            result = graph.collect(key, graph.run(cache, max_workers=1), svg_file, str(tmp_path / name))
+
+        assert mock_render.call_count == 1
+        assert result.cache_hit
+        assert os.path.isfile(tmp_path / "second.png")
+
+    def test_invalid_ico_sizes(self, tmp_path, svg_file, mock_render):
+        """異常系: ICOのサイズが不正な場合は出力工程の失敗として返す"""
+        graph = JobGraph()
+        key = add_conversion(graph, 'svg_to_ico', svg_file, str(tmp_path / "logo.ico"), 128, 128, [1024])
+
+        results = graph.run(max_workers=1)
+
+        assert not results[key].succeeded
+        mock_render.assert_not_called()
+
+    def test_shared_memory_transport(self):
+        """正常系: 大きな出力は共有メモリで受け渡し、利用先にはコピーせずにビューとして渡す"""
+        graph = JobGraph()
+        graph.add(('data',), bytes_node, (200_000,), output_bytes=200_000)
+        graph.add(('kept',), bytes_node, (100_000,), output_bytes=100_000)
+        graph.add(('check',), describe_node, (), (('data',),))
+
+        results = graph.run(max_workers=2, keep={('kept',)})
+
+        assert results[('check',)].value == ('memoryview', 200_000)
+        assert results[('data',)].value is None  # 利用先の完了後にスラブを返却
+        assert bytes(results[('kept',)].value) == bytes(100_000)  # 保持する値は共有メモリのビュー
+        graph.release_shared()
+        assert not graph._leases
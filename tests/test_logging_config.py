@@ -0,0 +1,69 @@
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from utils.logging_config import parse_level, setup_logging, stop_worker_logging, worker_initializer
+
+
+def _log_in_worker(message):
+    """ワーカープロセス内でログを出力（pickle可能なようにモジュールレベルで定義）"""
+    logging.getLogger('service.test_worker').info(message)
+    logging.getLogger('service.test_worker').debug("出力されないメッセージ")
+    return True
+
+
+@pytest.fixture
+def restore_root_logger():
+    """テスト後にルートロガーのハンドラとレベルを元に戻す"""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+class TestLoggingConfig:
+    """logging_configモジュールのテストクラス"""
+
+    def test_parse_level(self):
+        """正常系: レベル名を数値に変換し、不明な場合はINFOとする"""
+        assert parse_level('debug') == logging.DEBUG
+        assert parse_level(' WARNING ') == logging.WARNING
+        assert parse_level(None) == logging.INFO
+        assert parse_level('unknown') == logging.INFO
+
+    def test_setup_logging(self, restore_root_logger):
+        """正常系: 指定したレベル以上のメッセージのみ出力される"""
+        stream = io.StringIO()
+        setup_logging('INFO', stream=stream)
+
+        logging.getLogger('service.test').debug("詳細")
+        logging.getLogger('service.test').info("変換完了")
+
+        assert "変換完了" in stream.getvalue()
+        assert "詳細" not in stream.getvalue()
+
+    def test_setup_logging_quiet(self, restore_root_logger):
+        """正常系: quietモードでは警告以上のみ出力される"""
+        stream = io.StringIO()
+        setup_logging('DEBUG', quiet=True, stream=stream)
+
+        logging.getLogger('service.test').info("変換完了")
+        logging.getLogger('service.test').warning("警告")
+
+        assert stream.getvalue().count("\n") == 1
+        assert "警告" in stream.getvalue()
+
+    def test_worker_logs_are_forwarded(self, caplog):
+        """正常系: ワーカープロセスのログがキュー経由で親プロセスへ転送される"""
+        caplog.set_level(logging.INFO)
+
+        with ProcessPoolExecutor(max_workers=1, **worker_initializer()) as executor:
+            assert executor.submit(_log_in_worker, "ワーカーからのメッセージ").result()
+        stop_worker_logging()
+
+        messages = [(record.name, record.getMessage()) for record in caplog.records]
+        assert ('service.test_worker', "ワーカーからのメッセージ") in messages
+        assert all(message != "出力されないメッセージ" for _, message in messages)
@@ -1,10 +1,14 @@
+import configparser
 import os
 import tkinter as tk
+from dataclasses import replace
 from unittest.mock import Mock, call, patch
 
 import pytest
 
-from app.main_window import IconFlowMainWindow
+from app.main_window import CONFIG_CHECK_INTERVAL_MS, POLL_INTERVAL_MS, IconFlowMainWindow
+from service.batch_convert import BatchResult, convert_file
+from utils.config_manager import AppSettings
 
 
 class TestIconFlowMainWindow:
@@ -17,27 +21,38 @@ class TestIconFlowMainWindow:
         root.tk = Mock()  # tkinter widgets need this attribute
         return root
 
+    @pytest.fixture(autouse=True)
+    def mock_worker(self):
+        """バックグラウンド変換とプログレス表示ウィジェットのモック"""
+        with patch('app.main_window.ttk.Progressbar'), patch('app.main_window.tk.Label'), \
+                patch('app.main_window.ConversionWorker') as mock_worker_class:
+            worker = mock_worker_class.return_value
+            worker.is_busy = False
+            worker.total = 0
+            worker.completed = 0
+            worker.cancelled = 0
+            worker.throughput = 0.0
+            yield worker
+
     @pytest.fixture
-    def mock_config(self):
-        """テスト用の設定モック"""
-        config = Mock()
-        config.getint.side_effect = lambda section, key: {
-            ('Appearance', 'window_width'): 250,
-            ('Appearance', 'window_height'): 300,
-            ('Appearance', 'font_size'): 11,
-            ('Icon', 'icon_size'): 128,
-        }.get((section, key), 0)
-        config.get.side_effect = lambda section, key: {
-            ('Paths', 'downloads_path'): r'C:\Users\test\Downloads',
-            ('Paths', 'output_path'): r'C:\Users\test\output',
-        }.get((section, key), '')
-        return config
-
-    @patch('app.main_window.tk.Button')
-    @patch('app.main_window.load_config')
-    def test_init_window_configuration(self, mock_load_config, mock_button, mock_root, mock_config):
+    def settings(self):
+        """テスト用の設定"""
+        return AppSettings(
+            font_size=11,
+            window_width=250,
+            window_height=300,
+            downloads_path=r'C:\Users\test\Downloads',
+            output_path=r'C:\Users\test\output',
+            icon_size=128,
+            ico_size=0,
+            ico_sizes=(16, 32, 48),
+        )
+
+    @patch('app.main_window.tk.Button')
+    @patch('app.main_window.get_settings')
+    def test_init_window_configuration(self, mock_get_settings, mock_button, mock_root, settings):
         """正常系: ウィンドウの初期化が正しく行われる"""
-        mock_load_config.return_value = mock_config
+        mock_get_settings.return_value = settings
 
         window = IconFlowMainWindow(mock_root)
 
@@ -46,29 +61,31 @@ class TestIconFlowMainWindow:
         mock_root.geometry.assert_called_once_with("250x300")
         mock_root.resizable.assert_called_once_with(False, False)
 
-    @patch('app.main_window.load_config')
+    @patch('app.main_window.get_settings')
     @patch('app.main_window.tk.Button')
-    def test_init_creates_all_buttons(self, mock_button, mock_load_config, mock_root, mock_config):
+    def test_init_creates_all_buttons(self, mock_button, mock_get_settings, mock_root, settings):
         """正常系: 全てのボタンが作成される"""
-        mock_load_config.return_value = mock_config
+        mock_get_settings.return_value = settings
 
         window = IconFlowMainWindow(mock_root)
 
-        # 5つのボタンが作成されることを確認
-        assert mock_button.call_count == 5
+        # 7つのボタンが作成されることを確認
+        assert mock_button.call_count == 7
 
         # ボタンのテキストを確認
         button_texts = [call_args[1]['text'] for call_args in mock_button.call_args_list]
         assert "SVGからPNGへ" in button_texts
         assert "PNGからicoへ" in button_texts
         assert "SVGからicoへ" in button_texts
+        assert "フォルダ一括ico変換" in button_texts
         assert "設定ファイル" in button_texts
+        assert "キャンセル" in button_texts
         assert "閉じる" in button_texts
 
     @patch('app.main_window.tk.Button')
     def test_select_file_returns_selected_file(self, mock_button, mock_root):
         """正常系: ファイル選択ダイアログが正しいパスを返す"""
-        with patch('app.main_window.load_config'):
+        with patch('app.main_window.get_settings'):
             window = IconFlowMainWindow(mock_root)
 
             with patch('app.main_window.filedialog.askopenfilename', return_value='C:\\test\\file.svg'):
@@ -79,7 +96,7 @@ class TestIconFlowMainWindow:
     @patch('app.main_window.tk.Button')
     def test_select_file_returns_empty_on_cancel(self, mock_button, mock_root):
         """正常系: ファイル選択をキャンセルすると空文字列を返す"""
-        with patch('app.main_window.load_config'):
+        with patch('app.main_window.get_settings'):
             window = IconFlowMainWindow(mock_root)
 
             with patch('app.main_window.filedialog.askopenfilename', return_value=''):
@@ -90,7 +107,7 @@ class TestIconFlowMainWindow:
     @patch('app.main_window.tk.Button')
     def test_get_base_name_removes_extension(self, mock_button, mock_root):
         """正常系: ファイルのベース名が正しく取得される"""
-        with patch('app.main_window.load_config'):
+        with patch('app.main_window.get_settings'):
             window = IconFlowMainWindow(mock_root)
 
             result = window._get_base_name('C:\\test\\file.svg')
@@ -102,7 +119,7 @@ class TestIconFlowMainWindow:
     @patch('app.main_window.tk.Button')
     def test_get_base_name_handles_no_extension(self, mock_button, mock_root):
         """正常系: 拡張子がないファイル名を処理する"""
-        with patch('app.main_window.load_config'):
+        with patch('app.main_window.get_settings'):
             window = IconFlowMainWindow(mock_root)
 
             result = window._get_base_name('C:\\test\\file')
@@ -114,7 +131,7 @@ class TestIconFlowMainWindow:
     def test_open_output_directory_opens_existing_directory(self, mock_exists, mock_startfile, mock_button, mock_root):
         """正常系: 既存のディレクトリを開く"""
         mock_exists.return_value = True
-        with patch('app.main_window.load_config'):
+        with patch('app.main_window.get_settings'):
             window = IconFlowMainWindow(mock_root)
 
             window._open_output_directory('C:\\test\\output')
@@ -128,7 +145,7 @@ class TestIconFlowMainWindow:
     def test_open_output_directory_does_not_open_nonexistent_directory(self, mock_exists, mock_startfile, mock_button, mock_root):
         """正常系: 存在しないディレクトリは開かない"""
         mock_exists.return_value = False
-        with patch('app.main_window.load_config'):
+        with patch('app.main_window.get_settings'):
             window = IconFlowMainWindow(mock_root)
 
             window._open_output_directory('C:\\test\\nonexistent')
@@ -140,7 +157,7 @@ class TestIconFlowMainWindow:
     @patch('app.main_window.messagebox.showerror')
     def test_handle_errors_catches_file_not_found(self, mock_showerror, mock_button, mock_root):
         """異常系: FileNotFoundErrorを捕捉する"""
-        with patch('app.main_window.load_config'):
+        with patch('app.main_window.get_settings'):
             window = IconFlowMainWindow(mock_root)
 
             def raise_file_not_found():
@@ -155,7 +172,7 @@ class TestIconFlowMainWindow:
     @patch('app.main_window.messagebox.showerror')
     def test_handle_errors_catches_generic_exception(self, mock_showerror, mock_button, mock_root):
         """異常系: 一般的な例外を捕捉する"""
-        with patch('app.main_window.load_config'):
+        with patch('app.main_window.get_settings'):
             window = IconFlowMainWindow(mock_root)
 
             def raise_generic_error():
@@ -169,7 +186,7 @@ class TestIconFlowMainWindow:
     @patch('app.main_window.tk.Button')
     def test_handle_errors_executes_successful_function(self, mock_button, mock_root):
         """正常系: エラーがない場合は関数が正常に実行される"""
-        with patch('app.main_window.load_config'):
+        with patch('app.main_window.get_settings'):
             window = IconFlowMainWindow(mock_root)
 
             executed = {'value': False}
@@ -182,129 +199,225 @@ class TestIconFlowMainWindow:
             assert executed['value'] is True
 
     @patch('app.main_window.tk.Button')
-    @patch('app.main_window.load_config')
-    @patch('app.main_window.convert_svg_to_png')
+    @patch('app.main_window.get_settings')
     @patch('app.main_window.filedialog.askopenfilename')
-    @patch('app.main_window.os.startfile')
-    @patch('app.main_window.os.path.exists')
     def test_process_svg_to_png_conversion_success(
-        self, mock_exists, mock_startfile, mock_file_dialog, mock_convert, mock_load_config, mock_button, mock_root, mock_config
+        self, mock_file_dialog, mock_get_settings, mock_button, mock_root, settings, mock_worker
     ):
-        """正常系: SVG→PNG変換処理が成功する"""
-        mock_load_config.return_value = mock_config
+        """正常系: SVG→PNG変換がバックグラウンドに投入される"""
+        mock_get_settings.return_value = settings
         mock_file_dialog.return_value = 'C:\\test\\input.svg'
-        mock_exists.return_value = True
 
         window = IconFlowMainWindow(mock_root)
         window._process_svg_to_png_conversion()
 
-        mock_convert.assert_called_once()
-        assert mock_convert.call_args[0][0] == 'C:\\test\\input.svg'
-        assert 'input.png' in mock_convert.call_args[0][1]
+        mock_worker.submit.assert_called_once()
+        args = mock_worker.submit.call_args[0]
+        assert args[0] is convert_file
+        assert args[1] == 'svg_to_png'
+        assert args[2] == 'C:\\test\\input.svg'
+        assert 'input.png' in args[3]
+        mock_root.after.assert_called_once_with(POLL_INTERVAL_MS, window._poll_worker)
 
     @patch('app.main_window.tk.Button')
-    @patch('app.main_window.load_config')
-    @patch('app.main_window.convert_svg_to_png')
+    @patch('app.main_window.get_settings')
     @patch('app.main_window.filedialog.askopenfilename')
     def test_process_svg_to_png_conversion_cancelled(
-        self, mock_file_dialog, mock_convert, mock_load_config, mock_button, mock_root, mock_config
+        self, mock_file_dialog, mock_get_settings, mock_button, mock_root, settings, mock_worker
     ):
         """正常系: ファイル選択をキャンセルした場合は変換しない"""
-        mock_load_config.return_value = mock_config
+        mock_get_settings.return_value = settings
         mock_file_dialog.return_value = ''
 
         window = IconFlowMainWindow(mock_root)
         window._process_svg_to_png_conversion()
 
-        mock_convert.assert_not_called()
+        mock_worker.submit.assert_not_called()
 
     @patch('app.main_window.tk.Button')
-    @patch('app.main_window.load_config')
-    @patch('app.main_window.convert_png_to_ico')
+    @patch('app.main_window.get_settings')
     @patch('app.main_window.filedialog.askopenfilename')
-    @patch('app.main_window.os.startfile')
-    @patch('app.main_window.os.path.exists')
     def test_process_png_to_ico_conversion_success(
-        self, mock_exists, mock_startfile, mock_file_dialog, mock_convert, mock_load_config, mock_button, mock_root, mock_config
+        self, mock_file_dialog, mock_get_settings, mock_button, mock_root, settings, mock_worker
     ):
-        """正常系: PNG→ICO変換処理が成功する"""
-        mock_load_config.return_value = mock_config
+        """正常系: PNG→ICO変換がバックグラウンドに投入される"""
+        mock_get_settings.return_value = settings
         mock_file_dialog.return_value = 'C:\\test\\input.png'
-        mock_exists.return_value = True
 
         window = IconFlowMainWindow(mock_root)
         window._process_png_to_ico_conversion()
 
-        mock_convert.assert_called_once()
-        assert mock_convert.call_args[0][0] == 'C:\\test\\input.png'
-        assert 'input.ico' in mock_convert.call_args[0][1]
+        mock_worker.submit.assert_called_once()
+        args = mock_worker.submit.call_args[0]
+        assert args[1] == 'png_to_ico'
+        assert args[2] == 'C:\\test\\input.png'
+        assert 'input.ico' in args[3]
+        assert args[6] == [16, 32, 48]
 
     @patch('app.main_window.tk.Button')
-    @patch('app.main_window.load_config')
-    @patch('app.main_window.convert_png_to_ico')
+    @patch('app.main_window.get_settings')
     @patch('app.main_window.filedialog.askopenfilename')
     def test_process_png_to_ico_conversion_cancelled(
-        self, mock_file_dialog, mock_convert, mock_load_config, mock_button, mock_root, mock_config
+        self, mock_file_dialog, mock_get_settings, mock_button, mock_root, settings, mock_worker
     ):
         """正常系: ファイル選択をキャンセルした場合は変換しない"""
-        mock_load_config.return_value = mock_config
+        mock_get_settings.return_value = settings
         mock_file_dialog.return_value = ''
 
         window = IconFlowMainWindow(mock_root)
         window._process_png_to_ico_conversion()
 
-        mock_convert.assert_not_called()
+        mock_worker.submit.assert_not_called()
 
     @patch('app.main_window.tk.Button')
-    @patch('app.main_window.load_config')
-    @patch('app.main_window.convert_svg_to_png')
-    @patch('app.main_window.convert_png_to_ico')
+    @patch('app.main_window.get_settings')
     @patch('app.main_window.filedialog.askopenfilename')
-    @patch('app.main_window.os.startfile')
-    @patch('app.main_window.os.path.exists')
     def test_process_svg_to_ico_conversion_success(
-        self, mock_exists, mock_startfile, mock_file_dialog, mock_convert_ico,
-        mock_convert_png, mock_load_config, mock_button, mock_root, mock_config
+        self, mock_file_dialog, mock_get_settings, mock_button, mock_root, settings, mock_worker
     ):
-        """正常系: SVG→ICO変換処理が成功する"""
-        mock_load_config.return_value = mock_config
+        """正常系: SVG→ICO変換がバックグラウンドに投入される"""
+        mock_get_settings.return_value = settings
         mock_file_dialog.return_value = 'C:\\test\\input.svg'
-        mock_exists.return_value = True
 
         window = IconFlowMainWindow(mock_root)
         window._process_svg_to_ico_conversion()
 
-        mock_convert_png.assert_called_once()
-        mock_convert_ico.assert_called_once()
-        assert 'input.png' in mock_convert_png.call_args[0][1]
-        assert 'input.ico' in mock_convert_ico.call_args[0][1]
+        mock_worker.submit.assert_called_once()
+        args = mock_worker.submit.call_args[0]
+        assert args[1] == 'svg_to_ico'
+        assert args[2] == 'C:\\test\\input.svg'
+        assert 'input.ico' in args[3]
+        assert args[8] is None
 
     @patch('app.main_window.tk.Button')
-    @patch('app.main_window.load_config')
-    @patch('app.main_window.convert_svg_to_png')
-    @patch('app.main_window.convert_png_to_ico')
+    @patch('app.main_window.get_settings')
+    @patch('app.main_window.filedialog.askopenfilename')
+    def test_process_svg_to_ico_conversion_single_size(
+        self, mock_file_dialog, mock_get_settings, mock_button, mock_root, settings, mock_worker
+    ):
+        """正常系: ico_sizesが空の場合はマルチサイズを指定せず、icon_size・ico_sizeで変換する"""
+        mock_get_settings.return_value = replace(settings, ico_sizes=())
+        mock_file_dialog.return_value = 'C:\\test\\input.svg'
+
+        window = IconFlowMainWindow(mock_root)
+        window._process_svg_to_ico_conversion()
+
+        args = mock_worker.submit.call_args[0]
+        assert (args[4], args[6]) == (128, None)
+
+    @patch('app.main_window.tk.Button')
+    @patch('app.main_window.get_settings')
+    @patch('app.main_window.filedialog.askopenfilename')
+    def test_process_svg_to_ico_conversion_keeps_png(
+        self, mock_file_dialog, mock_get_settings, mock_button, mock_root, settings, mock_worker
+    ):
+        """正常系: keep_pngが有効な場合は中間PNGの出力パスを渡す"""
+        mock_get_settings.return_value = replace(settings, keep_png=True)
+        mock_file_dialog.return_value = 'C:\\test\\input.svg'
+
+        window = IconFlowMainWindow(mock_root)
+        window._process_svg_to_ico_conversion()
+
+        assert 'input.png' in mock_worker.submit.call_args[0][8]
+
+    @patch('app.main_window.tk.Button')
+    @patch('app.main_window.get_settings')
     @patch('app.main_window.filedialog.askopenfilename')
     def test_process_svg_to_ico_conversion_cancelled(
-        self, mock_file_dialog, mock_convert_ico, mock_convert_png, mock_load_config, mock_button, mock_root, mock_config
+        self, mock_file_dialog, mock_get_settings, mock_button, mock_root, settings, mock_worker
     ):
         """正常系: ファイル選択をキャンセルした場合は変換しない"""
-        mock_load_config.return_value = mock_config
+        mock_get_settings.return_value = settings
         mock_file_dialog.return_value = ''
 
         window = IconFlowMainWindow(mock_root)
         window._process_svg_to_ico_conversion()
 
-        mock_convert_png.assert_not_called()
-        mock_convert_ico.assert_not_called()
+        mock_worker.submit.assert_not_called()
 
     @patch('app.main_window.tk.Button')
-    @patch('app.main_window.load_config')
+    @patch('app.main_window.get_settings')
+    @patch('app.main_window.collect_source_files')
+    @patch('app.main_window.filedialog.askdirectory')
+    def test_process_batch_svg_to_ico_conversion(
+        self, mock_askdirectory, mock_collect, mock_get_settings, mock_button, mock_root, settings, mock_worker
+    ):
+        """正常系: フォルダ内の全SVGがバックグラウンドに投入される"""
+        mock_get_settings.return_value = settings
+        mock_askdirectory.return_value = 'C:\\test\\icons'
+        mock_collect.return_value = ['C:\\test\\icons\\a.svg', 'C:\\test\\icons\\b.svg']
+
+        window = IconFlowMainWindow(mock_root)
+        window._process_batch_svg_to_ico_conversion()
+
+        assert mock_worker.submit.call_count == 2
+        mock_root.after.assert_called_once()
+
+    @patch('app.main_window.tk.Button')
+    @patch('app.main_window.get_settings')
+    @patch('app.main_window.messagebox.showerror')
+    def test_poll_worker_reschedules_while_busy(self, mock_showerror, mock_get_settings, mock_button, mock_root, settings, mock_worker):
+        """正常系: 未完了のタスクがある間は再度確認を予約する"""
+        mock_get_settings.return_value = settings
+        mock_worker.poll.return_value = []
+        mock_worker.is_busy = True
+
+        window = IconFlowMainWindow(mock_root)
+        window._poll_worker()
+
+        mock_root.after.assert_called_once_with(POLL_INTERVAL_MS, window._poll_worker)
+        mock_showerror.assert_not_called()
+
+    @patch('app.main_window.tk.Button')
+    @patch('app.main_window.get_settings')
+    @patch('app.main_window.messagebox.showerror')
+    def test_poll_worker_reports_errors_when_finished(self, mock_showerror, mock_get_settings, mock_button, mock_root, settings, mock_worker):
+        """異常系: 全タスク完了時に失敗したファイルをまとめて表示する"""
+        mock_get_settings.return_value = settings
+        failed = Mock()
+        failed.cancelled.return_value = False
+        failed.exception.return_value = None
+        failed.result.return_value = BatchResult('C:\\test\\broken.svg', 'out.ico', 'ValueError: broken')
+        mock_worker.poll.return_value = [failed]
+
+        window = IconFlowMainWindow(mock_root)
+        window._poll_worker()
+
+        mock_root.after.assert_not_called()
+        mock_showerror.assert_called_once()
+        assert "ValueError: broken" in mock_showerror.call_args[0][1]
+
+    @patch('app.main_window.tk.Button')
+    @patch('app.main_window.get_settings')
+    def test_cancel_handler_cancels_pending_tasks(self, mock_get_settings, mock_button, mock_root, settings, mock_worker):
+        """正常系: キャンセルボタンで開始前のタスクを取り消す"""
+        mock_get_settings.return_value = settings
+
+        window = IconFlowMainWindow(mock_root)
+        window.cancel_handler()
+
+        mock_worker.cancel.assert_called_once()
+
+    @patch('app.main_window.tk.Button')
+    @patch('app.main_window.get_settings')
+    def test_close_handler_shuts_down_worker(self, mock_get_settings, mock_button, mock_root, settings, mock_worker):
+        """正常系: 閉じるボタンでワーカーを停止して終了する"""
+        mock_get_settings.return_value = settings
+
+        window = IconFlowMainWindow(mock_root)
+        window.close_handler()
+
+        mock_worker.shutdown.assert_called_once()
+        mock_root.quit.assert_called_once()
+
+    @patch('app.main_window.tk.Button')
+    @patch('app.main_window.get_settings')
     @patch('app.main_window.subprocess.Popen')
     @patch('app.main_window.os.path.exists')
     @patch('app.main_window.CONFIG_PATH', 'C:\\test\\config.ini')
-    def test_process_open_config_success(self, mock_exists, mock_popen, mock_load_config, mock_button, mock_root, mock_config):
+    def test_process_open_config_success(self, mock_exists, mock_popen, mock_get_settings, mock_button, mock_root, settings):
         """正常系: 設定ファイルをメモ帳で開く"""
-        mock_load_config.return_value = mock_config
+        mock_get_settings.return_value = settings
         mock_exists.return_value = True
 
         window = IconFlowMainWindow(mock_root)
@@ -313,13 +426,13 @@ class TestIconFlowMainWindow:
         mock_popen.assert_called_once_with(['notepad.exe', 'C:\\test\\config.ini'])
 
     @patch('app.main_window.tk.Button')
-    @patch('app.main_window.load_config')
+    @patch('app.main_window.get_settings')
     @patch('app.main_window.messagebox.showerror')
     @patch('app.main_window.os.path.exists')
     @patch('app.main_window.CONFIG_PATH', 'C:\\test\\config.ini')
-    def test_process_open_config_file_not_found(self, mock_exists, mock_showerror, mock_load_config, mock_button, mock_root, mock_config):
+    def test_process_open_config_file_not_found(self, mock_exists, mock_showerror, mock_get_settings, mock_button, mock_root, settings):
         """異常系: 設定ファイルが見つからない場合"""
-        mock_load_config.return_value = mock_config
+        mock_get_settings.return_value = settings
         mock_exists.return_value = False
 
         window = IconFlowMainWindow(mock_root)
@@ -329,11 +442,11 @@ class TestIconFlowMainWindow:
         assert "設定ファイルが見つかりません" in mock_showerror.call_args[0][1]
 
     @patch('app.main_window.tk.Button')
-    @patch('app.main_window.load_config')
+    @patch('app.main_window.get_settings')
     @patch('app.main_window.messagebox.showerror')
-    def test_convert_svg_to_png_handler_calls_handle_errors(self, mock_showerror, mock_load_config, mock_button, mock_root, mock_config):
+    def test_convert_svg_to_png_handler_calls_handle_errors(self, mock_showerror, mock_get_settings, mock_button, mock_root, settings):
         """正常系: ハンドラがエラーハンドリングを使用する"""
-        mock_load_config.return_value = mock_config
+        mock_get_settings.return_value = settings
 
         window = IconFlowMainWindow(mock_root)
 
@@ -344,11 +457,11 @@ class TestIconFlowMainWindow:
         mock_showerror.assert_called_once()
 
     @patch('app.main_window.tk.Button')
-    @patch('app.main_window.load_config')
+    @patch('app.main_window.get_settings')
     @patch('app.main_window.messagebox.showerror')
-    def test_convert_png_to_ico_handler_calls_handle_errors(self, mock_showerror, mock_load_config, mock_button, mock_root, mock_config):
+    def test_convert_png_to_ico_handler_calls_handle_errors(self, mock_showerror, mock_get_settings, mock_button, mock_root, settings):
         """正常系: ハンドラがエラーハンドリングを使用する"""
-        mock_load_config.return_value = mock_config
+        mock_get_settings.return_value = settings
 
         window = IconFlowMainWindow(mock_root)
 
@@ -358,11 +471,11 @@ class TestIconFlowMainWindow:
         mock_showerror.assert_called_once()
 
     @patch('app.main_window.tk.Button')
-    @patch('app.main_window.load_config')
+    @patch('app.main_window.get_settings')
     @patch('app.main_window.messagebox.showerror')
-    def test_convert_svg_to_ico_handler_calls_handle_errors(self, mock_showerror, mock_load_config, mock_button, mock_root, mock_config):
+    def test_convert_svg_to_ico_handler_calls_handle_errors(self, mock_showerror, mock_get_settings, mock_button, mock_root, settings):
         """正常系: ハンドラがエラーハンドリングを使用する"""
-        mock_load_config.return_value = mock_config
+        mock_get_settings.return_value = settings
 
         window = IconFlowMainWindow(mock_root)
 
@@ -372,11 +485,11 @@ class TestIconFlowMainWindow:
         mock_showerror.assert_called_once()
 
     @patch('app.main_window.tk.Button')
-    @patch('app.main_window.load_config')
+    @patch('app.main_window.get_settings')
     @patch('app.main_window.messagebox.showerror')
-    def test_open_config_handler_calls_handle_errors(self, mock_showerror, mock_load_config, mock_button, mock_root, mock_config):
+    def test_open_config_handler_calls_handle_errors(self, mock_showerror, mock_get_settings, mock_button, mock_root, settings):
         """正常系: ハンドラがエラーハンドリングを使用する"""
-        mock_load_config.return_value = mock_config
+        mock_get_settings.return_value = settings
 
         window = IconFlowMainWindow(mock_root)
 
@@ -384,3 +497,32 @@ class TestIconFlowMainWindow:
             window.open_config_handler()
 
         mock_showerror.assert_called_once()
+
+    @patch('app.main_window.tk.Button')
+    @patch('app.main_window.add_settings_listener')
+    @patch('app.main_window.get_settings')
+    def test_config_watch_applies_new_settings(self, mock_get_settings, mock_add_listener, mock_button, mock_root, settings):
+        """正常系: 設定ファイルの確認を定期的に予約し、読み込み直した設定をウィンドウに反映する"""
+        mock_get_settings.return_value = settings
+        window = IconFlowMainWindow(mock_root)
+
+        window.start_config_watch()
+
+        mock_root.after.assert_called_once_with(CONFIG_CHECK_INTERVAL_MS, window._check_config)
+        listener = mock_add_listener.call_args[0][0]
+        listener(replace(settings, window_width=300, font_size=14))
+        mock_root.geometry.assert_called_with("300x300")
+        mock_button.return_value.config.assert_called_with(font=("Yu Gothic UI", 14))
+
+    @patch('app.main_window.tk.Button')
+    @patch('app.main_window.check_settings_changes', side_effect=configparser.Error("編集中"))
+    @patch('app.main_window.get_settings')
+    def test_check_config_continues_after_error(self, mock_get_settings, mock_check, mock_button, mock_root, settings):
+        """異常系: 設定ファイルを読み込めない場合も前回の設定のまま確認を続ける"""
+        mock_get_settings.return_value = settings
+        window = IconFlowMainWindow(mock_root)
+
+        window._check_config()
+
+        mock_check.assert_called_once()
+        mock_root.after.assert_called_once_with(CONFIG_CHECK_INTERVAL_MS, window._check_config)
@@ -0,0 +1,84 @@
+import pytest
+from PIL import Image
+
+from service.memory_budget import (
+    BYTES_PER_PIXEL,
+    PNG_WORKING_COPIES,
+    TREE_SIZE_FACTOR,
+    MemoryBudget,
+    estimate_task_memory,
+    get_peak_rss,
+    max_peak_rss,
+    read_png_dimensions,
+)
+
+
+class TestEstimateTaskMemory:
+    """estimate_task_memory関数のテストクラス"""
+
+    def test_png_uses_header_dimensions(self, tmp_path):
+        """正常系: PNGはヘッダーの幅・高さから見積もる"""
+        path = tmp_path / "large.png"
+        Image.new('RGBA', (800, 600)).save(path)
+
+        estimate = estimate_task_memory('png_to_ico', str(path), 128, 32)
+
+        assert read_png_dimensions(str(path)) == (800, 600)
+        assert estimate >= 800 * 600 * BYTES_PER_PIXEL * PNG_WORKING_COPIES
+
+    def test_not_png(self, tmp_path):
+        """正常系: PNGでない場合は寸法を取得せず、ファイルサイズから見積もる"""
+        path = tmp_path / "broken.png"
+        path.write_bytes(b"not png")
+
+        assert read_png_dimensions(str(path)) is None
+        assert estimate_task_memory('png_to_ico', str(path), 128, 32) > 0
+
+    def test_svg_grows_with_size_and_file(self, tmp_path):
+        """正常系: SVGは出力サイズとファイルサイズ（解析済みツリー）に応じて大きくなる"""
+        small = tmp_path / "small.svg"
+        small.write_text("<svg/>")
+        large = tmp_path / "large.svg"
+        large.write_text("<svg>" + "<path d='M0 0L1 1'/>" * 1000 + "</svg>")
+
+        assert estimate_task_memory('svg_to_png', str(small), 1024, 128) > estimate_task_memory('svg_to_png', str(small), 128, 128)
+        difference = estimate_task_memory('svg_to_png', str(large), 128, 128) - estimate_task_memory('svg_to_png', str(small), 128, 128)
+        assert difference == (large.stat().st_size - small.stat().st_size) * TREE_SIZE_FACTOR
+        assert estimate_task_memory('svg_to_ico', str(small), 128, 128, [16, 256]) > estimate_task_memory('svg_to_ico', str(small), 128, 128, [16])
+
+
+class TestMemoryBudget:
+    """MemoryBudgetクラスのテストクラス"""
+
+    def test_backpressure(self):
+        """正常系: 予算を超えるタスクは実行中のタスクが終わるまで開始しない"""
+        budget = MemoryBudget(100)
+        budget.acquire(60)
+
+        assert budget.can_start(40)
+        assert not budget.can_start(50)
+        budget.release(60)
+        assert budget.can_start(50)
+        assert budget.peak_in_use == 60
+
+    def test_oversized_task_runs_alone(self):
+        """正常系: 上限を超えるタスクは単独でのみ開始し、上限として計上する"""
+        budget = MemoryBudget(100)
+
+        assert budget.can_start(500)
+        budget.acquire(500)
+        assert budget.in_use == 100
+        assert not budget.can_start(1)
+
+    def test_invalid_limit(self):
+        """異常系: 0以下の予算は指定できない"""
+        with pytest.raises(ValueError):
+            MemoryBudget(0)
+
+
+def test_peak_rss():
+    """正常系: ピークメモリ使用量は取得できた値の最大値とする"""
+    assert max_peak_rss(None, 10, 30) == 30
+    assert max_peak_rss(None) is None
+    peak = get_peak_rss()
+    assert peak is None or peak > 0
@@ -0,0 +1,93 @@
+import struct
+
+import pytest
+from PIL import Image
+
+from service.raster_bridge import argb32_to_image, surface_to_image, unpremultiply
+from service.resize_strategy import resize_image
+
+
+def _argb32(pixels, width, stride):
+    """ネイティブのバイト順の32ビット整数（0xAARRGGBB）からcairoのARGB32のバッファを作成"""
+    data = bytearray()
+    for row in range(len(pixels) // width):
+        for a, r, g, b in pixels[row * width:(row + 1) * width]:
+            data += struct.pack('=I', (a << 24) | (r << 16) | (g << 8) | b)
+        data += bytes(stride - width * 4)
+    return data
+
+
+class FakeImageSurface:
+    """cairocffi.ImageSurfaceの代わりにARGB32のバッファを返すテスト用クラス"""
+
+    def __init__(self, data, width, height, stride):
+        self.data = data
+        self.width = width
+        self.height = height
+        self.stride = stride
+        self.flushed = False
+
+    def flush(self):
+        self.flushed = True
+
+    def get_data(self):
+        return memoryview(self.data)
+
+    def get_width(self):
+        return self.width
+
+    def get_height(self):
+        return self.height
+
+    def get_stride(self):
+        return self.stride
+
+
+class TestArgb32ToImage:
+    """argb32_to_image関数のテストクラス"""
+
+    def test_converts_byte_order_and_alpha(self):
+        """正常系: 乗算済みのARGB32をRGBaとして読み込み、透明度を戻すと元の色になる"""
+        # 不透明の赤と、半透明（128）の緑（乗算済みのため128）、行末に8バイトのパディング
+        data = _argb32([(255, 255, 0, 0), (128, 0, 128, 0)], 2, stride=16)
+
+        image = argb32_to_image(data, 2, 1, 16)
+
+        assert image.mode == 'RGBa'
+        assert image.getpixel((0, 0)) == (255, 0, 0, 255)
+        assert unpremultiply(image).getpixel((1, 0)) == (0, 255, 0, 128)
+
+    def test_does_not_share_buffer(self):
+        """正常系: 変換後に元のバッファを変更しても画像は変わらない"""
+        data = _argb32([(255, 0, 0, 255)], 1, stride=4)
+        image = argb32_to_image(data, 1, 1, 4)
+
+        data[:] = bytes(4)
+
+        assert image.getpixel((0, 0)) == (0, 0, 255, 255)
+
+    def test_invalid_stride(self):
+        """異常系: strideが幅より小さい場合はValueError"""
+        with pytest.raises(ValueError):
+            argb32_to_image(bytes(8), 2, 1, 4)
+
+
+def test_surface_to_image():
+    """正常系: サーフェスをフラッシュしてから全ての行を読み込む"""
+    surface = FakeImageSurface(_argb32([(255, 0, 0, 255)] * 6, 3, stride=16), 3, 2, 16)
+
+    image = surface_to_image(surface)
+
+    assert surface.flushed
+    assert image.size == (3, 2)
+    assert image.getpixel((2, 1)) == (0, 0, 255, 255)
+
+
+def test_resize_premultiplied_input():
+    """正常系: 乗算済みの画像はそのままリサイズでき、透明度付きのモードで返る"""
+    image = Image.new('RGBA', (64, 64), (0, 0, 255, 128)).convert('RGBa')
+
+    resized = resize_image(image, 16)
+
+    assert resized.mode == 'RGBA'
+    assert resized.getpixel((8, 8)) == (0, 0, 255, 128)
@@ -0,0 +1,124 @@
+import math
+import time
+from unittest.mock import patch
+
+import pytest
+from PIL import Image, ImageDraw
+
+from service.instrumentation import collect_timings
+from service.resize_strategy import (
+    DEFAULT_PSNR_THRESHOLD,
+    build_mipmap_chain,
+    psnr,
+    resample_name,
+    resize_image,
+    resize_mipmap,
+    resize_sizes,
+)
+
+
+def draw_icon(size: int) -> Image.Image:
+    """縮小の品質を確認するための大きいアイコン画像（グラデーション・円・細線）"""
+    image = Image.linear_gradient('L').resize((size, size)).convert('RGBA')
+    draw = ImageDraw.Draw(image)
+    bounds = (size // 8, size // 8, size * 7 // 8, size * 7 // 8)
+    draw.ellipse(bounds, fill=(30, 120, 220, 255), outline=(0, 0, 0, 255), width=size // 40)
+    for offset in range(0, size, size // 16):
+        draw.line((offset, 0, size - offset, size), fill=(240, 80, 40, 255), width=size // 128)
+    return image
+
+
+@pytest.fixture
+def large_icon():
+    return draw_icon(2048)
+
+
+class TestResizeStrategy:
+    """resize_strategyのテストクラス"""
+
+    @pytest.mark.parametrize("size", [16, 32, 48, 256])
+    def test_quality_close_to_direct_lanczos(self, large_icon, size):
+        """正常系: 間引き後のLanczosの結果が元の解像度からの直接リサイズとPSNRの許容値以内"""
+        expected = resize_image(large_icon, size, reducing_gap=None)
+
+        actual = resize_image(large_icon, size)
+
+        assert actual.size == (size, size)
+        assert psnr(actual, expected) >= DEFAULT_PSNR_THRESHOLD
+
+    def test_resize_sizes_reduces_once(self, large_icon):
+        """正常系: 複数サイズの出力でも間引きは1回のみ行い、サイズごとに計測する"""
+        with patch.object(Image.Image, 'reduce', autospec=True, side_effect=Image.Image.reduce) as mock_reduce:
+            with collect_timings() as collected:
+                frames = resize_sizes(large_icon, [256, 48, 16], source="icon.png")
+
+        assert [frame.size for frame in frames] == [(256, 256), (48, 48), (16, 16)]
+        assert mock_reduce.call_args_list[0].args[1] == 2
+        assert [(timing.stage, timing.size) for timing in collected] == [('resize', 256), ('resize', 48), ('resize', 16)]
+        for frame, size in zip(frames, [256, 48, 16]):
+            assert psnr(frame, resize_image(large_icon, size, reducing_gap=None)) >= DEFAULT_PSNR_THRESHOLD
+
+    @pytest.mark.parametrize("source_size", [3000, 4096])
+    def test_resize_sizes_indivisible_source(self, source_size):
+        """正常系: 元のサイズが間引く倍率で割り切れない場合も、端数の行・列を含めて位置・倍率がずれない"""
+        image = draw_icon(source_size)
+
+        frames = resize_sizes(image, [256, 48, 16])
+
+        for frame, size in zip(frames, [256, 48, 16]):
+            assert psnr(frame, resize_image(image, size, reducing_gap=None)) >= DEFAULT_PSNR_THRESHOLD
+
+    def test_without_reducing_gap_matches_direct_lanczos(self, large_icon):
+        """正常系: reducing_gapがNoneの場合は従来の直接リサイズと一致する"""
+        frames = resize_sizes(large_icon, [32], reducing_gap=None)
+
+        expected = large_icon.resize((32, 32), Image.Resampling.LANCZOS)
+        assert psnr(frames[0], expected) == math.inf
+
+    def test_faster_than_direct_lanczos(self, large_icon):
+        """正常系: 大きく縮小する場合は直接リサイズより速い"""
+        def best_of(func):
+            timings = []
+            for _ in range(3):
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        direct = best_of(lambda: resize_image(large_icon, 32, reducing_gap=None))
+        reduced = best_of(lambda: resize_image(large_icon, 32))
+
+        assert reduced < direct
+
+    def test_build_mipmap_chain(self, large_icon):
+        """正常系: 最大サイズから最小サイズ以下まで半分ずつ縮小した段を作成する"""
+        levels = build_mipmap_chain(large_icon, 256, 20)
+
+        assert [level.size[0] for level in levels] == [256, 128, 64, 32, 16]
+        assert levels[0].mode == 'RGBa'
+
+    def test_resize_mipmap(self, large_icon):
+        """正常系: 元画像のリサイズは1回のみで、各サイズを近い段から作成する"""
+        sizes = [256, 128, 48, 32, 24, 16]
+        with patch.object(Image.Image, 'resize', autospec=True, side_effect=Image.Image.resize) as mock_resize:
+            with collect_timings() as collected:
+                frames = resize_mipmap(large_icon, sizes, source="icon.png")
+
+        assert [frame.size[0] for frame in frames] == sizes
+        assert all(frame.mode == 'RGBA' for frame in frames)
+        assert sum(call.args[0].size == large_icon.size for call in mock_resize.call_args_list) == 1
+        assert [timing.size for timing in collected] == sizes
+        for frame, size in zip(frames, sizes):
+            assert psnr(frame, resize_image(large_icon, size, reducing_gap=None)) >= DEFAULT_PSNR_THRESHOLD
+
+    def test_resample_name(self):
+        """正常系: キャッシュのキーに使う名前がreducing_gapごとに異なる"""
+        assert resample_name(None) == 'LANCZOS'
+        assert resample_name(3.0) == 'LANCZOS+reduce3'
+        assert resample_name(2.0) != resample_name(3.0)
+        assert resample_name(3.0, mipmap=True) == 'LANCZOS+reduce3+mipmap'
+
+    def test_psnr_size_mismatch(self):
+        """異常系: サイズが異なる画像はValueError"""
+        with pytest.raises(ValueError):
+            psnr(Image.new('RGB', (2, 2)), Image.new('RGB', (3, 3)))
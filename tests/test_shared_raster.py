@@ -0,0 +1,79 @@
+import pytest
+from PIL import Image
+
+from service.shared_raster import SharedRaster, SlabAllocator, load_shared, png_capacity, store_shared
+
+
+@pytest.fixture
+def allocator():
+    allocator = SlabAllocator(max_bytes=1024 * 1024, min_slab_bytes=64 * 1024)
+    yield allocator
+    allocator.close()
+
+
+class TestSlabAllocator:
+    """SlabAllocatorクラスのテストクラス"""
+
+    def test_reuses_released_slab(self, allocator):
+        """正常系: 返却したスラブを同じ大きさの要求に再利用する"""
+        first = allocator.allocate(40 * 1024)
+        allocator.release(first.name)
+
+        second = allocator.allocate(60 * 1024)
+
+        assert second == first
+        assert first.capacity == 64 * 1024
+        assert (allocator.created, allocator.reused) == (1, 1)
+
+    def test_rounds_up_to_power_of_two(self, allocator):
+        """正常系: 最小サイズ以上は2のべき乗に切り上げる"""
+        assert allocator.allocate(100 * 1024).capacity == 128 * 1024
+
+    def test_limit_evicts_free_slabs(self, allocator):
+        """正常系: 上限を超える場合は未使用のスラブを破棄し、それでも足りない場合はNone"""
+        small = allocator.allocate(64 * 1024)
+        allocator.release(small.name)
+
+        large = allocator.allocate(1024 * 1024)
+
+        assert large is not None
+        assert allocator.total_bytes == 1024 * 1024
+        assert allocator.allocate(64 * 1024) is None
+
+
+class TestStoreAndLoad:
+    """store_shared・load_shared関数のテストクラス"""
+
+    def test_bytes_round_trip(self, allocator):
+        """正常系: バイト列は記述子に置き換わり、コピーせずに参照できる"""
+        data = bytes(range(256)) * 400
+        ref = store_shared(data, allocator.allocate(len(data)))
+
+        assert isinstance(ref, SharedRaster)
+        view = load_shared(ref)
+        assert isinstance(view, memoryview)
+        assert view == data
+        assert allocator.view(ref) == data
+
+    def test_image_round_trip(self, allocator):
+        """正常系: 画像はモード・サイズを記録し、共有メモリ上のピクセルから復元する"""
+        image = Image.new('RGBA', (128, 128), (255, 0, 0, 128)).convert('RGBa')
+        ref = store_shared(image, allocator.allocate(128 * 128 * 4))
+
+        restored = load_shared(ref)
+
+        assert (ref.kind, restored.mode, restored.size) == ('image', 'RGBa', (128, 128))
+        assert restored.tobytes() == image.tobytes()
+
+    def test_fallback_when_too_large(self, allocator):
+        """正常系: スラブに収まらない値・対応していない型はそのまま返す"""
+        slab = allocator.allocate(1)
+        data = bytes(slab.capacity + 1)
+
+        assert store_shared(data, slab) is data
+        assert store_shared("output.ico", slab) == "output.ico"
+
+
+def test_png_capacity():
+    """正常系: 圧縮できないPNGデータも収まる容量を見積もる"""
+    assert png_capacity(256) > 256 * 256 * 4
@@ -0,0 +1,149 @@
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from service.sprite_atlas import SkylinePacker, build_atlas, get_css_classes, get_sprite_names, pack_rectangles
+
+
+def fake_render_png(svg_data, url=None, size=64):
+    """CairoSVGの代わりに指定サイズの画像（色はSVGの内容の長さで変える）を返すテスト用関数"""
+    buffer = io.BytesIO()
+    Image.new('RGBA', (size, size), (len(svg_data), 0, 0, 255)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def failing_render_png(svg_data, url=None, size=64):
+    if b'broken' in svg_data:
+        raise ValueError("解析できません")
+    return fake_render_png(svg_data, url, size)
+
+
+@pytest.fixture
+def svg_dir(tmp_path):
+    source_dir = tmp_path / "icons"
+    source_dir.mkdir()
+    for index, name in enumerate(["home", "search", "user"]):
+        (source_dir / f"{name}.svg").write_text("<svg/>" + " " * index)
+    return source_dir
+
+
+def _overlaps(a, b):
+    return not (a[0] + a[2] <= b[0] or b[0] + b[2] <= a[0] or a[1] + a[3] <= b[1] or b[1] + b[3] <= a[1])
+
+
+class TestPackRectangles:
+    """矩形の配置のテストクラス"""
+
+    def test_skyline_places_bottom_left(self):
+        """正常系: 上端が最も低くなる位置（同じ場合は左）に配置する"""
+        packer = SkylinePacker(100, 100)
+
+        assert packer.insert(60, 40) == (0, 0)
+        assert packer.insert(40, 20) == (60, 0)
+        assert packer.insert(40, 20) == (60, 20)
+        assert packer.insert(100, 10) == (0, 40)
+        assert packer.insert(100, 60) is None
+
+    def test_packs_without_overlap(self):
+        """正常系: 大きさの異なる矩形を重ならないよう最大サイズ以内のシートに配置する"""
+        dimensions = [(16, 16), (64, 64), (32, 48), (48, 32), (64, 16)] * 10
+
+        placements, sheet_sizes = pack_rectangles(dimensions, max_size=128, padding=2)
+
+        rects = [(sheet, x, y, w + 2, h + 2) for (sheet, x, y), (w, h) in zip(placements, dimensions)]
+        for i, a in enumerate(rects):
+            width, height = sheet_sizes[a[0]]
+            assert a[1] + a[3] - 2 <= width <= 128 and a[2] + a[4] - 2 <= height <= 128
+            assert not any(a[0] == b[0] and _overlaps(a[1:], b[1:]) for b in rects[i + 1:])
+        assert len(sheet_sizes) > 1
+
+    def test_power_of_two_and_oversized(self):
+        """正常系・異常系: シートの大きさを2のべき乗に切り上げ、最大サイズを超える矩形はエラー"""
+        _, sheet_sizes = pack_rectangles([(48, 48), (48, 48)], max_size=256, padding=0, power_of_two=True)
+        assert sheet_sizes == [(128, 64)]
+
+        with pytest.raises(ValueError):
+            pack_rectangles([(300, 10)], max_size=256)
+
+    def test_power_of_two_exceeding_max_size(self):
+        """異常系: 2のべき乗に切り上げたシートが最大サイズを超える場合はエラー"""
+        _, sheet_sizes = pack_rectangles([(600, 600)], max_size=1000, padding=0)
+        assert sheet_sizes == [(600, 600)]
+
+        with pytest.raises(ValueError, match="2のべき乗"):
+            pack_rectangles([(600, 600)], max_size=1000, padding=0, power_of_two=True)
+
+
+class TestBuildAtlas:
+    """build_atlas関数のテストクラス"""
+
+    def test_sprite_names(self, tmp_path):
+        """正常系: 共通フォルダからの相対パスを画像名とし、複数サイズでは @サイズ を付ける"""
+        paths = [str(tmp_path / "a" / "home.svg"), str(tmp_path / "b" / "home.svg")]
+
+        assert [name for name, _, _ in get_sprite_names(paths, [32])] == ["a/home", "b/home"]
+        assert [name for name, _, _ in get_sprite_names(paths[:1], [16, 32])] == ["home@16", "home@32"]
+
+    def test_css_classes(self):
+        """正常系・異常系: 使用できない文字を置き換えたクラス名が別の画像と重複する場合はエラー"""
+        assert get_css_classes(["a-b", "a_b", "dir/a b"]) == {"a-b": "icon-a-b", "a_b": "icon-a_b", "dir/a b": "icon-dir-a-b"}
+
+        with pytest.raises(ValueError, match=r"\.icon-a-b"):
+            get_css_classes(["a-b", "a b"])
+        with pytest.raises(ValueError):
+            get_css_classes(["home-16", "home@16"])
+
+    @patch('service.convert_svg_to_png.render_png', side_effect=fake_render_png)
+    def test_css_class_collision_is_rejected(self, mock_render, svg_dir, tmp_path):
+        """異常系: クラス名が重複する画像がある場合はラスタライズ・出力の前にエラー"""
+        (svg_dir / "home page.svg").write_text("<svg/>")
+        (svg_dir / "home-page.svg").write_text("<svg/>")
+
+        with pytest.raises(ValueError, match="CSSのクラス名が重複します"):
+            build_atlas(str(svg_dir), str(tmp_path / "out"), size=16, max_workers=1)
+
+        mock_render.assert_not_called()
+        assert not (tmp_path / "out").exists()
+
+    @patch('service.convert_svg_to_png.render_png', side_effect=fake_render_png)
+    def test_writes_sheet_index_and_css(self, mock_render, svg_dir, tmp_path):
+        """正常系: 全ての画像を1枚のシートにまとめ、インデックスの座標にラスタライズ結果を貼り付ける"""
+        output_dir = tmp_path / "out"
+
+        report = build_atlas(str(svg_dir), str(output_dir), size=32, padding=2, max_workers=1)
+
+        assert mock_render.call_count == 3
+        index = json.loads((output_dir / "atlas.json").read_text(encoding='utf-8'))
+        assert index['sheets'] == [{'file': "atlas.png", 'width': report.sheets[0].width, 'height': report.sheets[0].height}]
+        with Image.open(output_dir / "atlas.png") as sheet:
+            for name, length in [("home", 6), ("search", 7), ("user", 8)]:
+                sprite = index['sprites'][name]
+                assert (sprite['width'], sprite['height']) == (32, 32)
+                assert sheet.getpixel((sprite['x'], sprite['y'])) == (length, 0, 0, 255)
+        css = (output_dir / "atlas.css").read_text(encoding='utf-8')
+        assert css.splitlines()[0] == ".icon { display: inline-block; background-repeat: no-repeat; }"
+        assert '.icon-home { width: 32px; height: 32px; background-image: url("atlas.png"); ' in css
+
+    @patch('service.convert_svg_to_png.render_png', side_effect=fake_render_png)
+    def test_multiple_sheets_and_sizes(self, mock_render, svg_dir, tmp_path):
+        """正常系: 最大サイズに収まらない場合はシートを分け、複数サイズを配置する"""
+        report = build_atlas(str(svg_dir), str(tmp_path), sizes=[16, 48], max_size=64, padding=0, name="sprites", max_workers=1)
+
+        assert len(report.sprites) == 6
+        assert [sheet.path for sheet in report.sheets] == [str(tmp_path / f"sprites-{i}.png") for i in range(len(report.sheets))]
+        assert len(report.sheets) > 1
+        assert {sprite.name for sprite in report.sprites if sprite.size == 48} == {"home@48", "search@48", "user@48"}
+
+    @patch('service.convert_svg_to_png.render_png', side_effect=failing_render_png)
+    def test_failed_render_is_reported(self, mock_render, svg_dir, tmp_path):
+        """異常系: ラスタライズに失敗した画像は配置せずにfailedに記録する"""
+        (svg_dir / "broken.svg").write_text("<svg broken")
+
+        report = build_atlas(str(svg_dir), str(tmp_path), size=16, max_workers=1)
+
+        assert [result.source_path for result in report.failed] == [str(svg_dir / "broken.svg")]
+        assert "broken" not in json.loads((tmp_path / "atlas.json").read_text(encoding='utf-8'))['sprites']
+        assert len(report.sprites) == 3
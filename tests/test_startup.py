@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+from app.startup import track_startup
+from service.instrumentation import add_sink, remove_sink
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('cairosvg', 'cairocffi', 'lxml', 'tinycss2', 'cssselect2', 'PIL')
+
+
+class TestTrackStartup:
+    """起動時間計測のテストクラス"""
+
+    def test_records_import_and_first_frame(self, tmp_path, monkeypatch):
+        """正常系: 初回描画時に読み込み時間と初回描画までの時間を記録する"""
+        monkeypatch.delenv('ICONFLOW_STARTUP_EXIT', raising=False)
+        metrics_path = tmp_path / "startup.jsonl"
+        root = Mock()
+        received = []
+        add_sink(received.append)
+        try:
+            track_startup(root, 10.0, 10.25, metrics_path=str(metrics_path))
+            root.after_idle.call_args.args[0]()
+        finally:
+            remove_sink(received.append)
+
+        assert [timing.stage for timing in received] == ['startup_import', 'startup_first_frame']
+        assert received[0].elapsed == pytest.approx(0.25)
+        lines = [json.loads(line) for line in metrics_path.read_text(encoding='utf-8').splitlines()]
+        assert [line['stage'] for line in lines] == ['startup_import', 'startup_first_frame']
+        root.destroy.assert_not_called()
+
+    def test_exit_after_first_frame(self, monkeypatch):
+        """正常系: 環境変数の指定時は計測後にウィンドウを閉じる"""
+        monkeypatch.setenv('ICONFLOW_STARTUP_EXIT', '1')
+        root = Mock()
+
+        track_startup(root, 0.0, 0.0)
+        root.after_idle.call_args.args[0]()
+
+        root.destroy.assert_called_once()
+
+
+@pytest.mark.parametrize("module", ["app.main_window", "cli"])
+def test_startup_does_not_import_heavy_modules(module):
+    """正常系: GUI・CLIの起動時にCairoSVG・Pillowを読み込まない"""
+    script = (
+        f"import importlib, sys; importlib.import_module({module!r}); "
+        f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, '-c', script], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+
+    assert completed.stdout.strip() == ""
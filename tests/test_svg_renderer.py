@@ -0,0 +1,173 @@
+import io
+from unittest.mock import Mock, patch
+
+import pytest
+from PIL import Image
+
+from service.convert_svg_to_png import convert_svg_to_png_sizes
+from service.svg_renderer import TREE_SIZE_FACTOR, SvgRenderer
+
+
+class FakeSurface:
+    """PNGSurfaceの代わりに指定サイズの画像を書き込むテスト用クラス"""
+
+    def __init__(self, tree, output, dpi, output_width=None, output_height=None):
+        self.output = output
+        self.size = output_width or 64
+
+    def finish(self):
+        Image.new('RGBA', (self.size, self.size), (255, 0, 0, 255)).save(self.output, format='PNG')
+
+
+class FakeImageSurface:
+    """cairocffi.ImageSurfaceの代わりに赤（不透明）のARGB32データを返すテスト用クラス"""
+
+    def __init__(self, size):
+        self.size = size
+        self.finished = False
+
+    def flush(self):
+        pass
+
+    def get_data(self):
+        return Image.new('RGBa', (self.size, self.size), (255, 0, 0, 255)).tobytes('raw', 'BGRa')
+
+    def get_width(self):
+        return self.size
+
+    def get_height(self):
+        return self.size
+
+    def get_stride(self):
+        return self.size * 4
+
+    def finish(self):
+        self.finished = True
+
+
+def _cairo_available() -> bool:
+    try:
+        import cairocffi  # noqa: F401
+        import cairosvg.defs  # noqa: F401
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+# 描画中にノードが書き換えられるmask・patternを含むSVG
+MASK_PATTERN_SVG = b"""<svg xmlns="http://www.w3.org/2000/svg" width="64" height="64">
+<defs>
+  <mask id="m"><rect width="64" height="32" fill="white" opacity="0.5"/></mask>
+  <pattern id="p" width="8" height="8" patternUnits="userSpaceOnUse" opacity="0.8"><circle cx="4" cy="4" r="3" fill="blue"/></pattern>
+</defs>
+<rect width="64" height="64" fill="url(#p)"/>
+<rect width="64" height="64" fill="red" mask="url(#m)"/>
+</svg>"""
+
+
+@pytest.fixture
+def mock_cairosvg():
+    """CairoSVGの解析・ラスタライズのモック"""
+    with patch('service.svg_renderer.Tree') as mock_tree, patch('service.svg_renderer.PNGSurface', FakeSurface):
+        yield mock_tree
+
+
+class TestSvgRenderer:
+    """SvgRendererクラスのテストクラス"""
+
+    def test_parses_once_for_many_sizes(self, mock_cairosvg):
+        """正常系: 同じSVGを複数サイズでラスタライズしても解析は1回のみ"""
+        renderer = SvgRenderer()
+
+        outputs = renderer.render_sizes(b"<svg/>", "icon.svg", [16, 32, 16, 48])
+
+        assert list(outputs) == [16, 32, 48]
+        with Image.open(io.BytesIO(outputs[32])) as image:
+            assert image.size == (32, 32)
+        mock_cairosvg.assert_called_once_with(bytestring=b"<svg/>", url="icon.svg")
+        assert (renderer.parses, renderer.hits) == (1, 2)
+
+    def test_different_source_is_parsed_again(self, mock_cairosvg):
+        """正常系: 内容またはパスが異なるSVGは別に解析する"""
+        renderer = SvgRenderer()
+
+        renderer.get_tree(b"<svg/>", "a.svg")
+        renderer.get_tree(b"<svg></svg>", "a.svg")
+        renderer.get_tree(b"<svg/>", "b.svg")
+
+        assert renderer.parses == 3
+        assert len(renderer) == 3
+
+    def test_lru_bounded_by_memory(self, mock_cairosvg):
+        """正常系: 見積もりメモリ使用量が上限を超えると最近使用していないものから破棄する"""
+        svg_a, svg_b, svg_c = (bytes([i]) * 100 for i in range(3))
+        renderer = SvgRenderer(max_bytes=100 * TREE_SIZE_FACTOR * 2)
+
+        renderer.get_tree(svg_a)
+        renderer.get_tree(svg_b)
+        renderer.get_tree(svg_a)
+        renderer.get_tree(svg_c)
+
+        assert len(renderer) == 2
+        assert renderer.total_bytes <= renderer.max_bytes
+        renderer.get_tree(svg_a)
+        assert renderer.hits == 2
+        renderer.get_tree(svg_b)
+        assert renderer.parses == 4
+
+    def test_oversized_tree_is_not_kept(self, mock_cairosvg):
+        """正常系: 上限より大きいSVGは解析結果を保持しない"""
+        renderer = SvgRenderer(max_bytes=10)
+
+        renderer.get_tree(b"<svg/>" * 10)
+
+        assert len(renderer) == 0
+
+    def test_render_image_skips_png(self, mock_cairosvg):
+        """正常系: render_imageはPNGを書き出さずにサーフェスのピクセルから画像を作成する"""
+        surfaces = []
+
+        def create_surface(tree, output, dpi, output_width=None, output_height=None):
+            surface = Mock(cairo=FakeImageSurface(output_width))
+            surfaces.append(surface)
+            return surface
+
+        with patch('service.svg_renderer.PNGSurface', side_effect=create_surface):
+            image = SvgRenderer().render_image(b"<svg/>", "icon.svg", 32)
+
+        assert image.mode == 'RGBa' and image.size == (32, 32)
+        assert image.convert('RGBA').getpixel((0, 0)) == (255, 0, 0, 255)
+        surfaces[0].finish.assert_not_called()
+        assert surfaces[0].cairo.finished
+
+    def test_convert_svg_to_png_sizes(self, mock_cairosvg, tmp_path):
+        """正常系: 1回の解析で各サイズのPNGを出力する"""
+        svg_path = tmp_path / "icon.svg"
+        svg_path.write_bytes(b"<svg id='sizes'/>")
+
+        with patch('service.convert_svg_to_png.get_renderer', return_value=SvgRenderer()):
+            paths = convert_svg_to_png_sizes(str(svg_path), str(tmp_path / "out"), [16, 64])
+
+        assert [path.rsplit('_', 1)[1] for path in paths] == ["16.png", "64.png"]
+        with Image.open(paths[1]) as image:
+            assert image.size == (64, 64)
+        mock_cairosvg.assert_called_once()
+
+
+@pytest.mark.skipif(not _cairo_available(), reason="cairoライブラリを読み込めません")
+class TestSvgRendererWithCairo:
+    """実際のCairoSVGで描画するテストクラス"""
+
+    def test_repeated_render_is_identical(self):
+        """正常系: 解析済みツリーを再利用して2回以上描画しても、mask・patternの描画結果が変わらない"""
+        renderer = SvgRenderer()
+
+        first = renderer.render_png(MASK_PATTERN_SVG, None, 32)
+        second = renderer.render_png(MASK_PATTERN_SVG, None, 32)
+        images = [renderer.render_image(MASK_PATTERN_SVG, None, 32) for _ in range(2)]
+
+        assert renderer.parses == 1
+        with Image.open(io.BytesIO(first)) as a, Image.open(io.BytesIO(second)) as b:
+            assert a.tobytes() == b.tobytes()
+        assert images[0].tobytes() == images[1].tobytes()
+        assert first == SvgRenderer().render_png(MASK_PATTERN_SVG, None, 32)
@@ -0,0 +1,146 @@
+import configparser
+import os
+import time
+
+import pytest
+from PIL import Image
+
+from service.watch_folder import FolderWatcher
+from utils.config_manager import AppSettings
+
+
+def _write_png(path, color=(255, 0, 0, 255)):
+    """テスト用のPNGファイルを作成"""
+    Image.new('RGBA', (64, 64), color).save(path, format='PNG')
+
+
+def _poll_until_idle(watcher, now, timeout=10.0):
+    """変換待ち・変換中のファイルがなくなるまでpoll_onceを繰り返す"""
+    results = []
+    deadline = time.monotonic() + timeout
+    while watcher.pending_count and time.monotonic() < deadline:
+        results.extend(watcher.poll_once(now))
+        time.sleep(0.01)
+    return results
+
+
+class TestFolderWatcher:
+    """FolderWatcherクラスのテストクラス"""
+
+    @pytest.fixture
+    def dirs(self, tmp_path):
+        watch_dir = tmp_path / "downloads"
+        output_dir = tmp_path / "output"
+        watch_dir.mkdir()
+        return watch_dir, output_dir
+
+    def test_converts_new_file_after_settle(self, dirs):
+        """正常系: 新しいファイルはサイズと更新時刻が落ち着いてから変換される"""
+        watch_dir, output_dir = dirs
+        watcher = FolderWatcher(str(watch_dir), str(output_dir), ico_size=32, max_workers=1, settle_seconds=1.0)
+        try:
+            _write_png(watch_dir / "new.png")
+
+            watcher.poll_once(now=100.0)
+            assert watcher.pending_count == 0
+            watcher.poll_once(now=100.5)
+            assert watcher.pending_count == 0
+            watcher.poll_once(now=101.0)
+            results = _poll_until_idle(watcher, now=101.0)
+        finally:
+            watcher.shutdown()
+
+        assert [os.path.basename(result.source_path) for result in results] == ["new.png"]
+        assert results[0].succeeded
+        assert (output_dir / "new.ico").exists()
+
+    def test_waits_while_file_is_growing(self, dirs):
+        """正常系: 書き込み途中でサイズが変化している間は変換しない"""
+        watch_dir, output_dir = dirs
+        watcher = FolderWatcher(str(watch_dir), str(output_dir), max_workers=1, settle_seconds=1.0)
+        try:
+            path = watch_dir / "partial.png"
+            path.write_bytes(b"\x89PNG")
+            watcher.poll_once(now=100.0)
+            _write_png(path)
+            watcher.poll_once(now=101.0)
+
+            assert watcher.pending_count == 0
+        finally:
+            watcher.shutdown()
+
+    def test_ignores_existing_files_by_default(self, dirs):
+        """正常系: 監視開始時に存在するファイルは変換しない（process_existing=Trueで変換）"""
+        watch_dir, output_dir = dirs
+        _write_png(watch_dir / "old.png")
+
+        watcher = FolderWatcher(str(watch_dir), str(output_dir), max_workers=1, settle_seconds=0)
+        watcher.poll_once(now=100.0)
+        watcher.poll_once(now=100.0)
+        assert watcher.pending_count == 0
+
+        existing_watcher = FolderWatcher(str(watch_dir), str(output_dir), max_workers=1, settle_seconds=0, process_existing=True)
+        try:
+            existing_watcher.poll_once(now=100.0)
+            existing_watcher.poll_once(now=100.0)
+            assert existing_watcher.pending_count == 1
+        finally:
+            existing_watcher.shutdown()
+
+    def test_limits_in_flight_tasks(self, dirs):
+        """正常系: 同時に投入するタスク数はmax_pendingまでに制限される"""
+        watch_dir, output_dir = dirs
+        watcher = FolderWatcher(str(watch_dir), str(output_dir), max_workers=1, max_pending=2, settle_seconds=0)
+        try:
+            for index in range(5):
+                _write_png(watch_dir / f"icon{index}.png", color=(index, 0, 0, 255))
+            watcher.poll_once(now=100.0)
+            watcher.poll_once(now=100.0)
+
+            assert len(watcher._in_flight) == 2
+            assert watcher.pending_count == 5
+            results = _poll_until_idle(watcher, now=100.0)
+        finally:
+            watcher.shutdown()
+
+        assert len(results) == 5
+        assert all(result.succeeded for result in results)
+
+    def test_does_not_reconvert_own_outputs(self, dirs):
+        """正常系: 監視フォルダと出力フォルダが同じ場合も自分の出力は変換しない"""
+        watch_dir, _ = dirs
+        watcher = FolderWatcher(str(watch_dir), str(watch_dir), svg_mode='svg_to_png', max_workers=1, settle_seconds=0)
+        try:
+            _write_png(watch_dir / "a.png")
+            watcher.poll_once(now=100.0)
+            watcher.poll_once(now=100.0)
+            _poll_until_idle(watcher, now=100.0)
+            watcher.poll_once(now=100.0)
+            watcher.poll_once(now=100.0)
+
+            assert watcher.pending_count == 0
+        finally:
+            watcher.shutdown()
+
+    def test_invalid_svg_mode(self, dirs):
+        """異常系: 不明なSVGの変換モードはValueError"""
+        watch_dir, output_dir = dirs
+        with pytest.raises(ValueError):
+            FolderWatcher(str(watch_dir), str(output_dir), svg_mode='png_to_ico')
+
+    def test_from_settings(self, dirs):
+        """正常系: config.iniの設定から作成し、引数で上書きできる"""
+        watch_dir, output_dir = dirs
+        config = configparser.ConfigParser()
+        config.read_dict({
+            'Appearance': {'font_size': '11', 'window_width': '250', 'window_height': '460'},
+            'Paths': {'downloads_path': str(watch_dir), 'output_path': str(output_dir)},
+            'Icon': {'icon_size': '256', 'ico_size': '64', 'ico_sizes': '16, 32'},
+            'Watch': {'svg_mode': 'svg_to_png', 'poll_interval': '0.5', 'settle_seconds': '2'},
+        })
+
+        watcher = FolderWatcher.from_settings(AppSettings.from_config(config), max_workers=3, settle_seconds=5.0)
+
+        assert (watcher.watch_dir, watcher.output_dir) == (str(watch_dir), str(output_dir))
+        assert (watcher.icon_size, watcher.ico_sizes, watcher.svg_mode) == (256, [16, 32], 'svg_to_png')
+        assert (watcher.poll_interval, watcher.settle_seconds, watcher.max_workers) == (0.5, 5.0, 3)
@@ -0,0 +1,114 @@
+import os
+import time
+
+import pytest
+
+from service import worker_pool
+from service.worker_pool import WarmPool, configure_worker_pools, get_worker_pool, shutdown_worker_pools
+
+
+def _getpid(_=None):
+    """ワーカープロセスで実行するテスト用関数"""
+    return os.getpid()
+
+
+@pytest.fixture
+def pool_options(monkeypatch):
+    """共有プロセスプールの設定・一覧をテストごとに初期化"""
+    monkeypatch.setattr(worker_pool, '_pool_options', dict(worker_pool._pool_options))
+    monkeypatch.setattr(worker_pool, '_pools', {})
+    yield
+    shutdown_worker_pools()
+
+
+class TestWarmPool:
+    """WarmPoolクラスのテストクラス"""
+
+    def test_reuses_workers_across_batches(self):
+        """正常系: 複数回の投入で同じワーカープロセスを再利用する"""
+        pool = WarmPool(2, max_tasks_per_child=0, rss_limit=0, preload=False)
+        try:
+            pids = {future.result(timeout=30) for future in pool.warm_up()}
+            for _ in range(3):
+                pids |= {future.result(timeout=30) for future in [pool.submit(_getpid) for _ in range(4)]}
+
+            # 14件のタスクを起動済みの2プロセスのみで実行する
+            assert len(pids) <= 2
+            assert pool.recycles == 0
+        finally:
+            pool.shutdown()
+
+    def test_recycles_after_max_tasks(self):
+        """正常系: max_tasks_per_child件を実行したワーカーは新しいプロセスに入れ替わる"""
+        pool = WarmPool(1, max_tasks_per_child=1, rss_limit=0, preload=False)
+        try:
+            pids = [pool.submit(_getpid).result(timeout=30) for _ in range(3)]
+
+            assert len(set(pids)) == 3
+        finally:
+            pool.shutdown()
+
+    def test_recycles_when_rss_limit_exceeded(self):
+        """正常系: メモリ使用量が上限を超えたワーカーは次の投入時にプロセスごと入れ替える"""
+        pool = WarmPool(1, max_tasks_per_child=0, rss_limit=1, preload=False)
+        try:
+            first = pool.submit(_getpid).result(timeout=30)
+            second = pool.submit(_getpid).result(timeout=30)
+
+            assert pool.recycles == 1
+            assert first != second
+        finally:
+            pool.shutdown()
+
+    def test_rss_recycle_waits_for_in_flight_tasks(self):
+        """正常系: 実行中のタスクがある間は入れ替えず、全て完了した後の投入時に入れ替える"""
+        pool = WarmPool(2, max_tasks_per_child=0, rss_limit=1, preload=False)
+        try:
+            slow = pool.submit(time.sleep, 2.0)
+            pool.submit(_getpid).result(timeout=30)
+            pool.submit(_getpid).result(timeout=30)
+            assert pool.recycles == 0
+
+            slow.result(timeout=30)
+            pool.submit(_getpid).result(timeout=30)
+            assert pool.recycles == 1
+        finally:
+            pool.shutdown()
+
+    def test_shutdown_and_restart(self):
+        """正常系: 終了後に投入した場合はプロセスプールを作り直す"""
+        pool = WarmPool(1, max_tasks_per_child=0, rss_limit=0, preload=False)
+        try:
+            pool.submit(_getpid).result(timeout=30)
+            pool.shutdown()
+            assert not pool.is_running
+
+            assert pool.submit(_getpid).result(timeout=30) > 0
+            assert pool.is_running
+        finally:
+            pool.shutdown()
+
+
+class TestSharedPools:
+    """共有プロセスプールの取得・設定のテストクラス"""
+
+    def test_shared_per_worker_count(self, pool_options):
+        """正常系: 同じワーカー数では同じプロセスプールを返す"""
+        assert get_worker_pool(2) is get_worker_pool(2)
+        assert get_worker_pool(1) is not get_worker_pool(2)
+
+    def test_configure_applies_to_new_pools(self, pool_options):
+        """正常系: 設定は以降に作成するプロセスプールに適用される"""
+        configure_worker_pools(max_tasks_per_child=0, rss_limit=64 * 1024 * 1024)
+
+        pool = get_worker_pool(1)
+
+        assert (pool.max_tasks_per_child, pool.rss_limit) == (0, 64 * 1024 * 1024)
+
+    def test_shutdown_worker_pools(self, pool_options):
+        """正常系: 終了後は新しいプロセスプールを作成する"""
+        pool = get_worker_pool(1)
+
+        shutdown_worker_pools()
+
+        assert get_worker_pool(1) is not pool
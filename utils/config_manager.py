@@ -1,6 +1,12 @@
 import configparser
+import logging
 import os
 import sys
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
 
 
 def get_config_path() -> str:
@@ -17,24 +23,173 @@ def get_config_path() -> str:
 CONFIG_PATH = get_config_path()
 
 
-def load_config() -> configparser.ConfigParser:
+def load_config(path: Optional[str] = None) -> configparser.ConfigParser:
+    path = path or CONFIG_PATH
     config = configparser.ConfigParser()
     try:
-        with open(CONFIG_PATH, encoding='utf-8') as f:
+        with open(path, encoding='utf-8') as f:
             config.read_file(f)
     except FileNotFoundError:
-        print(f"設定ファイルが見つかりません: {CONFIG_PATH}")
+        logger.error("設定ファイルが見つかりません: %s", path)
         raise
     except configparser.Error as e:
-        print(f"設定ファイルの解析中にエラーが発生しました: {e}")
+        logger.error("設定ファイルの解析中にエラーが発生しました: %s", e)
         raise
     return config
 
 
+def get_ico_sizes(config: configparser.ConfigParser) -> list[int]:
+    """[Icon]のico_sizes（カンマ区切り）を取得する。未設定または空の場合は空のリスト（ico_sizeの単一サイズで出力）
+
+    整数でない値が含まれる場合はValueErrorを送出します。
+    """
+    value = config.get('Icon', 'ico_sizes', fallback='').strip()
+    if not value:
+        return []
+    try:
+        return [int(size) for size in value.split(',') if size.strip()]
+    except ValueError:
+        raise ValueError(f"config.iniの[Icon] ico_sizesの指定が不正です: {value}（例: 16,32,48）") from None
+
+
 def save_config(config: configparser.ConfigParser):
     try:
         with open(CONFIG_PATH, 'w', encoding='utf-8') as configfile:
             config.write(configfile)
     except IOError as e:
-        print(f"設定ファイルの保存中にエラーが発生しました: {e}")
+        logger.error("設定ファイルの保存中にエラーが発生しました: %s", e)
         raise
+
+
+@dataclass(frozen=True)
+class AppSettings:
+    """config.iniの設定値（読み込み時点のスナップショット。変更不可のため複数箇所で共有できる）"""
+    font_size: int
+    window_width: int
+    window_height: int
+    downloads_path: str
+    output_path: str
+    icon_size: int
+    ico_size: int
+    ico_sizes: tuple[int, ...]
+    keep_png: bool = False
+    cache_enabled: bool = False
+    cache_dir: str = ''
+    cache_max_size_mb: int = 512
+    memory_budget_mb: int = 0
+    max_tasks_per_child: int = 200
+    worker_rss_limit_mb: int = 1024
+    watch_svg_mode: str = 'svg_to_ico'
+    watch_poll_interval: float = 1.0
+    watch_settle_seconds: float = 1.0
+    daemon_port: int = 8765
+    log_level: str = 'INFO'
+
+    @classmethod
+    def from_config(cls, config: configparser.ConfigParser) -> 'AppSettings':
+        """ConfigParserから型変換済みの設定を作成（必須項目がない場合はconfigparserの例外）"""
+        return cls(
+            font_size=config.getint('Appearance', 'font_size'),
+            window_width=config.getint('Appearance', 'window_width'),
+            window_height=config.getint('Appearance', 'window_height'),
+            downloads_path=config.get('Paths', 'downloads_path'),
+            output_path=config.get('Paths', 'output_path'),
+            icon_size=config.getint('Icon', 'icon_size'),
+            ico_size=config.getint('Icon', 'ico_size'),
+            ico_sizes=tuple(get_ico_sizes(config)),
+            keep_png=config.getboolean('Icon', 'keep_png', fallback=False),
+            cache_enabled=config.getboolean('Cache', 'enabled', fallback=False),
+            cache_dir=config.get('Cache', 'cache_dir', fallback='').strip(),
+            cache_max_size_mb=config.getint('Cache', 'max_size_mb', fallback=512),
+            memory_budget_mb=config.getint('Batch', 'memory_budget_mb', fallback=0),
+            max_tasks_per_child=config.getint('Batch', 'max_tasks_per_child', fallback=200),
+            worker_rss_limit_mb=config.getint('Batch', 'worker_rss_limit_mb', fallback=1024),
+            watch_svg_mode=config.get('Watch', 'svg_mode', fallback='svg_to_ico'),
+            watch_poll_interval=config.getfloat('Watch', 'poll_interval', fallback=1.0),
+            watch_settle_seconds=config.getfloat('Watch', 'settle_seconds', fallback=1.0),
+            daemon_port=config.getint('Daemon', 'port', fallback=8765),
+            log_level=config.get('Logging', 'level', fallback='INFO'),
+        )
+
+
+class ConfigService:
+    """config.iniを1回だけ解析して保持し、ファイルが更新された場合のみ再読み込みする
+
+    get()はファイルの更新時刻とサイズを確認するだけで、変更がなければディスクから読み込みません。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._settings: Optional[AppSettings] = None
+        self._signature: Optional[tuple[int, int]] = None
+        self._listeners: list[Callable[[AppSettings], None]] = []
+
+    @property
+    def path(self) -> str:
+        return self._path or CONFIG_PATH
+
+    def _file_signature(self) -> Optional[tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _is_stale(self) -> bool:
+        signature = self._file_signature()
+        return self._settings is None or signature is None or signature != self._signature
+
+    def get(self) -> AppSettings:
+        """現在の設定を返す（ファイルが更新されていれば再読み込み）"""
+        settings = self._settings
+        if settings is None or self._is_stale():
+            return self.reload()
+        return settings
+
+    def check_for_changes(self) -> bool:
+        """ファイルが更新されていれば再読み込みし、Trueを返す（定期的に呼び出してファイル監視に使用）"""
+        if not self._is_stale():
+            return False
+        self.reload()
+        return True
+
+    def reload(self) -> AppSettings:
+        """ファイルを読み込み直し、登録済みのリスナーへ新しい設定を通知"""
+        with self._lock:
+            signature = self._file_signature()
+            settings = AppSettings.from_config(load_config(self.path))
+            self._settings, self._signature = settings, signature
+            listeners = list(self._listeners)
+        logger.debug("設定ファイルを読み込みました: %s", self.path)
+        for listener in listeners:
+            listener(settings)
+        return settings
+
+    def add_listener(self, listener: Callable[[AppSettings], None]) -> None:
+        """再読み込み時に新しい設定を受け取る関数を登録"""
+        with self._lock:
+            self._listeners.append(listener)
+
+
+_default_service = ConfigService()
+
+
+def get_settings() -> AppSettings:
+    """アプリケーション共通のConfigServiceから現在の設定を取得"""
+    return _default_service.get()
+
+
+def reload_settings() -> AppSettings:
+    """アプリケーション共通の設定をファイルから読み込み直す"""
+    return _default_service.reload()
+
+
+def check_settings_changes() -> bool:
+    """アプリケーション共通の設定ファイルが更新されていれば読み込み直し、Trueを返す"""
+    return _default_service.check_for_changes()
+
+
+def add_settings_listener(listener: Callable[[AppSettings], None]) -> None:
+    """アプリケーション共通の設定が読み込み直された時に呼び出す関数を登録"""
+    _default_service.add_listener(listener)
@@ -0,0 +1,77 @@
+import atexit
+import logging
+import multiprocessing
+from logging.handlers import QueueHandler, QueueListener
+from typing import IO, Optional
+
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+DATE_FORMAT = '%H:%M:%S'
+DEFAULT_LEVEL = 'INFO'
+
+# ワーカープロセスのログを親プロセスのハンドラへ転送するキューとリスナー（初回のワーカー起動時に作成）
+_log_queue = None
+_listener: Optional[QueueListener] = None
+
+
+def parse_level(level: Optional[str]) -> int:
+    """ログレベル名（'DEBUG'・'info'等）を数値に変換（不明な場合はINFO）"""
+    value = logging.getLevelName((level or DEFAULT_LEVEL).strip().upper())
+    return value if isinstance(value, int) else logging.INFO
+
+
+def setup_logging(level: Optional[str] = None, quiet: bool = False, stream: Optional[IO[str]] = None) -> None:
+    """ルートロガーにコンソール出力を設定
+
+    Args:
+        level: ログレベル名（省略時はINFO）
+        quiet: Trueの場合は警告以上のみ出力（ファイルごとのメッセージを抑止）
+        stream: 出力先（省略時は標準エラー出力）
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(logging.WARNING if quiet else parse_level(level))
+
+
+def init_worker_logging(queue, level: int) -> None:
+    """ワーカープロセスの初期化処理（ProcessPoolExecutorのinitializerに指定）
+
+    ワーカーのログを全てキュー経由で親プロセスへ送るため、ワーカー内ではコンソールへ書き込みません。
+    親プロセスで無効なレベルのメッセージはワーカー内でも生成されません。
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(queue))
+    root.setLevel(level)
+
+
+class _DispatchHandler(logging.Handler):
+    """ワーカーから受け取ったログを親プロセスの同名ロガーで処理（その時点のハンドラ設定を使用）"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+
+def worker_initializer() -> dict:
+    """ProcessPoolExecutorに渡すinitializer・initargs（ログをキュー経由で親プロセスへ転送）"""
+    global _log_queue, _listener
+    if _listener is None:
+        # spawnで作成したキューはfork・spawnのどちらで起動したワーカーにも渡せる
+        _log_queue = multiprocessing.get_context('spawn').Queue()
+        _listener = QueueListener(_log_queue, _DispatchHandler())
+        _listener.start()
+        atexit.register(stop_worker_logging)
+    return {'initializer': init_worker_logging, 'initargs': (_log_queue, logging.getLogger().getEffectiveLevel())}
+
+
+def stop_worker_logging() -> None:
+    """ワーカーのログ転送を停止（キューに残っているメッセージは出力してから終了）"""
+    global _log_queue, _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        _log_queue = None